@@ -0,0 +1,35 @@
+"""Benchmark residue-level D-uptake fits with scipy L-BFGS-B and with the ADMM total variation
+solver as a function of protein length"""
+
+import time
+
+import numpy as np
+
+from pyhdx.fitting import _fit_single_d_update
+from synthetic_coverage import random_coverage
+
+np.random.seed(43)
+rng = np.random.default_rng(43)
+
+protein_lengths = [150, 300, 600, 1200]
+r1 = 0.5
+
+
+print(
+    f"{'Nr':>6} {'L-BFGS-B (s)':>14} {'admm (s)':>10} {'speedup':>8} {'cost L-BFGS-B':>14} {'cost admm':>10}"
+)
+for Nr in protein_lengths:
+    X = random_coverage(Nr, rng=rng)
+    d_residue = np.repeat(np.random.uniform(0, 1, size=Nr // 10 + 1), 10)[:Nr]
+    d_uptake = X @ d_residue + np.random.normal(scale=0.1, size=len(X))
+
+    t0 = time.perf_counter()
+    res_lbfgsb, *_ = _fit_single_d_update(X, d_uptake, r1=r1)
+    t1 = time.perf_counter()
+    res_admm, *_ = _fit_single_d_update(X, d_uptake, r1=r1, method="admm")
+    t2 = time.perf_counter()
+
+    print(
+        f"{Nr:>6} {t1 - t0:>14.3f} {t2 - t1:>10.3f} {(t1 - t0) / (t2 - t1):>8.1f} "
+        f"{res_lbfgsb.fun:>14.5f} {res_admm.fun:>10.5f}"
+    )
@@ -0,0 +1,61 @@
+"""Benchmark ΔG error estimation (covariance and perr) with autograd and with the analytic banded
+Jacobian/Hessian as a function of protein length"""
+
+import time
+
+import numpy as np
+import torch
+from scipy import constants
+
+from pyhdx.fitting_torch import _analytic_errors, _autograd_errors
+from synthetic_coverage import random_coverage
+
+np.random.seed(43)
+rng = np.random.default_rng(43)
+
+protein_lengths = [200, 500, 1000, 2000]
+Nt = 7  # number of timepoints
+temperature = 300.0
+dtype = torch.float64
+
+
+def synthetic_tensors(Nr):
+    X = random_coverage(Nr, rng=rng)
+    X = X[:, X.any(axis=0)]  # only residues covered by peptides, as with `exchanges=True`
+    Nr = X.shape[1]
+    k_int = np.random.uniform(0.1, 10, size=(Nr, 1))
+    timepoints = np.logspace(1, 4, num=Nt).reshape(1, Nt)
+    dG = np.random.uniform(10e3, 40e3, size=Nr)
+
+    pfact = np.exp(dG[:, np.newaxis] / (constants.R * temperature))
+    d_calc = X @ (1 - np.exp(-(k_int / (1 + pfact)) * timepoints))
+    d_exp = d_calc + np.random.normal(scale=0.1, size=d_calc.shape)
+
+    tensors = {
+        "temperature": torch.tensor([[temperature]], dtype=dtype),
+        "X": torch.tensor(X, dtype=dtype),
+        "k_int": torch.tensor(k_int, dtype=dtype),
+        "timepoints": torch.tensor(timepoints, dtype=dtype),
+        "d_exp": torch.tensor(d_exp, dtype=dtype),
+    }
+
+    return tensors, dG
+
+
+print(
+    f"{'Nr':>6} {'Np':>6} {'autograd (s)':>14} {'analytic (s)':>14} {'speedup':>8} {'max rel diff':>14}"
+)
+for Nr in protein_lengths:
+    tensors, dG = synthetic_tensors(Nr)
+
+    t0 = time.perf_counter()
+    cov_autograd, perr_autograd = _autograd_errors(tensors, torch.tensor(dG, dtype=dtype))
+    t1 = time.perf_counter()
+    cov_analytic, perr_analytic = _analytic_errors(tensors, dG)
+    t2 = time.perf_counter()
+
+    rel_diff = np.max(np.abs(cov_analytic - cov_autograd) / cov_autograd)
+    print(
+        f"{Nr:>6} {tensors['X'].shape[0]:>6} {t1 - t0:>14.3f} {t2 - t1:>14.3f} "
+        f"{(t1 - t0) / (t2 - t1):>8.1f} {rel_diff:>14.2e}"
+    )
@@ -0,0 +1,45 @@
+"""Benchmark two-component weighted averaging kinetics fits with per-block symfit fits and with the
+batched fitting engine as a function of the number of blocks"""
+
+import time
+
+import numpy as np
+
+from pyhdx.fitting import fit_kinetics, fit_kinetics_batch, get_bounds
+from pyhdx.fit_models import TwoComponentAssociationModel
+
+np.random.seed(43)
+
+block_numbers = [10, 50, 200]
+timepoints = np.logspace(1, 4, num=7)
+bounds = get_bounds(timepoints)
+
+
+def synthetic_uptake(N):
+    k1 = 10 ** np.random.uniform(-2, 0, size=(N, 1))
+    k2 = 10 ** np.random.uniform(-4, -2, size=(N, 1))
+    r = np.random.uniform(0.1, 0.9, size=(N, 1))
+    d = 1 - (r * np.exp(-k1 * timepoints) + (1 - r) * np.exp(-k2 * timepoints))
+
+    return d + np.random.normal(scale=0.02, size=d.shape)
+
+
+print(
+    f"{'N':>5} {'symfit (s)':>12} {'batch (s)':>12} {'speedup':>8} {'chi2 symfit':>12} {'chi2 batch':>12}"
+)
+for N in block_numbers:
+    d = synthetic_uptake(N)
+
+    t0 = time.perf_counter()
+    chisq_symfit = [
+        fit_kinetics(timepoints, d_i, TwoComponentAssociationModel(bounds), 0.20).chi_squared
+        for d_i in d
+    ]
+    t1 = time.perf_counter()
+    params, chisq_batch = fit_kinetics_batch(timepoints, d, bounds, chisq_thd=0.20)
+    t2 = time.perf_counter()
+
+    print(
+        f"{N:>5} {t1 - t0:>12.3f} {t2 - t1:>12.3f} {(t1 - t0) / (t2 - t1):>8.1f} "
+        f"{np.sum(chisq_symfit):>12.4f} {np.sum(chisq_batch):>12.4f}"
+    )
@@ -0,0 +1,48 @@
+"""Benchmark D-uptake simulation in the Linderstrøm-Lang model with per-residue numerical
+integration and with the batched closed-form solution, for grids of (k_open, k_close) values"""
+
+import time
+
+import numpy as np
+
+from pyhdx.models import PeptideUptakeModel, linderstrom_lang_uptake
+
+np.random.seed(43)
+
+model = PeptideUptakeModel(list("MKVLAPSQEHWLTDRRAAGY"), 300.0, 7.5)
+timepoints = np.logspace(-2, 6, num=250)
+grid_sizes = [1, 3, 10]
+
+print(f"{'grid':>6} {'numerical (s)':>14} {'closed-form (s)':>16} {'speedup':>8} {'max diff':>10}")
+for n in grid_sizes:
+    k_open = 10 ** np.random.uniform(-2, 4, size=(n, n, len(model)))
+    k_close = 10 ** np.random.uniform(-1, 6, size=(n, n, len(model)))
+
+    t0 = time.perf_counter()
+    numerical = np.empty((n, n, len(timepoints), len(model)))
+    for idx in np.ndindex(n, n):
+        for i in range(len(model)):
+            y = model.eval_single_numerical(
+                i, timepoints, k_open[idx][i], k_close[idx][i], method="Radau"
+            )
+            numerical[idx][:, i] = y[:, 2]
+    t1 = time.perf_counter()
+    closed_form = model.eval_analytical(timepoints, k_open, k_close)
+    t2 = time.perf_counter()
+
+    print(
+        f"{n}x{n:<4} {t1 - t0:>14.3f} {t2 - t1:>16.5f} {(t1 - t0) / (t2 - t1):>8.0f} "
+        f"{np.abs(numerical - closed_form).max():>10.2e}"
+    )
+
+# Whole protein: 1000 residues, 100 peptides of 15 residues, each with 10x10 grid of rates
+k_int = 10 ** np.random.uniform(-1, 3, size=1000)
+start = np.random.randint(0, 985, size=100)
+residues = start[:, np.newaxis] + np.arange(15)
+k_open = 10 ** np.linspace(-2, 4, num=10)[:, np.newaxis, np.newaxis, np.newaxis]
+k_close = 10 ** np.linspace(-1, 6, num=10)[:, np.newaxis, np.newaxis]
+
+t0 = time.perf_counter()
+d_uptake = linderstrom_lang_uptake(timepoints, k_open, k_close, k_int[residues]).sum(axis=-2)
+t1 = time.perf_counter()
+print(f"Peptide D-uptake {d_uptake.shape} (grid, grid, peptides, timepoints): {t1 - t0:.3f} s")
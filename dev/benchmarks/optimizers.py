@@ -0,0 +1,58 @@
+"""Compare wall-clock times and final losses of ΔG fits with first- and second-order optimizers"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+import yaml
+from hdxms_datasets import HDXDataSet
+
+from pyhdx import HDXMeasurement, HDXMeasurementSet
+from pyhdx.config import cfg
+from pyhdx.fileIO import csv_to_dataframe
+from pyhdx.fitting import fit_gibbs_global, fit_gibbs_global_batch
+
+test_data_dir = Path(__file__).parent.parent.parent / "tests" / "test_data"
+input_dir = test_data_dir / "input"
+output_dir = test_data_dir / "output"
+
+optimizers = {
+    "SGD": {"epochs": 200000},
+    "LBFGS": {"epochs": 1000},
+    "LevenbergMarquardt": {"epochs": 1000},
+}
+
+hdx_spec = yaml.safe_load((input_dir / "data_states.yaml").read_text())
+dataset = HDXDataSet.from_spec(hdx_spec, data_dir=input_dir)
+
+with cfg.context({"analysis.drop_first": 1}):
+    hdxm_apo = HDXMeasurement.from_dataset(dataset, state="SecB_tetramer", d_percentage=100.0)
+    hdxm_dimer = HDXMeasurement.from_dataset(dataset, state="SecB_dimer", d_percentage=100.0)
+
+rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")["rate"]
+hdx_set = HDXMeasurementSet([hdxm_dimer, hdxm_apo])
+rates_df = pd.DataFrame({name: rates for name in hdx_set.names})
+
+fits = {
+    "single": (fit_gibbs_global, hdxm_apo, hdxm_apo.guess_deltaG(rates), {"r1": 2}),
+    "batch": (fit_gibbs_global_batch, hdx_set, hdx_set.guess_deltaG(rates_df), {"r1": 2, "r2": 5}),
+}
+
+records = []
+for fit_name, (fit_func, data, guess, reg_kwargs) in fits.items():
+    for optimizer, kwargs in optimizers.items():
+        t0 = time.perf_counter()
+        result = fit_func(data, guess, optimizer=optimizer, **reg_kwargs, **kwargs)
+        t1 = time.perf_counter()
+        records.append(
+            {
+                "fit": fit_name,
+                "optimizer": optimizer,
+                "epochs_run": result.metadata["epochs_run"],
+                "total_loss": result.total_loss,
+                "mse_loss": result.mse_loss,
+                "wall_time (s)": t1 - t0,
+            }
+        )
+
+print(pd.DataFrame.from_records(records).to_string(index=False))
@@ -0,0 +1,98 @@
+"""Benchmark memory and epoch times of batch ΔG fitting with padded (dense, sparse) and packed
+coupling matrices as a function of the number of states"""
+
+import time
+
+import numpy as np
+import torch
+
+from pyhdx.fitting_torch import DeltaGFit
+from pyhdx.models import PackedCoverage, coverage_tensor, sparse_tensor
+from synthetic_coverage import random_coverage
+
+np.random.seed(43)
+torch.manual_seed(43)
+rng = np.random.default_rng(43)
+
+state_numbers = [5, 10, 25, 50, 100]
+Nr = 500  # number of residues
+Nt = 7  # number of timepoints
+epochs = 100
+dtype = torch.float64
+device = torch.device("cpu")
+
+
+def padded_coverage(coverages):
+    X = np.zeros((len(coverages), max(len(x) for x in coverages), Nr))
+    for i, x in enumerate(coverages):
+        X[i, : len(x)] = x
+
+    return X
+
+
+def packed_coverage(coverages):
+    Np = [len(x) for x in coverages]
+    offsets = np.cumsum([0] + Np)
+    state_index = np.repeat(np.arange(len(coverages)), Np)
+    p, r = np.nonzero(np.concatenate(coverages))
+    X = sparse_tensor(
+        np.stack([p, state_index[p] * Nr + r]),
+        np.ones(len(p)),
+        (offsets[-1], len(coverages) * Nr),
+        dtype,
+        device,
+    )
+
+    return PackedCoverage(
+        X, torch.tensor(state_index, device=device), torch.tensor(offsets, device=device), Nr
+    )
+
+
+def tensor_bytes(X):
+    if isinstance(X, PackedCoverage):
+        X = X.X
+    if X.is_sparse:
+        return sum(t.element_size() * t.nelement() for t in [X.indices(), X.values()])
+    return X.element_size() * X.nelement()
+
+
+def time_epochs(X_tensor, d_exp, Ns):
+    temperature = torch.tensor(300.0, dtype=dtype).reshape(1, 1, 1)
+    k_int = torch.tensor(np.random.uniform(0.1, 10, size=(Ns, Nr, 1)), dtype=dtype)
+    timepoints = torch.tensor(np.logspace(1, 4, num=Nt), dtype=dtype).reshape(1, 1, Nt)
+
+    model = DeltaGFit(torch.tensor(np.random.uniform(1e4, 3e4, size=(Ns, Nr, 1)), dtype=dtype))
+    optimizer = torch.optim.SGD(model.parameters(), lr=1e4, momentum=0.5, nesterov=True)
+    criterion = torch.nn.MSELoss(reduction="mean")
+
+    t0 = time.perf_counter()
+    for epoch in range(epochs):
+        optimizer.zero_grad()
+        loss = criterion(model(temperature, X_tensor, k_int, timepoints), d_exp)
+        loss.backward()
+        optimizer.step()
+    t1 = time.perf_counter()
+
+    return (t1 - t0) / epochs
+
+
+print(f"{'Ns':>4} {'P':>6} {'layout':>8} {'X (MB)':>10} {'epoch (ms)':>12}")
+for Ns in state_numbers:
+    # States with different constructs have widely different numbers of peptides
+    coverages = [random_coverage(Nr, np.random.randint(20, 200), rng=rng) for _ in range(Ns)]
+    X_padded = padded_coverage(coverages)
+    P = sum(len(x) for x in coverages)
+
+    for layout in ["dense", "sparse", "packed"]:
+        if layout == "packed":
+            X_tensor = packed_coverage(coverages)
+            d_exp = torch.rand(P, Nt, dtype=dtype)
+        else:
+            X_tensor = coverage_tensor(X_padded, dtype, device, layout)
+            d_exp = torch.rand(*X_padded.shape[:-1], Nt, dtype=dtype)
+
+        t_epoch = time_epochs(X_tensor, d_exp, Ns)
+        print(
+            f"{Ns:>4} {P:>6} {layout:>8} {tensor_bytes(X_tensor) / 1e6:>10.2f} "
+            f"{t_epoch * 1e3:>12.3f}"
+        )
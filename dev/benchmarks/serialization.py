@@ -0,0 +1,41 @@
+"""Benchmark pickling of HDXMeasurement objects, as done when sending them to Dask workers.
+
+Compares payload size and round-trip time of pickling only the peptide store (current) with
+pickling all attributes, including coverage, timepoint objects and cached tensors (previous)"""
+
+import pickle
+import time
+
+from pyhdx.benchmark import BenchmarkData
+
+protein_sizes = [100, 500, 2000]
+
+
+def round_trip(obj, repeats=5):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        payload = pickle.dumps(obj)
+        loaded = pickle.loads(payload)
+        if hasattr(loaded, "store"):
+            loaded.coverage  # Rebuild derived objects, as is done on first use on the worker
+        times.append(time.perf_counter() - t0)
+
+    return len(payload), min(times)
+
+
+print(
+    f"{'Nr':>5} {'Np':>5} {'full (kB)':>10} {'compact (kB)':>13} {'full (s)':>9} {'compact (s)':>12}"
+)
+for n_residues in protein_sizes:
+    data = BenchmarkData(n_residues)
+    hdxm = data.hdxm
+    hdxm.get_tensors()
+
+    full_size, full_time = round_trip(dict(hdxm.__dict__))
+    compact_size, compact_time = round_trip(hdxm)
+
+    print(
+        f"{n_residues:>5} {hdxm.Np:>5} {full_size / 1e3:>10.1f} {compact_size / 1e3:>13.1f} "
+        f"{full_time:>9.4f} {compact_time:>12.4f}"
+    )
@@ -0,0 +1,60 @@
+"""Benchmark epoch times of ΔG fitting with dense and sparse coupling matrices as a function of protein length"""
+
+import time
+
+import numpy as np
+import torch
+
+from pyhdx.fitting_torch import DeltaGFit
+from pyhdx.models import coverage_tensor
+from synthetic_coverage import random_coverage
+
+np.random.seed(43)
+torch.manual_seed(43)
+rng = np.random.default_rng(43)
+
+protein_lengths = [100, 250, 500, 1000, 2000]
+Ns = 4  # number of states in batch fits
+Nt = 7  # number of timepoints
+epochs = 200
+dtype = torch.float64
+device = torch.device("cpu")
+
+
+def time_epochs(X, layout, batch=False):
+    Nr = X.shape[-1]
+    shape = (Ns, Nr, 1) if batch else (Nr, 1)
+    temperature = torch.tensor(300.0, dtype=dtype).reshape((1, 1, 1) if batch else (1, 1))
+    k_int = torch.tensor(np.random.uniform(0.1, 10, size=shape), dtype=dtype)
+    timepoints = torch.tensor(np.logspace(1, 4, num=Nt), dtype=dtype).reshape(
+        (1, 1, Nt) if batch else (1, Nt)
+    )
+    X_tensor = coverage_tensor(X, dtype, device, layout)
+    d_exp = torch.rand(*X.shape[:-1], Nt, dtype=dtype)
+
+    model = DeltaGFit(torch.tensor(np.random.uniform(1e4, 3e4, size=shape), dtype=dtype))
+    optimizer = torch.optim.SGD(model.parameters(), lr=1e4, momentum=0.5, nesterov=True)
+    criterion = torch.nn.MSELoss(reduction="mean")
+
+    t0 = time.perf_counter()
+    for epoch in range(epochs):
+        optimizer.zero_grad()
+        loss = criterion(model(temperature, X_tensor, k_int, timepoints), d_exp)
+        loss.backward()
+        optimizer.step()
+    t1 = time.perf_counter()
+
+    return (t1 - t0) / epochs
+
+
+print(f"{'Nr':>6} {'Np':>6} {'fit':>6} {'dense (ms)':>12} {'sparse (ms)':>12} {'speedup':>8}")
+for Nr in protein_lengths:
+    X = random_coverage(Nr, rng=rng)
+    X_batch = np.stack([random_coverage(Nr, len(X), rng=rng) for _ in range(Ns)])
+    for name, x, batch in [("single", X, False), ("batch", X_batch, True)]:
+        t_dense = time_epochs(x, "dense", batch=batch)
+        t_sparse = time_epochs(x, "sparse", batch=batch)
+        print(
+            f"{Nr:>6} {x.shape[-2]:>6} {name:>6} {t_dense * 1e3:>12.3f} {t_sparse * 1e3:>12.3f} "
+            f"{t_dense / t_sparse:>8.2f}"
+        )
@@ -0,0 +1,19 @@
+"""Random coupling matrices shared by the benchmark scripts in this directory"""
+
+import numpy as np
+
+from pyhdx.synthetic import generate_peptides, random_sequence
+
+
+def random_coverage(Nr, n_peptides=None, rng=None):
+    """Coupling matrix (Np x Nr) of random peptides on a protein of `Nr` residues, generated with
+    `pyhdx.synthetic.generate_peptides`. If `n_peptides` is `None`, each residue is covered by
+    three peptides on average."""
+    rng = rng or np.random.default_rng()
+    peptides = generate_peptides(random_sequence(Nr, rng=rng), n_peptides=n_peptides, rng=rng)
+    starts = peptides["start"].to_numpy() - 1
+    stops = peptides["end"].to_numpy()
+    cols = np.arange(Nr)
+    X = ((cols >= starts[:, np.newaxis]) & (cols < stops[:, np.newaxis])).astype(float)
+
+    return X
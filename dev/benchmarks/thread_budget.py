@@ -0,0 +1,60 @@
+"""Benchmark aggregate ΔG fit throughput for different splits of the CPUs over concurrent workers
+and PyTorch/BLAS threads per worker.
+
+Each configuration runs the same batch of independent `fit_gibbs_global` fits in a
+ProcessPoolClient and reports fits per hour. Configurations marked as oversubscribed give every
+worker all CPUs, as is the case for concurrent fits without a thread budget."""
+
+import os
+import time
+
+import numpy as np
+
+from pyhdx.benchmark import BenchmarkData
+from pyhdx.fitting import fit_gibbs_global
+from pyhdx.local_cluster import ProcessPoolClient
+
+n_residues = 500
+epochs = 1000
+
+
+def ready(i):
+    return os.getpid()
+
+
+def fit(hdxm, initial_guess):
+    # Disables early stopping such that all fits run the same number of epochs
+    fit_gibbs_global(hdxm, initial_guess, epochs=epochs, stop_loss=-np.inf)
+
+
+def splits(n_cpus):
+    n_workers = 1
+    while n_workers <= n_cpus:
+        yield n_workers, n_cpus // n_workers, False
+        if n_workers > 1:
+            yield n_workers, n_cpus, True
+        n_workers *= 2
+
+
+if __name__ == "__main__":
+    n_cpus = os.cpu_count() or 1
+    n_fits = 2 * n_cpus
+    data = BenchmarkData(n_residues)
+    hdxm, initial_guess = data.hdxm, data.initial_guess
+
+    print(f"{n_fits} fits of {n_residues} residues, {epochs} epochs on {n_cpus} CPUs")
+    print(f"{'workers':>8} {'threads':>8} {'time (s)':>9} {'fits/hour':>10}")
+    for n_workers, threads_per_worker, oversubscribed in splits(n_cpus):
+        with ProcessPoolClient(n_workers, threads_per_worker=threads_per_worker) as client:
+            # Start all worker processes before timing
+            client.gather(client.map(ready, range(n_workers)))
+
+            t0 = time.perf_counter()
+            client.gather(client.map(fit, [hdxm] * n_fits, [initial_guess] * n_fits))
+            elapsed = time.perf_counter() - t0
+
+        label = " (oversubscribed)" if oversubscribed else ""
+        print(
+            f"{n_workers:>8} {threads_per_worker:>8} {elapsed:>9.2f} "
+            f"{3600 * n_fits / elapsed:>10.1f}{label}"
+        )
@@ -0,0 +1,360 @@
+"""Benchmarks of data processing, fitting and error estimation on synthetic datasets.
+
+Each benchmark times one step of the PyHDX workflow on synthetic data generated with
+[synthetic][synthetic] for a range of protein sizes, such that performance regressions are
+detected before upgrading. Benchmarks run offline and results are reported as JSON.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import pickle
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import torch
+
+from pyhdx.__version__ import __version__
+from pyhdx.config import cfg
+from pyhdx.datasets import read_dynamx
+from pyhdx.fitting import (
+    fit_d_uptake,
+    fit_gibbs_global,
+    fit_gibbs_global_batch,
+    fit_rates_weighted_average,
+)
+from pyhdx.fitting_torch import TorchFitResult, estimate_errors
+from pyhdx.models import HDXMeasurement, HDXMeasurementSet
+from pyhdx.process import apply_control, correct_d_uptake, filter_peptides
+from pyhdx.synthetic import generate_dataset, generate_peptides, random_dG, random_sequence
+
+TEMPERATURE = 300.0
+PH = 7.5
+TIMEPOINTS = [0.0, 10.0, 30.0, 60.0, 300.0, 1200.0, 3600.0, 14400.0]
+STATES = ["state_1", "state_2"]
+
+# Benchmark name: setup function which takes BenchmarkData and returns the function to time. The
+# timed function may return a dictionary of counts (such as epochs) to report as rates
+BENCHMARKS: dict[str, Callable[["BenchmarkData"], Callable[[], Optional[dict]]]] = {}
+
+
+def register(name: str):
+    """Decorator which adds a benchmark setup function to [BENCHMARKS][benchmark.BENCHMARKS]."""
+
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory usage of a single benchmark for one protein size.
+
+    `peak_memory` is the peak memory (bytes) allocated by Python and numpy during one run, as
+    traced by `tracemalloc`. Memory allocated by PyTorch is not traced. `rates` are counts returned
+    by the benchmark (such as epochs) divided by the fastest run time.
+    """
+
+    name: str
+    n_residues: int
+    n_peptides: int
+    n_timepoints: int
+    times: list[float]
+    peak_memory: int
+    rates: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return float(np.median(self.times))
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "best": self.best, "median": self.median}
+
+
+class BenchmarkData(object):
+    """Synthetic dataset with two protein states and the intermediate objects benchmarks start from.
+
+    Args:
+        n_residues: Number of residues of the protein.
+        epochs: Number of epochs to run in ΔG fits.
+        seed: Seed for the random number generator.
+
+    """
+
+    def __init__(self, n_residues: int, epochs: int = 100, seed: int = 43) -> None:
+        self.n_residues = n_residues
+        self.epochs = epochs
+
+        rng = np.random.default_rng(seed)
+        self.sequence = random_sequence(n_residues, rng=rng)
+        self.peptides = generate_peptides(self.sequence, rng=rng)
+        dG = {state: random_dG(n_residues, rng=rng) for state in STATES}
+        df = generate_dataset(
+            self.sequence, dG, TEMPERATURE, PH, TIMEPOINTS, self.peptides, rng=rng
+        )
+        self.csv = df.to_csv(index=False)
+
+    @property
+    def n_peptides(self) -> int:
+        return len(self.peptides)
+
+    @cached_property
+    def data(self) -> pd.DataFrame:
+        return read_dynamx(io.StringIO(self.csv))
+
+    def correct(self, state: str) -> pd.DataFrame:
+        fd = filter_peptides(self.data, state="Full deuteration control")
+        nd = filter_peptides(self.data, state="Non deuterated control")
+        peptides = filter_peptides(self.data, state=state)
+        peptides = apply_control(peptides, fd, nd)
+
+        return correct_d_uptake(peptides, drop_first=cfg.analysis.drop_first)
+
+    @cached_property
+    def corrected(self) -> dict[str, pd.DataFrame]:
+        return {state: self.correct(state) for state in STATES}
+
+    def measurement(self, state: str) -> HDXMeasurement:
+        return HDXMeasurement(
+            self.corrected[state],
+            sequence=self.sequence,
+            temperature=TEMPERATURE,
+            pH=PH,
+            name=state,
+        )
+
+    @cached_property
+    def hdxm(self) -> HDXMeasurement:
+        return self.measurement(STATES[0])
+
+    @cached_property
+    def hdxm_set(self) -> HDXMeasurementSet:
+        return HDXMeasurementSet([self.hdxm] + [self.measurement(s) for s in STATES[1:]])
+
+    @property
+    def initial_guess(self) -> np.ndarray:
+        return np.full(self.hdxm.Nr, 25e3)
+
+    @cached_property
+    def gibbs_result(self) -> TorchFitResult:
+        return fit_gibbs_global(self.hdxm, self.initial_guess, **self.fit_kwargs)
+
+    @property
+    def fit_kwargs(self) -> dict:
+        # Disables early stopping such that all epochs are run
+        return {"epochs": self.epochs, "stop_loss": -np.inf}
+
+
+@register("read_dynamx")
+def bench_read_dynamx(data: BenchmarkData):
+    return lambda: read_dynamx(io.StringIO(data.csv))
+
+
+@register("correct_d_uptake")
+def bench_correct_d_uptake(data: BenchmarkData):
+    data.data
+    return lambda: data.correct(STATES[0])
+
+
+@register("hdx_measurement")
+def bench_hdx_measurement(data: BenchmarkData):
+    data.corrected
+    return lambda: data.measurement(STATES[0])
+
+
+@register("pickle_hdx_measurement")
+def bench_pickle_hdx_measurement(data: BenchmarkData):
+    hdxm = data.hdxm
+
+    def func():
+        pickle.loads(pickle.dumps(hdxm)).coverage
+
+    return func
+
+
+@register("get_tensors")
+def bench_get_tensors(data: BenchmarkData):
+    hdxm = data.hdxm
+
+    def func():
+        hdxm.clear_tensor_cache()
+        hdxm.get_tensors()
+
+    return func
+
+
+@register("fit_gibbs_global")
+def bench_fit_gibbs_global(data: BenchmarkData):
+    hdxm, initial_guess = data.hdxm, data.initial_guess
+
+    def func():
+        result = fit_gibbs_global(hdxm, initial_guess, **data.fit_kwargs)
+        return {"epochs": result.metadata["epochs_run"]}
+
+    return func
+
+
+@register("fit_gibbs_global_batch")
+def bench_fit_gibbs_global_batch(data: BenchmarkData):
+    hdxm_set, initial_guess = data.hdxm_set, data.initial_guess
+
+    def func():
+        result = fit_gibbs_global_batch(hdxm_set, initial_guess, **data.fit_kwargs)
+        return {"epochs": result.metadata["epochs_run"]}
+
+    return func
+
+
+@register("estimate_errors")
+def bench_estimate_errors(data: BenchmarkData):
+    hdxm, dG = data.hdxm, data.gibbs_result.dG[data.hdxm.name]
+    return lambda: estimate_errors(hdxm, dG)
+
+
+@register("fit_rates_weighted_average")
+def bench_fit_rates_weighted_average(data: BenchmarkData):
+    hdxm = data.hdxm
+    return lambda: fit_rates_weighted_average(hdxm, method="batch")
+
+
+@register("fit_d_uptake")
+def bench_fit_d_uptake(data: BenchmarkData):
+    hdxm = data.hdxm
+    return lambda: fit_d_uptake(hdxm, r1=0.5, repeats=3, verbose=False, method="admm")
+
+
+@register("fit_result_output")
+def bench_fit_result_output(data: BenchmarkData):
+    result = data.gibbs_result
+
+    def func():
+        fit_result = TorchFitResult(result.hdxm_set, result.model, losses=result.losses)
+        fit_result.output
+
+    return func
+
+
+def time_benchmark(name: str, data: BenchmarkData, repeats: int = 3) -> BenchmarkResult:
+    """Time a single benchmark.
+
+    The benchmark is run once while tracing memory allocations, which also serves as warm-up,
+    followed by `repeats` timed runs.
+
+    Args:
+        name: Name of the benchmark in [BENCHMARKS][benchmark.BENCHMARKS].
+        data: Benchmark input data.
+        repeats: Number of timed runs.
+
+    Returns:
+        Benchmark result.
+
+    """
+    func = BENCHMARKS[name](data)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = func()
+        times.append(time.perf_counter() - t0)
+
+    result = BenchmarkResult(
+        name=name,
+        n_residues=data.n_residues,
+        n_peptides=data.n_peptides,
+        n_timepoints=len(TIMEPOINTS),
+        times=times,
+        peak_memory=peak_memory,
+    )
+    counts = out if isinstance(out, dict) else {}
+    result.rates = {f"{k}_per_second": v / result.best for k, v in counts.items()}
+
+    return result
+
+
+def run_benchmarks(
+    sizes: Iterable[int] = (100, 500, 2000),
+    names: Optional[Iterable[str]] = None,
+    repeats: int = 3,
+    epochs: int = 100,
+    seed: int = 43,
+    callback: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> dict:
+    """Run benchmarks for a range of protein sizes.
+
+    Args:
+        sizes: Numbers of residues of the synthetic proteins.
+        names: Names of benchmarks to run. Default is `None`, which runs all benchmarks.
+        repeats: Number of timed runs per benchmark.
+        epochs: Number of epochs to run in ΔG fits.
+        seed: Seed for the random number generator.
+        callback: Optional callable which is called with each benchmark result.
+
+    Returns:
+        Dictionary with 'metadata' describing the environment and 'results', a list of benchmark
+        result dictionaries.
+
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for n_residues in sizes:
+        data = BenchmarkData(n_residues, epochs=epochs, seed=seed)
+        for name in names:
+            result = time_benchmark(name, data, repeats=repeats)
+            if callback is not None:
+                callback(result)
+            results.append(result.to_dict())
+
+    metadata = {
+        "pyhdx": __version__,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "torch_threads": torch.get_num_threads(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "repeats": repeats,
+        "epochs": epochs,
+        "seed": seed,
+        "config": {
+            "dtype": cfg.fitting.dtype,
+            "device": cfg.fitting.device,
+            "layout": cfg.fitting.layout,
+        },
+    }
+
+    return {"metadata": metadata, "results": results}
+
+
+def save_benchmarks(report: dict, file_path: Union[Path, str]) -> None:
+    """Write a benchmark report as returned by [run_benchmarks][benchmark.run_benchmarks] to a
+    JSON file."""
+    Path(file_path).write_text(json.dumps(report, indent=2))
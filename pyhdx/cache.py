@@ -0,0 +1,321 @@
+"""Persistent cache of fit results.
+
+Fit results are stored on disk keyed by a hash of the input HDX measurements, fit arguments and
+the relevant configuration values, such that repeated fits of the same data with the same
+settings are loaded instead of recomputed. The cache is located at `cfg.server.cache_dir` and
+least recently used results are removed when its size exceeds `cfg.server.cache_size` (MB).
+
+Cached versions of fitting functions are available in this module:
+
+```python
+from pyhdx.cache import fit_gibbs_global
+```
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import warnings
+from numbers import Number
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from omegaconf import OmegaConf
+
+import pyhdx
+from pyhdx import fitting
+from pyhdx.config import cfg
+from pyhdx.models import HDXMeasurement, HDXMeasurementSet, HDXTimepoint
+from pyhdx.support import hash_array, hash_dataframe
+
+# Arguments which do not affect fit results
+IGNORED_ARGUMENTS = ["client", "pbar", "verbose"]
+
+# Configuration sections which affect fit results
+CONFIG_SECTIONS = ["fitting", "analysis"]
+
+
+class ResultCache(object):
+    """Directory of pickled results with size-based least recently used eviction.
+
+    Args:
+        directory: Cache directory, created if it does not exist.
+        max_size: Maximum total size of cached results (bytes).
+
+    """
+
+    def __init__(self, directory: os.PathLike, max_size: int) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    @classmethod
+    def from_config(cls) -> Optional[ResultCache]:
+        """Returns the cache as specified in the `server` section of the config, or `None` if
+        caching is disabled."""
+        if cfg.cache_dir is None:
+            return None
+        return cls(cfg.cache_dir, int(cfg.server.cache_size * 1e6))
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str, objects: Optional[list] = None) -> Any:
+        """Load a cached result.
+
+        Args:
+            key: Cache key.
+            objects: Objects which were replaced by references when the result was stored.
+
+        Returns:
+            The cached result.
+
+        Raises:
+            KeyError: If no result is cached for `key`.
+
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                result = _Unpickler(f, objects or []).load()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Incomplete or incompatible entry
+            raise KeyError(key) from None
+
+        try:
+            os.utime(path)  # Marks the entry as recently used
+        except OSError:
+            pass
+
+        return result
+
+    def set(self, key: str, result: Any, objects: Optional[list] = None) -> None:
+        """Store a result and evict least recently used results if the cache is too large.
+
+        Args:
+            key: Cache key.
+            result: Result to store.
+            objects: Objects in `result` to store as references rather than by value, such as
+                the input HDX measurements of fit results.
+
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                _Pickler(f, objects or []).dump(result)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used results until the cache size is below `max_size`."""
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+    @property
+    def size(self) -> int:
+        """Total size of cached results (bytes)."""
+        return sum(path.stat().st_size for path in self.directory.glob("*.pkl"))
+
+    def clear(self) -> None:
+        """Removes all cached results."""
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler which stores `objects` as references to their index."""
+
+    def __init__(self, file, objects: list) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.objects = objects
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        for i, other in enumerate(self.objects):
+            if obj is other:
+                return i
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler which resolves references stored by `_Pickler` to `objects`."""
+
+    def __init__(self, file, objects: list) -> None:
+        super().__init__(file)
+        self.objects = objects
+
+    def persistent_load(self, pid: int) -> Any:
+        return self.objects[pid]
+
+
+def _update_hash(h: hashlib._Hash, value: Any) -> None:
+    """Updates hash `h` with a stable representation of `value`.
+
+    Raises:
+        TypeError: If `value` is of a type without a stable representation.
+
+    """
+    if isinstance(value, HDXMeasurement):
+        h.update(b"HDXMeasurement")
+        store = value.store
+        h.update(hash_dataframe(store.peptides, method="md5").encode())
+        for field in sorted(store.arrays):
+            h.update(field.encode())
+            _update_hash(h, store.arrays[field])
+        _update_hash(h, store.timepoints)
+        _update_hash(h, store.columns)
+        _update_hash(h, value.metadata)
+    elif isinstance(value, HDXMeasurementSet):
+        h.update(b"HDXMeasurementSet")
+        _update_hash(h, value.hdxm_list)
+    elif isinstance(value, HDXTimepoint):
+        h.update(b"HDXTimepoint")
+        h.update(hash_dataframe(value.data, method="md5").encode())
+        _update_hash(h, value.X)
+    elif isinstance(value, torch.Tensor):
+        _update_hash(h, value.detach().cpu().numpy())
+    elif isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        h.update(f"ndarray:{value.dtype.str}:{value.shape}".encode())
+        if value.dtype == object:
+            _update_hash(h, value.tolist())
+        else:
+            h.update(hash_array(value, method="md5").encode())
+    elif isinstance(value, pd.Series):
+        h.update(b"Series")
+        _update_hash(h, value.to_frame())
+    elif isinstance(value, pd.DataFrame):
+        h.update(hash_dataframe(value, method="md5").encode())
+    elif isinstance(value, pd.Index):
+        h.update(b"Index")
+        _update_hash(h, value.to_numpy())
+        _update_hash(h, list(value.names))
+    elif isinstance(value, np.generic):
+        h.update(f"{value.dtype.str}:".encode())
+        _update_hash(h, value.item())
+    elif isinstance(value, dict):
+        h.update(b"dict")
+        for k in sorted(value, key=str):
+            _update_hash(h, k)
+            _update_hash(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}:{len(value)}".encode())
+        for v in value:
+            _update_hash(h, v)
+    elif value is None or isinstance(value, (str, bool, Number)):
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+    else:
+        # Reprs can contain memory addresses or be truncated, and are not used as keys
+        raise TypeError(f"Cannot create a cache key for objects of type {type(value).__name__!r}")
+
+
+def _input_objects(arguments: dict[str, Any]) -> list:
+    """Returns the HDX objects among fit arguments, which are stored by reference."""
+    objects = []
+    for value in arguments.values():
+        if isinstance(value, HDXMeasurementSet):
+            objects += [value, *value.hdxm_list]
+        elif isinstance(value, (HDXMeasurement, HDXTimepoint)):
+            objects.append(value)
+
+    return objects
+
+
+class CachedFunction(object):
+    """Wraps a fitting function such that its results are stored in and loaded from the
+    [ResultCache][cache.ResultCache].
+
+    Results are keyed by the function name, PyHDX version, all arguments which affect the result
+    and the `fitting` and `analysis` configuration sections. Fits with callbacks or with arguments
+    for which no cache key can be created are not cached.
+
+    Args:
+        func: Function to wrap.
+
+    """
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+        self.signature = inspect.signature(func)
+        functools.update_wrapper(self, func)
+
+    def key(self, *args: Any, **kwargs: Any) -> str:
+        """Returns the cache key for calling the wrapped function with `args` and `kwargs`.
+
+        Raises:
+            TypeError: If an argument is of a type for which no cache key can be created.
+
+        """
+        return self._key(self._arguments(*args, **kwargs))
+
+    def _arguments(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return {k: v for k, v in bound.arguments.items() if k not in IGNORED_ARGUMENTS}
+
+    def _key(self, arguments: dict[str, Any]) -> str:
+        h = hashlib.sha256()
+        h.update(f"{self.func.__module__}.{self.func.__qualname__}".encode())
+        h.update(pyhdx.VERSION_STRING.encode())
+        config = {s: OmegaConf.to_container(cfg.conf[s], resolve=True) for s in CONFIG_SECTIONS}
+        h.update(json.dumps(config, sort_keys=True).encode())
+        _update_hash(h, arguments)
+
+        return h.hexdigest()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        cache = ResultCache.from_config()
+        arguments = self._arguments(*args, **kwargs)
+        if cache is None or arguments.get("callbacks"):
+            return self.func(*args, **kwargs)
+
+        try:
+            key = self._key(arguments)
+        except TypeError:
+            return self.func(*args, **kwargs)
+
+        objects = _input_objects(arguments)
+        try:
+            return cache.get(key, objects)
+        except KeyError:
+            pass
+
+        result = self.func(*args, **kwargs)
+        try:
+            cache.set(key, result, objects)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            warnings.warn(f"Could not cache result of {self.__name__!r}: {e}")
+
+        return result
+
+
+fit_rates_weighted_average = CachedFunction(fitting.fit_rates_weighted_average)
+fit_d_uptake = CachedFunction(fitting.fit_d_uptake)
+fit_gibbs_global = CachedFunction(fitting.fit_gibbs_global)
+fit_gibbs_global_batch = CachedFunction(fitting.fit_gibbs_global_batch)
@@ -1,5 +1,6 @@
 import time
-from typing import Union, Optional
+from copy import deepcopy
+from typing import Union, Optional, List
 from pathlib import Path
 
 import typer
@@ -87,6 +88,145 @@ def clear():
 app.add_typer(datasets_app, name="datasets")
 
 
+@app.command()
+def synthetic(
+    output_dir: Path = typer.Argument(..., help="Directory to write the dataset to"),
+    n_residues: int = typer.Option(300, min=20, help="Number of residues of the protein"),
+    n_peptides: Optional[int] = typer.Option(
+        None, min=1, help="Number of peptides, by default determined from redundancy"
+    ),
+    redundancy: float = typer.Option(3.0, help="Average number of peptides per residue"),
+    mean_length: float = typer.Option(12.0, help="Mean peptide length"),
+    length_sd: float = typer.Option(4.0, help="Standard deviation of peptide lengths"),
+    n_states: int = typer.Option(1, min=1, help="Number of protein states"),
+    timepoint: Optional[List[float]] = typer.Option(
+        None, help="Deuterium exposure time (s), repeat for multiple timepoints"
+    ),
+    temperature: float = typer.Option(303.15, help="Temperature (K)"),
+    pH: float = typer.Option(7.5, help="pH of the exchange reaction"),
+    d_percentage: float = typer.Option(90.0, help="Percentage deuterium in the exchange buffer"),
+    noise: float = typer.Option(0.05, help="Standard deviation of noise on uptake values (Da)"),
+    seed: int = typer.Option(0, help="Random seed"),
+):
+    """Generate a synthetic HDX-MS dataset in DynamX format"""
+    import numpy as np
+    import pandas as pd
+    import yaml
+
+    from pyhdx.synthetic import random_sequence, random_dG, generate_peptides, generate_dataset
+
+    rng = np.random.default_rng(seed)
+    timepoints = timepoint or [0.0, 10.0, 30.0, 60.0, 300.0, 1200.0, 3600.0, 14400.0]
+
+    sequence = random_sequence(n_residues, rng=rng)
+    dG_base = random_dG(n_residues, rng=rng)
+    dG = {
+        f"state_{i}": dG_base + (random_dG(n_residues, -5e3, 5e3, rng=rng) if i else 0.0)
+        for i in range(n_states)
+    }
+    peptides = generate_peptides(
+        sequence,
+        n_peptides=n_peptides,
+        redundancy=redundancy,
+        mean_length=mean_length,
+        length_sd=length_sd,
+        rng=rng,
+    )
+    fd_exposure = 60.0
+    df = generate_dataset(
+        sequence,
+        dG,
+        temperature,
+        pH,
+        timepoints,
+        peptides,
+        d_percentage=d_percentage,
+        noise=noise,
+        fd_exposure=fd_exposure,
+        rng=rng,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output_dir / "synthetic.csv", index=False)
+
+    index = pd.RangeIndex(1, n_residues + 1, name="r_number")
+    pd.DataFrame(dG, index=index).to_csv(output_dir / "dG.csv")
+
+    metadata = {
+        "pH": pH,
+        "d_percentage": d_percentage,
+        "temperature": {"value": temperature, "unit": "K"},
+        "sequence": sequence,
+        "n_term": 1,
+        "c_term": n_residues,
+    }
+    peptide_spec = {
+        "FD_control": {
+            "data_file": "synthetic",
+            "state": "Full deuteration control",
+            "exposure": {"value": fd_exposure / 60.0, "unit": "min"},
+        },
+        "ND_control": {"data_file": "synthetic", "state": "Non deuterated control"},
+    }
+    spec = {
+        "data_files": {"synthetic": {"filename": "synthetic.csv", "format": "DynamX"}},
+        "states": {
+            state: {
+                "peptides": {
+                    "experiment": {"data_file": "synthetic", "state": state},
+                    **deepcopy(peptide_spec),
+                },
+                "metadata": deepcopy(metadata),
+            }
+            for state in dG
+        },
+    }
+    (output_dir / "data_states.yaml").write_text(yaml.dump(spec, sort_keys=False))
+
+    print(
+        f"Generated {len(peptides)} peptides, {n_states} states and {len(timepoints)} timepoints "
+        f"in {output_dir}"
+    )
+
+
+@app.command()
+def benchmark(
+    output: Optional[Path] = typer.Option(None, help="Optional JSON file to write results to"),
+    size: Optional[List[int]] = typer.Option(
+        None, min=20, help="Number of residues of the protein, repeat for multiple sizes"
+    ),
+    name: Optional[List[str]] = typer.Option(
+        None, help="Name of the benchmark to run, repeat for multiple benchmarks"
+    ),
+    repeats: int = typer.Option(3, min=1, help="Number of timed runs per benchmark"),
+    epochs: int = typer.Option(100, min=1, help="Number of epochs of ΔG fits"),
+    seed: int = typer.Option(43, help="Random seed"),
+):
+    """Time data processing, fitting and error estimation on synthetic datasets"""
+    from pyhdx.benchmark import run_benchmarks, save_benchmarks
+
+    def report(result):
+        rates = "".join(f" {v:10.1f} {k}" for k, v in result.rates.items())
+        print(
+            f"{result.name:<28}{result.n_residues:>6} {result.best:10.4f} s "
+            f"{result.peak_memory / 2**20:9.1f} MiB{rates}"
+        )
+
+    print(f"{'benchmark':<28}{'size':>6} {'time':>12} {'peak memory':>13}")
+    results = run_benchmarks(
+        sizes=size or (100, 500, 2000),
+        names=name or None,
+        repeats=repeats,
+        epochs=epochs,
+        seed=seed,
+        callback=report,
+    )
+
+    if output is not None:
+        save_benchmarks(results, output)
+        print(f"Saved benchmark results to {output}")
+
+
 @app.callback()
 def callback():
     pass
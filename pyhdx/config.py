@@ -9,7 +9,6 @@ import torch
 from omegaconf import OmegaConf, DictConfig, DictKeyType
 from packaging import version
 
-
 PACKAGE_NAME = "pyhdx"
 
 
@@ -108,6 +107,26 @@ class PyHDXConfig(metaclass=Singleton):
 
         return log_dir
 
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        """PyHDX fit result cache directory, `None` if caching is disabled"""
+        spec_path = self.conf.server.get("cache_dir")
+        if not spec_path:
+            return None
+        cache_dir = Path(spec_path.replace("~", str(Path().home())))
+
+        return cache_dir
+
+    @property
+    def k_int_dir(self) -> Optional[Path]:
+        """Directory of persisted intrinsic exchange rates, `None` if rates are not persisted"""
+        spec_path = self.conf.server.get("k_int_dir")
+        if not spec_path:
+            return None
+        k_int_dir = Path(spec_path.replace("~", str(Path().home())))
+
+        return k_int_dir
+
     @property
     def database_dir(self) -> Path:
         """HDXMS-datasets database directory"""
@@ -133,6 +152,14 @@ class PyHDXConfig(metaclass=Singleton):
         device = self.conf.fitting.device
         return torch.device(device)
 
+    @property
+    def TORCH_LAYOUT(self) -> str:
+        """Layout of the coupling matrix `X` used for ΔG calculations"""
+        layout = self.conf.fitting.layout
+        if layout not in ["dense", "sparse", "packed"]:
+            raise ValueError(f"Unsupported layout: {layout}")
+        return layout
+
     @contextmanager
     def context(self, settings: dict) -> Generator[PyHDXConfig, None, None]:
         from pyhdx.support import rsetattr
@@ -189,6 +216,8 @@ if not valid_config():
 else:
     conf = OmegaConf.load(config_file_path)
 
+# Entries missing from the user config file fall back to the package defaults
+conf = OmegaConf.merge(OmegaConf.load(conf_src_pth), conf)
 
 cfg = PyHDXConfig()
 cfg.set_config(conf)
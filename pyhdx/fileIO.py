@@ -12,6 +12,7 @@ from typing import Union, Literal, Tuple, List, TextIO, Optional, TYPE_CHECKING,
 from importlib import import_module
 import torch.nn as nn
 import torch as t
+import numpy as np
 import pandas as pd
 import yaml
 import warnings
@@ -24,6 +25,10 @@ if TYPE_CHECKING:
 # Dtype of fields in peptide table data
 PEPTIDE_DTYPES = {"start": int, "end": int, "stop": int, "_start": int, "_stop": int}
 
+# Name and version of the binary fit result format
+NPY_FORMAT = "pyhdx-npy"
+NPY_FORMAT_VERSION = 1
+
 
 def read_dynamx(
     filepath_or_buffer: Union[Path[str], str, StringIO],
@@ -295,44 +300,64 @@ def dataframe_to_file(
 
 
 def save_fitresult(
-    output_dir: os.PathLike, fit_result: TorchFitResult, log_lines: Optional[list[str]] = None
+    output_dir: os.PathLike,
+    fit_result: TorchFitResult,
+    log_lines: Optional[list[str]] = None,
+    fmt: Literal["csv", "npy"] = "csv",
+    pprint: bool = True,
 ) -> None:
     """
     Save a fit result object to the specified directory with associated metadata
 
     Output directory contents:
-    dG.csv/.txt: Fit output result (dG, covariance, k_obs, pfact)
+    fit_result.csv/.txt: Fit output result (dG, covariance, k_obs, pfact)
     losses.csv/.txt: Losses per epoch
+    HDXMeasurements.csv: Peptide data of the fitted HDX measurements
     log.txt: Log file with additional metadata (number of epochs, final losses, pyhdx version, time/date)
 
+    With the 'npy' format, fit output, losses and peptide data are instead stored as binary
+    numpy `.npy` files, one per quantity or field, described by a `fit_result.json` manifest.
+    These files can be memory-mapped and read selectively, see
+    [load_fitresult_output][fileIO.load_fitresult_output] and
+    [load_fitresult_losses][fileIO.load_fitresult_losses].
+
     Args:
         output_dir: Output directory to save fit result to.
         fit_result: fit result object to save.
         log_lines: Optional additional lines to write to log file.
+        fmt: Format of the fit result files, either 'csv' or 'npy'.
+        pprint: If `True`, fit output and losses are also written in human-readable text format
+            (.txt files).
 
     """
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    fit_result.to_file(output_dir / "fit_result.csv")
-    fit_result.to_file(output_dir / "fit_result.txt", fmt="pprint")
-
-    dataframe_to_file(output_dir / "losses.csv", fit_result.losses)
-    dataframe_to_file(output_dir / "losses.txt", fit_result.losses, fmt="pprint")
+    if fmt == "csv":
+        fit_result.to_file(output_dir / "fit_result.csv")
+        dataframe_to_file(output_dir / "losses.csv", fit_result.losses)
+
+        if isinstance(
+            fit_result.hdxm_set, pyhdx.HDXMeasurement
+        ):  # check, but this should always be hdxm_set
+            fit_result.hdxm_set.to_file(output_dir / "HDXMeasurement.csv")
+        if isinstance(fit_result.hdxm_set, pyhdx.HDXMeasurementSet):
+            fit_result.hdxm_set.to_file(output_dir / "HDXMeasurements.csv")
+    elif fmt == "npy":
+        _save_fitresult_npy(output_dir, fit_result)
+    else:
+        raise ValueError(f"Invalid specification for fmt: '{fmt}', must be 'csv' or 'npy'")
 
-    if isinstance(
-        fit_result.hdxm_set, pyhdx.HDXMeasurement
-    ):  # check, but this should always be hdxm_set
-        fit_result.hdxm_set.to_file(output_dir / "HDXMeasurement.csv")
-    if isinstance(fit_result.hdxm_set, pyhdx.HDXMeasurementSet):
-        fit_result.hdxm_set.to_file(output_dir / "HDXMeasurements.csv")
+    if pprint:
+        fit_result.to_file(output_dir / "fit_result.txt", fmt="pprint")
+        dataframe_to_file(output_dir / "losses.txt", fit_result.losses, fmt="pprint")
 
     loss = (
         f"Total_loss {fit_result.total_loss:.2f}, mse_loss {fit_result.mse_loss:.2f}, reg_loss {fit_result.reg_loss:.2f}"
         f"({fit_result.regularization_percentage:.2f}%)"
     )
-    epochs = f"Number of epochs: {len(fit_result.losses)}"
+    epochs = f"Number of epochs: {fit_result.losses.index.max()}"
     version = pyhdx.VERSION_STRING
     now = datetime.now()
     date = f'# {now.strftime("%Y/%m/%d %H:%M:%S")} ({int(now.timestamp())})'
@@ -345,20 +370,206 @@ def save_fitresult(
     log_file_out.write_text("\n".join(lines))
 
 
-def load_fitresult(fit_dir: os.PathLike) -> Union[TorchFitResult, TorchFitResultSet]:
+def _save_array(file_path: Path, values: np.ndarray) -> None:
+    """Saves an array as .npy file. Object arrays are stored as strings, where missing values
+    are stored as empty strings."""
+    if values.dtype == object:
+        values = np.array(["" if pd.isna(v) else str(v) for v in values.ravel()]).reshape(
+            values.shape
+        )
+    np.save(file_path, values, allow_pickle=False)
+
+
+def _load_array(file_path: Path, mmap_mode: Optional[str] = None) -> np.ndarray:
+    """Loads an array saved by `_save_array`. String arrays are returned as object arrays,
+    where empty strings are replaced by `NaN`."""
+    values = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+    if values.dtype.kind == "U":
+        values = np.where(values == "", np.nan, values.astype(object))
+    return values
+
+
+def _save_fitresult_npy(output_dir: Path, fit_result: TorchFitResult) -> None:
+    """Saves fit output, losses and peptide data of a fit result as .npy files."""
+    output = fit_result.output
+    states = list(output.columns.unique(level=0))
+    quantities = list(output.columns.unique(level=1))
+
+    (output_dir / "output").mkdir(exist_ok=True)
+    for quantity in quantities:
+        values = output.xs(quantity, level=1, axis=1).reindex(columns=states).to_numpy()
+        _save_array(output_dir / "output" / f"{quantity}.npy", values)
+    _save_array(output_dir / "output_index.npy", output.index.to_numpy())
+
+    _save_array(output_dir / "losses.npy", fit_result.losses.to_numpy())
+    _save_array(output_dir / "losses_index.npy", fit_result.losses.index.to_numpy())
+
+    hdxm_list = getattr(fit_result.hdxm_set, "hdxm_list", [fit_result.hdxm_set])
+    state_specs = []
+    for i, hdxm in enumerate(hdxm_list):
+        state_dir = output_dir / "states" / str(i)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        # Fields which are equal for all timepoints are stored once per peptide
+        store = hdxm.store
+        for field in store.columns:
+            values = store.arrays[field] if field in store.arrays else store.peptides[field]
+            _save_array(state_dir / f"{field}.npy", np.asarray(values))
+        state_specs.append({"metadata": hdxm.metadata, "fields": store.columns, "Nt": store.Nt})
+
+    manifest = {
+        "format": NPY_FORMAT,
+        "format_version": NPY_FORMAT_VERSION,
+        "version": pyhdx.VERSION_STRING,
+        "metadata": fit_result.metadata,
+        "output": {
+            "index_name": output.index.name,
+            "states": states,
+            "quantities": quantities,
+            "columns": output.columns.to_list(),
+        },
+        "losses": {
+            "index_name": fit_result.losses.index.name,
+            "columns": fit_result.losses.columns.to_list(),
+        },
+        "states": state_specs,
+    }
+    (output_dir / "fit_result.json").write_text(json.dumps(manifest, indent=2))
+
+
+def _read_manifest(fit_dir: Path) -> Optional[dict]:
+    """Returns the manifest of a fit result directory in 'npy' format, or `None` for 'csv'."""
+    try:
+        manifest = json.loads((fit_dir / "fit_result.json").read_text())
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != NPY_FORMAT:
+        raise ValueError(f"Invalid fit result format: {manifest.get('format')!r}")
+    if manifest["format_version"] > NPY_FORMAT_VERSION:
+        raise ValueError(
+            f"Fit result format version {manifest['format_version']} is not supported, "
+            "please upgrade PyHDX"
+        )
+
+    return manifest
+
+
+def load_fitresult_output(
+    fit_dir: os.PathLike,
+    quantities: Optional[list[str]] = None,
+    mmap_mode: Optional[str] = "r",
+) -> pd.DataFrame:
+    """Load the fit output of a saved fit result, without loading losses or peptide data.
+
+    Args:
+        fit_dir: Fit result directory.
+        quantities: Optional list of quantities to load, for example `['dG', 'covariance']`. By
+            default all quantities are loaded.
+        mmap_mode: Memory-map mode passed to [np.load][numpy.load] for fit results in 'npy'
+            format.
+
+    Returns:
+        Fit output DataFrame, with columns multiindex by (state, quantity).
+
+    """
+    fit_dir = Path(fit_dir)
+    manifest = _read_manifest(fit_dir)
+    if manifest is None:
+        output = csv_to_dataframe(fit_dir / "fit_result.csv")
+        output.attrs.pop("metadata", None)
+        if quantities is not None:
+            keep = output.columns.get_level_values(-1).isin(quantities)
+            output = output.loc[:, keep]
+        return output
+
+    spec = manifest["output"]
+    quantities = spec["quantities"] if quantities is None else quantities
+    unknown = set(quantities) - set(spec["quantities"])
+    if unknown:
+        raise ValueError(f"Unknown quantities: {', '.join(sorted(unknown))}")
+
+    columns = {}
+    for quantity in quantities:
+        values = _load_array(fit_dir / "output" / f"{quantity}.npy", mmap_mode=mmap_mode)
+        for i, state in enumerate(spec["states"]):
+            columns[(state, quantity)] = values[:, i]
+
+    index = pd.Index(
+        _load_array(fit_dir / "output_index.npy", mmap_mode=mmap_mode), name=spec["index_name"]
+    )
+    output = pd.DataFrame(columns, index=index)
+    order = [tuple(c) for c in spec["columns"] if c[1] in quantities]
+    output = output[order]
+    output.columns.names = ["state", "quantity"]
+
+    return output
+
+
+def load_fitresult_losses(fit_dir: os.PathLike, mmap_mode: Optional[str] = "r") -> pd.DataFrame:
+    """Load the losses of a saved fit result, without loading fit output or peptide data.
+
+    Args:
+        fit_dir: Fit result directory.
+        mmap_mode: Memory-map mode passed to [np.load][numpy.load] for fit results in 'npy'
+            format. Losses are not copied into memory until they are accessed.
+
+    Returns:
+        Losses DataFrame.
+
+    """
+    fit_dir = Path(fit_dir)
+    manifest = _read_manifest(fit_dir)
+    if manifest is None:
+        return csv_to_dataframe(fit_dir / "losses.csv")
+
+    spec = manifest["losses"]
+    index = pd.Index(
+        _load_array(fit_dir / "losses_index.npy", mmap_mode=mmap_mode), name=spec["index_name"]
+    )
+    values = _load_array(fit_dir / "losses.npy", mmap_mode=mmap_mode)
+
+    return pd.DataFrame(values, index=index, columns=spec["columns"], copy=False)
+
+
+def _load_hdxm_set_npy(fit_dir: Path, manifest: dict) -> pyhdx.models.HDXMeasurementSet:
+    """Loads the HDX measurements of a fit result in 'npy' format."""
+    hdxm_list = []
+    for i, spec in enumerate(manifest["states"]):
+        state_dir = fit_dir / "states" / str(i)
+        fields = {field: _load_array(state_dir / f"{field}.npy") for field in spec["fields"]}
+        data = pd.DataFrame(
+            {k: np.repeat(v, spec["Nt"]) if v.ndim == 1 else v.ravel() for k, v in fields.items()}
+        )
+        hdxm_list.append(pyhdx.models.HDXMeasurement(data, **spec["metadata"]))
+
+    return pyhdx.models.HDXMeasurementSet(hdxm_list)
+
+
+def load_fitresult(
+    fit_dir: os.PathLike, mmap_mode: Optional[str] = "r"
+) -> Union[TorchFitResult, TorchFitResultSet]:
     """Load a fitresult.
 
     The fit result must be in the format as generated by saving a fit result with `save_fitresult`.
 
     Args:
         fir_dir: Fit result directory.
+        mmap_mode: Memory-map mode passed to [np.load][numpy.load] for loading losses of fit
+            results in 'npy' format.
 
     Returns:
         Fit result object.
 
     """
     pth = Path(fit_dir)
-    if pth.is_dir():
+    manifest = _read_manifest(pth) if pth.is_dir() else None
+    if manifest is not None:
+        fit_result = load_fitresult_output(pth, quantities=["_dG"], mmap_mode=mmap_mode)
+        losses = load_fitresult_losses(pth, mmap_mode=mmap_mode)
+        fit_result.attrs["metadata"] = manifest["metadata"]
+
+        data_obj = _load_hdxm_set_npy(pth, manifest)
+        result_klass = pyhdx.fitting_torch.TorchFitResult
+    elif pth.is_dir():
         fit_result = csv_to_dataframe(fit_dir / "fit_result.csv")
         losses = csv_to_dataframe(fit_dir / "losses.csv")
 
@@ -1,3 +1,5 @@
+import warnings
+
 import numpy as np
 from symfit import Parameter, Variable, Model, exp
 from scipy.optimize import fsolve
@@ -177,34 +179,19 @@ class TwoComponentAssociationModel(SingleKineticModel):
         ----------
         params
 
-        key value where keys are the dummy names
+        key value where keys are the dummy names. Values can be scalars or arrays of parameters of
+        multiple blocks.
 
         Returns
         -------
 
         """
 
-        # todo generalize duplicate code for other models
         r = params[self.names["r"]]
         k1 = params[self.names["k1"]]
         k2 = params[self.names["k2"]]
 
-        # tau = r * tau1 + (1 - r) * tau2
-
-        x0 = k1 if r > 0.5 else k2
-
-        t_log = fsolve(self.min_func, np.log(x0), args=(k1, k2, r))
-        try:
-            assert (
-                np.round(self.min_func(t_log, k1, k2, r), 5) == 0
-            ), "Failed to find half life root"
-        except AssertionError:
-            print("uhoh")
-            print(k1, k2, r)
-            print(np.round(self.min_func(t_log, k1, k2, r), 5) == 0)
-        k = (np.log(2) / np.exp(t_log)).item()
-
-        return k
+        return _half_life_rate(k1, k2, r)
 
     def get_tau(self, **params):
         """
@@ -332,34 +319,19 @@ class TwoComponentDissociationModel(SingleKineticModel):
         ----------
         params
 
-        key value where keys are the dummy names
+        key value where keys are the dummy names. Values can be scalars or arrays of parameters of
+        multiple blocks.
 
         Returns
         -------
 
         """
 
-        # todo generalize duplicate code for other models
         r = params[self.names["r"]]
         k1 = params[self.names["k1"]]
         k2 = params[self.names["k2"]]
 
-        # tau = r * tau1 + (1 - r) * tau2
-
-        x0 = k1 if r > 0.5 else k2
-
-        t_log = fsolve(self.min_func, np.log(x0), args=(k1, k2, r))
-        try:
-            assert (
-                np.round(self.min_func(t_log, k1, k2, r), 5) == 0
-            ), "Failed to find half life root"
-        except AssertionError:
-            print("uhoh")
-            print(k1, k2, r)
-            print(np.round(self.min_func(t_log, k1, k2, r), 5) == 0)
-        k = np.asscalar(np.log(2) / np.exp(t_log))
-
-        return k
+        return _half_life_rate(k1, k2, r)
 
     def get_tau(self, **params):
         """
@@ -427,6 +399,65 @@ class OneComponentDissociationModel(SingleKineticModel):
         return 1 / k
 
 
+def two_component_half_life(k1, k2, r, tol=1e-10, max_iter=100):
+    """
+    Time at which two-component kinetics reach 50%, vectorized over arrays of parameters.
+
+    Solves `r * exp(-k1 * t) + (1 - r) * exp(-k2 * t) = 0.5` by bisection on log(t). The root is
+    bracketed by the half-lives of the fastest and the slowest component.
+
+    Parameters
+    ----------
+    k1 : array_like
+        Rate constants of the first component.
+    k2 : array_like
+        Rate constants of the second component.
+    r : array_like
+        Relative amplitudes of the first component.
+    tol : :obj:`float`
+        Tolerance on log(t).
+    max_iter : :obj:`int`
+        Maximum number of bisection iterations.
+
+    Returns
+    -------
+    t_half : :class:`~numpy.ndarray`
+        Half-life times, NaN where no root was found.
+    converged : :class:`~numpy.ndarray`
+        Boolean array which is `True` where a root was found.
+
+    """
+    k1, k2, r = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in [k1, k2, r]))
+    valid = (k1 > 0) & (k2 > 0) & (r >= 0) & (r <= 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lower = np.where(valid, np.log(np.log(2) / np.maximum(k1, k2)), 0.0)
+        upper = np.where(valid, np.log(np.log(2) / np.minimum(k1, k2)), 0.0)
+
+    for _ in range(max_iter):
+        t_log = (lower + upper) / 2
+        t = np.exp(t_log)
+        above = r * np.exp(-k1 * t) + (1 - r) * np.exp(-k2 * t) > 0.5
+        lower = np.where(above, t_log, lower)
+        upper = np.where(above, upper, t_log)
+        if np.all(upper - lower < tol):
+            break
+
+    converged = valid & (upper - lower < tol)
+    t_half = np.where(converged, np.exp((lower + upper) / 2), np.nan)
+
+    return t_half, converged
+
+
+def _half_life_rate(k1, k2, r):
+    t_half, converged = two_component_half_life(k1, k2, r)
+    if not np.all(converged):
+        warnings.warn(f"Failed to find half life root for {np.sum(~converged)} parameter set(s)")
+    k = np.log(2) / t_half
+
+    return k.item() if k.ndim == 0 else k
+
+
 def func_short_dis(k, tt, A):
     """
     Function to estimate the fast time component
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import warnings
 from collections import namedtuple
 from dataclasses import dataclass, field
 from functools import partial
@@ -9,6 +10,7 @@ import numpy as np
 import pandas as pd
 import torch
 from dask.distributed import Client, worker_client
+from scipy import linalg
 from scipy.optimize import Bounds, minimize, OptimizeResult
 from symfit import Fit
 from symfit.core.minimizers import DifferentialEvolution, Powell
@@ -18,16 +20,20 @@ from pyhdx.fit_models import (
     SingleKineticModel,
     TwoComponentAssociationModel,
     TwoComponentDissociationModel,
+    two_component_half_life,
 )
-from pyhdx.fitting_torch import DeltaGFit, TorchFitResult
-from pyhdx.local_cluster import DummyClient
+from pyhdx.fitting_torch import DeltaGFit, LevenbergMarquardt, TorchFitResult
+from pyhdx.local_cluster import DummyClient, PoolClient, ThreadPoolClient
 from pyhdx.support import temporary_seed, pbar_decorator, multiindex_astype
-from pyhdx.models import HDXMeasurementSet, HDXTimepoint, HDXMeasurement
+from pyhdx.models import HDXMeasurementSet, HDXTimepoint, HDXMeasurement, PackedCoverage
 from pyhdx.config import cfg
 
 EmptyResult = namedtuple("EmptyResult", ["chi_squared", "params"])
 er = EmptyResult(np.nan, {k: np.nan for k in ["tau1", "tau2", "r"]})
 
+# Result of batched kinetics fits, with the attributes of symfit FitResults used by KineticsFitResult
+KineticsResult = namedtuple("KineticsResult", ["chi_squared", "params"])
+
 
 # Reguarlizers act on ΔG values, which are in kJ/mol and range typically from 0 to 40000 J/mol.
 # Therefore they are scaled by a factor 10000 such that they are near one (as D values are also near one)
@@ -44,8 +50,20 @@ R2 = 1
 
 optimizer_defaults = {
     "SGD": {"lr": 1e4, "momentum": 0.5, "nesterov": True},
+    "LBFGS": {
+        "lr": 1,
+        "max_iter": 20,
+        "history_size": 20,
+        "line_search_fn": "strong_wolfe",
+        "tolerance_grad": 1e-12,
+        "tolerance_change": 1e-12,
+    },
+    "LevenbergMarquardt": {"damping": 1e-3},
 }
 
+# Optimizers provided by PyHDX, other optimizers are taken from torch.optim
+OPTIMIZERS = {"LevenbergMarquardt": LevenbergMarquardt}
+
 # ------------------------------------- #
 # Rates fitting
 # ------------------------------------- #
@@ -91,13 +109,20 @@ def _prepare_wt_avg_fit(hdxm, model_type="association", bounds=None):
 
     """
     bounds = bounds or get_bounds(hdxm.timepoints)
+    d_list, intervals = _wt_avg_blocks(hdxm)
+    models = [_make_kinetics_model(model_type, bounds) for _ in d_list]
+
+    return d_list, intervals, models
 
+
+def _wt_avg_blocks(hdxm):
+    """Weighted averaged D-uptake of each block of residues with equal peptide coverage and the
+    intervals (inclusive, exclusive) of the blocks"""
     arr = hdxm.rfu_residues.to_numpy()  # Data array
     i = 0
     # because intervals are inclusive, exclusive we need to add an extra entry to r_number for the final exclusive bound
     r_excl = np.append(hdxm.coverage.r_number, [hdxm.coverage.r_number[-1] + 1])
 
-    models = []
     intervals = []  # Intervals; (start, end); (inclusive, exclusive)
     d_list = []
     for bl in hdxm.coverage.block_length:
@@ -107,18 +132,18 @@ def _prepare_wt_avg_fit(hdxm, model_type="association", bounds=None):
             continue
         intervals.append((r_excl[i], r_excl[i + bl]))
         d_list.append(d)
-        if model_type == "association":
-            model = TwoComponentAssociationModel(bounds)
-        elif model_type == "dissociation":
-            model = TwoComponentDissociationModel(bounds)
-        else:
-            raise ValueError("Invalid model type {}".format(model_type))
-        # res = EmptyResult(np.nan, {p.name: np.nan for p in model.sf_model.params})
-
-        models.append(model)
         i += bl  # increment in block length does not equal move to the next start position
 
-    return d_list, intervals, models
+    return d_list, intervals
+
+
+def _make_kinetics_model(model_type, bounds):
+    if model_type == "association":
+        return TwoComponentAssociationModel(bounds)
+    elif model_type == "dissociation":
+        return TwoComponentDissociationModel(bounds)
+    else:
+        raise ValueError("Invalid model type {}".format(model_type))
 
 
 def fit_rates_half_time_interpolate(hdxm):
@@ -154,7 +179,13 @@ def fit_rates_half_time_interpolate(hdxm):
 
 
 def fit_rates_weighted_average(
-    hdxm, bounds=None, chisq_thd=0.20, model_type="association", client=None, pbar=None
+    hdxm,
+    bounds=None,
+    chisq_thd=0.20,
+    model_type="association",
+    client=None,
+    pbar=None,
+    method="symfit",
 ):
     """
     Fit a model specified by 'model_type' to D-uptake kinetics. D-uptake is weighted averaged across peptides per
@@ -173,9 +204,15 @@ def fit_rates_weighted_average(
         Controls delegation of fitting tasks to Dask clusters. Options are: `None`: Do not use task, fitting is done
         in the local thread in a for loop. :class: Dask Client : Uses the supplied Dask client to schedule fitting task.
         `worker_client`: The function was ran by a Dask worker and the additional fitting tasks created are scheduled
-        on the same Cluster.
+        on the same Cluster. Local clients from :mod:`~pyhdx.local_cluster` (:class:`~pyhdx.local_cluster.DummyClient`,
+        :class:`~pyhdx.local_cluster.ThreadPoolClient`, :class:`~pyhdx.local_cluster.ProcessPoolClient`) can be used
+        in place of a Dask client. Only used by the 'symfit' method.
     pbar:
         Not implemented
+    method : :obj:`str`
+        Either 'symfit' (default) to fit each block separately with :func:`fit_kinetics`, or 'batch' to
+        fit all blocks at once with :func:`fit_kinetics_batch`. The 'batch' method is much faster, but
+        its rates can differ from those of the 'symfit' method by a few percent.
 
     Returns
     -------
@@ -183,6 +220,24 @@ def fit_rates_weighted_average(
     fit_result : :class:`~pyhdx.fitting.KineticsFitResult`
 
     """
+    if method == "batch":
+        bounds = bounds or get_bounds(hdxm.timepoints)
+        d_list, intervals = _wt_avg_blocks(hdxm)
+        model = _make_kinetics_model(model_type, bounds)
+        params, chi_squared = fit_kinetics_batch(
+            hdxm.timepoints, np.array(d_list), bounds, model_type=model_type, chisq_thd=chisq_thd
+        )
+
+        # All blocks share a single model, parameters are stored by the model's parameter names
+        names = [model.names[name] for name in ["k1", "k2", "r"]]
+        results = [
+            KineticsResult(chisq, dict(zip(names, p))) for p, chisq in zip(params, chi_squared)
+        ]
+
+        return KineticsFitResult(hdxm, intervals, results, [model] * len(results))
+    elif method != "symfit":
+        raise ValueError(f"Invalid method {method!r}, must be 'batch' or 'symfit'")
+
     d_list, intervals, models = _prepare_wt_avg_fit(hdxm, model_type=model_type, bounds=bounds)
     if pbar:
         raise NotImplementedError()
@@ -198,13 +253,13 @@ def fit_rates_weighted_average(
     else:
         iterables = [[hdxm.timepoints] * len(d_list), d_list, models]
 
-        if isinstance(client, Client):
-            futures = client.map(fit_kinetics, *iterables, chisq_thd=chisq_thd)
-            results = client.gather(futures)
-        elif client == "worker_client":
+        if client == "worker_client":
             with worker_client() as client:
                 futures = client.map(fit_kinetics, *iterables, chisq_thd=chisq_thd)
                 results = client.gather(futures)
+        else:
+            futures = client.map(fit_kinetics, *iterables, chisq_thd=chisq_thd)
+            results = client.gather(futures)
 
     fit_result = KineticsFitResult(hdxm, intervals, results, models)
 
@@ -244,7 +299,9 @@ def fit_d_uptake(
     bounds: Union[Bounds, list[tuple[Optional[float], Optional[float]]], None, bool] = True,
     repeats=10,
     verbose=True,
-    client: Union[Client, Literal["worker_client"], DummyClient, None] = None,
+    client: Union[Client, Literal["worker_client"], DummyClient, PoolClient, None] = None,
+    method: str = "L-BFGS-B",
+    chunk_size: Optional[int] = None,
 ) -> DUptakeFitResult:
     """
     Fit residue-level D-uptake to a HDX measurement of multiple timepoints or a single HDX
@@ -259,6 +316,17 @@ def fit_d_uptake(
             tuples or scipy bounds object.
         repeats: Number of times to repeat the fit.
         verbose: Show/hide progress bar
+        client: Client to schedule fits of each timepoint and repeat, either a Dask client,
+            'worker_client' when running on a Dask worker, or a local client such as
+            [ThreadPoolClient][local_cluster.ThreadPoolClient] or
+            [ProcessPoolClient][local_cluster.ProcessPoolClient]. Default is `None`, which
+            fits in the current thread.
+        method: Minimization method. Either 'admm' to use the dedicated total variation solver
+            [tv_least_squares][fitting.tv_least_squares], or the name of a scipy minimize method.
+            With 'admm', all timepoints and repeats are solved together in the current process
+            and `client` is not used.
+        chunk_size: Maximum number of fits (timepoints times repeats) solved together with the
+            'admm' method, to limit memory usage. Default is `None`, which solves all at once.
 
     Returns:
         D-Uptake fit result object.
@@ -282,29 +350,36 @@ def fit_d_uptake(
     pbar = tqdm(total=Nt * repeats, disable=not verbose)
     pbar_wrapper = pbar_decorator(pbar)
 
-    for Ni, hdx_t in enumerate(iterable):
-        X = hdx_t.X
-        d_uptake = hdx_t.data["uptake_corrected"].values
-        pfunc = partial(_fit_single_d_update, X, d_uptake, guess=guess, r1=r1, bounds=bounds)
-        if isinstance(client, DummyClient):
-            pbar_func = pbar_wrapper(pfunc)
-        else:
-            pbar_func = pfunc
-
-        if client == "worker_client":
-            with worker_client() as c:
-                futures = [c.submit(pbar_func, pure=False) for r in range(repeats)]
-                results = c.gather(futures)
-        else:
-            futures = [client.submit(pbar_func, pure=False) for r in range(repeats)]
-            results = client.gather(futures)
+    if method == "admm":
+        _fit_d_uptake_batch(
+            list(iterable), out, mse_arr, reg_arr, guess, r1, bounds, chunk_size, pbar
+        )
+    else:
+        for Ni, hdx_t in enumerate(iterable):
+            X = hdx_t.X
+            d_uptake = hdx_t.data["uptake_corrected"].values
+            pfunc = partial(
+                _fit_single_d_update, X, d_uptake, guess=guess, r1=r1, bounds=bounds, method=method
+            )
+            if isinstance(client, (DummyClient, ThreadPoolClient)):
+                pbar_func = pbar_wrapper(pfunc)
+            else:
+                pbar_func = pfunc
+
+            if client == "worker_client":
+                with worker_client() as c:
+                    futures = [c.submit(pbar_func, pure=False) for r in range(repeats)]
+                    results = c.gather(futures)
+            else:
+                futures = [client.submit(pbar_func, pure=False) for r in range(repeats)]
+                results = client.gather(futures)
 
-        for r, (res, mse_loss, reg_loss) in enumerate(results):
-            out[Ni, r, :] = res.x
-            mse_arr[Ni, r] = mse_loss
-            reg_arr[Ni, r] = reg_loss
+            for r, (res, mse_loss, reg_loss) in enumerate(results):
+                out[Ni, r, :] = res.x
+                mse_arr[Ni, r] = mse_loss
+                reg_arr[Ni, r] = reg_loss
 
-            # futures = client.map(pbar_func)
+                # futures = client.map(pbar_func)
 
     # if client is None:
     #     for d, model in zip(d_list, models):
@@ -330,7 +405,7 @@ def fit_d_uptake(
     #
     #         pbar.update()
 
-    metadata = {"r1": r1, "repeats": repeats}
+    metadata = {"r1": r1, "repeats": repeats, "method": method}
     result = DUptakeFitResult(
         result=out.squeeze(),
         mse_loss=mse_arr.squeeze(),
@@ -344,6 +419,56 @@ def fit_d_uptake(
     ...
 
 
+def _fit_d_uptake_batch(
+    hdx_t_list: list[HDXTimepoint],
+    out: np.ndarray,
+    mse_arr: np.ndarray,
+    reg_arr: np.ndarray,
+    guess: Optional[np.ndarray] = None,
+    r1: float = 1.0,
+    bounds: Union[Bounds, list[tuple[Optional[float], Optional[float]]], None, bool] = True,
+    chunk_size: Optional[int] = None,
+    pbar: Optional[tqdm] = None,
+) -> None:
+    """
+    Fit residue-level D-uptake to all timepoints and repeats at once with the ADMM solver.
+
+    Fit results and losses are written to `out` (Nt, repeats, Nr), `mse_arr` and `reg_arr`
+    (Nt, repeats).
+
+    """
+    Nt, repeats, Nr = out.shape
+    A_list = [hdx_t.X for hdx_t in hdx_t_list]
+    b_list = [hdx_t.data["uptake_corrected"].values for hdx_t in hdx_t_list]
+    index = np.repeat(np.arange(Nt), repeats)  # Timepoint index of each fit
+    x0 = (
+        np.random.uniform(size=(Nt * repeats, Nr))
+        if guess is None
+        else np.tile(guess, (Nt * repeats, 1))
+    )
+
+    out_flat = out.reshape(Nt * repeats, Nr)
+    chunk_size = chunk_size or len(index)
+    for i in range(0, len(index), chunk_size):
+        chunk = slice(i, i + chunk_size)
+        timepoints, chunk_index = np.unique(index[chunk], return_inverse=True)
+        x, nit, converged = _tv_admm_batch(
+            [A_list[t] for t in timepoints],
+            [b_list[t] for t in timepoints],
+            chunk_index,
+            r1,
+            bounds,
+            x0[chunk],
+        )
+        out_flat[chunk] = x
+        if pbar is not None:
+            pbar.update(len(x))
+
+    for Ni, (A, b) in enumerate(zip(A_list, b_list)):
+        mse_arr[Ni] = np.mean((out[Ni] @ A.T - b) ** 2, axis=1)
+        reg_arr[Ni] = r1 * np.mean(np.abs(np.diff(out[Ni], axis=1)), axis=1)
+
+
 def fit_single_d_update(
     hdx_t: HDXTimepoint,
     guess: Optional[np.ndarray] = None,
@@ -363,6 +488,7 @@ def _fit_single_d_update(
     guess: Optional[np.ndarray] = None,
     r1: float = 1.0,
     bounds: Union[Bounds, list[tuple[Optional[float], Optional[float]]], None, bool] = True,
+    method: str = "L-BFGS-B",
     **kwargs: Any,
 ) -> tuple[OptimizeResult, float, float]:
     """
@@ -375,7 +501,9 @@ def _fit_single_d_update(
         bounds: Optional bounds. Default is `True`, which are bounds [0, 1] for all elements.
             Set to `False` or `None` to disable. Custom bounds can be supplied as list of
             tuples or scipy bounds object.
-        **kwargs: Additional kwargs to pass to scipy's minimize.
+        method: Either 'admm' to use [tv_least_squares][fitting.tv_least_squares], or the name of
+            a scipy minimize method.
+        **kwargs: Additional kwargs to pass to scipy's minimize or to `tv_least_squares`.
 
     Returns:
 
@@ -390,17 +518,209 @@ def _fit_single_d_update(
     elif bounds == False:
         bounds = None
 
-    args = (X, d_uptake, r1)
-    minimize_options = {"method": "L-BFGS-B"}
-    minimize_options.update(kwargs)
     x0 = guess or np.random.uniform(size=Nr)
-    res = minimize(d_uptake_cost_func, x0, args=args, bounds=bounds, **minimize_options)
+    if method == "admm":
+        res = tv_least_squares(X, d_uptake, r1, bounds=bounds, x0=x0, **kwargs)
+    else:
+        args = (X, d_uptake, r1)
+        minimize_options = {"method": method}
+        minimize_options.update(kwargs)
+        res = minimize(d_uptake_cost_func, x0, args=args, bounds=bounds, **minimize_options)
     mse_loss = np.mean((X.dot(res.x) - d_uptake) ** 2)
     reg_loss = r1 * np.mean(np.abs(np.diff(res.x)))
 
     return res, mse_loss, reg_loss
 
 
+def tv_least_squares(
+    A: np.ndarray,
+    b: np.ndarray,
+    r1: float,
+    bounds: Union[Bounds, list[tuple[Optional[float], Optional[float]]], None] = None,
+    x0: Optional[np.ndarray] = None,
+    rho: Optional[float] = None,
+    max_iter: int = 10000,
+    atol: float = 1e-6,
+    rtol: float = 1e-4,
+) -> OptimizeResult:
+    r"""
+    Minimize the residue-level D-uptake cost function
+    [d_uptake_cost_func][fitting.d_uptake_cost_func] by the alternating direction method of
+    multipliers (ADMM).
+
+    The total variation term and the bounds are split off as `z = diff(x)` and `w = x`, which are
+    updated by soft thresholding and clipping, respectively. The update of `x` requires the
+    solution of a linear system with the matrix
+
+    .. math::
+        \frac{2}{N_p} A^T A + \rho (D^T D + I)
+
+    which is banded, as each peptide covers a contiguous stretch of residues. It is factorized
+    once per value of the penalty parameter `rho`, which is adapted by residual balancing during
+    the first iterations.
+
+    Args:
+        A: Coupling matrix ('X'), connecting peptides to residues
+        b: D-uptake values per peptide
+        r1: regularization parameter
+        bounds: Optional bounds, as list of tuples or scipy bounds object.
+        x0: Initial guess of D-uptake values per residue.
+        rho: Initial ADMM penalty parameter. Defaults to the mean of the diagonal of
+            `2 A^T A / N_p`.
+        max_iter: Maximum number of iterations.
+        atol: Absolute tolerance on primal and dual residuals.
+        rtol: Relative tolerance on primal and dual residuals.
+
+    Returns:
+        Optimization result with D-uptake values per residue `x`.
+
+    """
+    x0 = None if x0 is None else np.asarray(x0, dtype=float)[np.newaxis, :]
+    x, nit, converged = _tv_admm_batch(
+        [A], [b], np.zeros(1, dtype=int), r1, bounds, x0, rho, max_iter, atol, rtol
+    )
+
+    message = "Converged" if converged[0] else "Maximum number of iterations reached"
+    result = OptimizeResult(
+        x=x[0],
+        fun=d_uptake_cost_func(x[0], A, b, r1),
+        nit=nit[0],
+        success=converged[0],
+        message=message,
+    )
+
+    return result
+
+
+def _tv_admm_batch(
+    A_list, b_list, index, r1, bounds, x0=None, rho=None, max_iter=10000, atol=1e-6, rtol=1e-4
+):
+    """
+    Solve multiple total variation regularized least squares problems by ADMM at once.
+
+    Problem `i` has coupling matrix `A_list[index[i]]` and D-uptake `b_list[index[i]]`. Problems
+    with the same coupling matrix share the factorization of the x-update matrix and the penalty
+    parameter, and their x-updates are solved together as multiple right-hand sides.
+
+    Returns arrays of the solutions (N, Nr), number of iterations (N, ) and convergence (N, ).
+    Problems are no longer updated once they have converged.
+
+    """
+    Nr = A_list[0].shape[1]
+    N = len(index)
+    lb, ub = _bounds_arrays(bounds, Nr)
+    lam = r1 / max(Nr - 1, 1)
+    groups = [np.flatnonzero(index == g) for g in range(len(A_list))]
+
+    # Diagonals of 2 A^T A / Np per coupling matrix, the k-th entry is the k-th upper diagonal
+    nonzero = np.concatenate([A != 0 for A in A_list])
+    nonzero = nonzero[nonzero.any(axis=1)]
+    start = nonzero.argmax(axis=1)
+    stop = Nr - nonzero[:, ::-1].argmax(axis=1)
+    bandwidth = max(int(np.max(stop - start, initial=1)) - 1, 1)
+    ab_ata = np.zeros((len(A_list), bandwidth + 1, Nr))
+    for g, A in enumerate(A_list):
+        for k in range(min(bandwidth + 1, Nr)):
+            ab_ata[g, bandwidth - k, k:] = 2 * np.einsum("pr,pr->r", A[:, : Nr - k], A[:, k:])
+        ab_ata[g] /= len(A)
+
+    # D^T D + I, where D is the (Nr - 1) x Nr forward difference matrix
+    dtd = np.ones(Nr)
+    dtd[:-1] += 1
+    dtd[1:] += 1
+
+    def factorize(g):
+        ab = ab_ata[g].copy()
+        ab[bandwidth] += rho[g] * dtd
+        ab[bandwidth - 1, 1:] -= rho[g]
+        return linalg.cholesky_banded(ab, check_finite=False)
+
+    def d_transpose(y):
+        pad = np.zeros((len(y), 1))
+        return np.concatenate([pad, y], axis=1) - np.concatenate([y, pad], axis=1)
+
+    if rho is None:
+        rho = np.maximum(ab_ata[:, bandwidth].mean(axis=1), np.finfo(float).eps)
+    else:
+        rho = np.full(len(A_list), rho, dtype=float)
+    cb = [factorize(g) for g in range(len(A_list))]
+    atb = np.stack([2 * A.T.dot(b) / len(A) for A, b in zip(A_list, b_list)])[index]
+
+    x = np.random.uniform(size=(N, Nr)) if x0 is None else np.array(x0, dtype=float)
+    z, w = np.diff(x, axis=1), np.clip(x, lb, ub)
+    u, v = np.zeros((N, Nr - 1)), np.zeros((N, Nr))
+    result = w.copy()
+    nit = np.full(N, max_iter)
+    converged = np.zeros(N, dtype=bool)
+    for i in range(1, max_iter + 1):
+        rho_i = rho[index][:, np.newaxis]
+        rhs = atb + rho_i * (d_transpose(z - u) + w - v)
+        for g, sel in enumerate(groups):
+            x[sel] = linalg.cho_solve_banded((cb[g], False), rhs[sel].T, check_finite=False).T
+        dx = np.diff(x, axis=1)
+
+        z_prev, w_prev = z, w
+        z = np.sign(dx + u) * np.maximum(np.abs(dx + u) - lam / rho_i, 0.0)
+        w = np.clip(x + v, lb, ub)
+        u += dx - z
+        v += x - w
+
+        primal = np.sqrt(np.sum((dx - z) ** 2, axis=1) + np.sum((x - w) ** 2, axis=1))
+        dual = rho_i[:, 0] * np.linalg.norm(d_transpose(z - z_prev) + w - w_prev, axis=1)
+        eps_primal = np.sqrt(2 * Nr) * atol + rtol * np.maximum(
+            np.sqrt(np.sum(dx**2, axis=1) + np.sum(x**2, axis=1)),
+            np.sqrt(np.sum(z**2, axis=1) + np.sum(w**2, axis=1)),
+        )
+        eps_dual = np.sqrt(Nr) * atol + rtol * rho_i[:, 0] * np.linalg.norm(
+            d_transpose(u) + v, axis=1
+        )
+
+        done = ~converged & (primal < eps_primal) & (dual < eps_dual)
+        result[done] = w[done]
+        nit[done] = i
+        converged |= done
+        if np.all(converged):
+            break
+
+        # Residual balancing per coupling matrix; scaled dual variables are rescaled with the
+        # penalty parameter. The penalty parameter is fixed after a number of iterations to
+        # guarantee convergence
+        if i % 10 != 0 or i > 1000:
+            continue
+        for g, sel in enumerate(groups):
+            sel = sel[~converged[sel]]
+            primal_g, dual_g = np.linalg.norm(primal[sel]), np.linalg.norm(dual[sel])
+            if primal_g > 10 * dual_g or dual_g > 10 * primal_g:
+                factor = 2.0 if primal_g > dual_g else 0.5
+                rho[g] *= factor
+                u[sel] /= factor
+                v[sel] /= factor
+                cb[g] = factorize(g)
+
+    result[~converged] = w[~converged]
+
+    return result, nit, converged
+
+
+def _bounds_arrays(bounds, N):
+    """Lower and upper bound arrays from scipy Bounds or a list of (min, max) tuples. `True` gives
+    bounds [0, 1], `False` or `None` no bounds"""
+    if bounds is True:
+        return np.zeros(N), np.ones(N)
+    elif bounds is None or bounds is False:
+        return np.full(N, -np.inf), np.full(N, np.inf)
+    elif isinstance(bounds, Bounds):
+        lb, ub = bounds.lb, bounds.ub
+    else:
+        lb, ub = zip(*bounds)
+        lb = [-np.inf if value is None else value for value in lb]
+        ub = [np.inf if value is None else value for value in ub]
+
+    return np.broadcast_to(np.asarray(lb, dtype=float), N), np.broadcast_to(
+        np.asarray(ub, dtype=float), N
+    )
+
+
 def fit_rates(hdxm, method="wt_avg", **kwargs):
     """
     Fit observed rates of exchange to HDX-MS data in `hdxm`
@@ -470,6 +790,160 @@ def fit_kinetics(t, d, model, chisq_thd=100):
     return res
 
 
+def fit_kinetics_batch(
+    t, d, bounds, model_type="association", chisq_thd=100, n_grid=5, max_iter=200
+):
+    """
+    Fit time kinetics with two time components and corresponding relative amplitude to multiple
+    uptake curves at once.
+
+    All curves are fitted simultaneously by a bounded Levenberg-Marquardt algorithm, vectorized
+    over curves. Curves of which the chi squared is above `chisq_thd` are refitted from a grid of
+    starting points, and the best result is kept.
+
+    Parameters
+    ----------
+    t : :class:`~numpy.ndarray`
+        Array of time points, shape (Nt, ).
+    d : :class:`~numpy.ndarray`
+        Array of uptake values, shape (N, Nt).
+    bounds : :obj:`tuple`
+        Lower and upper bounds of the rate constants.
+    model_type : :obj:`str`
+        Either 'association' or 'dissociation'.
+    chisq_thd : :obj:`float`
+        Threshold chi squared above which fitting is repeated from a grid of starting points.
+    n_grid : :obj:`int`
+        Number of rate constants and amplitudes in the grid of starting points.
+    max_iter : :obj:`int`
+        Maximum number of iterations.
+
+    Returns
+    -------
+    params : :class:`~numpy.ndarray`
+        Fitted rate constants k1, k2 and amplitude r, shape (N, 3).
+    chi_squared : :class:`~numpy.ndarray`
+        Sum of squared residuals, shape (N, ).
+
+    """
+    if model_type not in ["association", "dissociation"]:
+        raise ValueError("Invalid model type {}".format(model_type))
+    t = np.asarray(t, dtype=float)
+    d = np.atleast_2d(np.asarray(d, dtype=float))
+    if np.any(np.isnan(d)):
+        raise ValueError("There shouldnt be NaNs anymore")
+
+    # Rate constants are fitted on a log scale
+    lower = np.array([np.log(bounds[0]), np.log(bounds[0]), 0.0])
+    upper = np.array([np.log(bounds[1]), np.log(bounds[1]), 1.0])
+
+    x0 = _kinetics_initial_guess(t, d, lower, upper)
+    x, chi_squared = _kinetics_lm(t, d, x0, lower, upper, model_type, max_iter)
+
+    retry = ~(chi_squared <= chisq_thd)
+    if np.any(retry):
+        k_space = np.linspace(lower[0], upper[0], num=n_grid)
+        r_space = np.linspace(0.1, 0.9, num=n_grid)
+        grid = np.array(
+            [
+                (k1, k2, r)
+                for i, k1 in enumerate(k_space)
+                for k2 in k_space[i + 1 :]
+                for r in r_space
+            ]
+        )
+        N, S = np.count_nonzero(retry), len(grid)
+
+        x_grid, chi_grid = _kinetics_lm(
+            t,
+            np.repeat(d[retry], S, axis=0),
+            np.tile(grid, (N, 1)),
+            lower,
+            upper,
+            model_type,
+            max_iter,
+        )
+        chi_grid = np.nan_to_num(chi_grid, nan=np.inf).reshape(N, S)
+        best = np.argmin(chi_grid, axis=1)
+        x_best = x_grid.reshape(N, S, 3)[np.arange(N), best]
+        chi_best = chi_grid[np.arange(N), best]
+
+        improved = ~(chi_squared[retry] <= chi_best)
+        idx = np.flatnonzero(retry)[improved]
+        x[idx] = x_best[improved]
+        chi_squared[idx] = chi_best[improved]
+
+    params = np.column_stack([np.exp(x[:, :2]), x[:, 2]])
+
+    return params, chi_squared
+
+
+def _kinetics_initial_guess(t, d, lower, upper):
+    """Vectorized version of the initial guesses of
+    :meth:`~pyhdx.fit_models.TwoComponentAssociationModel.initial_guess`"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k1 = -np.log(1 - d[:, 2]) / t[2]
+        k1 = np.where(np.isfinite(k1) & (k1 > 0), k1, 1 / 2)
+        k2 = -np.log(2 * (1 - d[:, -2]) - np.exp(-k1 * t[-2])) / t[-2]
+        k2 = np.where(np.isfinite(k2) & (k2 > 0), k2, 1 / 20)
+
+    x0 = np.column_stack([np.log(k1), np.log(k2), np.full(len(d), 0.5)])
+
+    return np.clip(x0, lower, upper)
+
+
+def _two_component_kinetics(t, x, model_type):
+    """Two component kinetics and its Jacobian with respect to log(k1), log(k2) and r"""
+    k1, k2, r = np.exp(x[:, 0:1]), np.exp(x[:, 1:2]), x[:, 2:3]
+    e1, e2 = np.exp(-k1 * t), np.exp(-k2 * t)
+
+    y = r * e1 + (1 - r) * e2
+    jacobian = np.stack([-r * t * k1 * e1, -(1 - r) * t * k2 * e2, e1 - e2], axis=-1)
+    if model_type == "association":
+        return 1 - y, -jacobian
+    else:
+        return y, jacobian
+
+
+def _kinetics_lm(t, d, x, lower, upper, model_type, max_iter, tol=1e-10):
+    """Bounded Levenberg-Marquardt minimization of the squared residuals of each row of `d`"""
+    x = x.copy()
+    damping = np.full(len(x), 1e-3)
+    y, jacobian = _two_component_kinetics(t, x, model_type)
+    residuals = y - d
+    cost = np.sum(residuals**2, axis=1)
+
+    for _ in range(max_iter):
+        gradient = np.einsum("btp,bt->bp", jacobian, residuals)
+        jtj = np.einsum("btp,btq->bpq", jacobian, jacobian)
+
+        # Parameters at a bound with the gradient pointing outwards are kept fixed
+        free = ~(((x <= lower) & (gradient > 0)) | ((x >= upper) & (gradient < 0)))
+        jtj = jtj * (free[:, :, np.newaxis] & free[:, np.newaxis, :])
+        diagonal = np.maximum(np.diagonal(jtj, axis1=1, axis2=2), 1e-12)
+        lhs = jtj + (damping[:, np.newaxis] * diagonal + ~free)[:, :, np.newaxis] * np.eye(3)
+        step = np.linalg.solve(lhs, -(gradient * free)[..., np.newaxis])[..., 0]
+
+        x_new = np.clip(x + step, lower, upper)
+        y_new, jacobian_new = _two_component_kinetics(t, x_new, model_type)
+        residuals_new = y_new - d
+        cost_new = np.sum(residuals_new**2, axis=1)
+
+        accept = cost_new < cost
+        converged = (np.abs(x_new - x).max(axis=1) < tol) | (damping > 1e10)
+
+        x[accept] = x_new[accept]
+        jacobian[accept] = jacobian_new[accept]
+        residuals[accept] = residuals_new[accept]
+        cost[accept] = cost_new[accept]
+        damping = np.where(accept, damping / 3, damping * 10)
+
+        if np.all(converged):
+            break
+
+    return x, cost
+
+
 def check_bounds(fit_result):
     """Check if the obtained fit result is within bounds"""
     for param in fit_result.model.params:
@@ -486,6 +960,91 @@ def check_bounds(fit_result):
 # ------------------------------------- #
 
 
+def get_optimizer(name):
+    """
+    Get optimizer class by name.
+
+    Parameters
+    ----------
+    name : :obj:`str`
+        Name of the optimizer, either 'LevenbergMarquardt' or the name of an optimizer in
+        :mod:`torch.optim`, e.g. 'SGD' or 'LBFGS'.
+
+    Returns
+    -------
+    optimizer_klass : :class:`~torch.optim.Optimizer`
+
+    """
+    try:
+        return OPTIMIZERS[name]
+    except KeyError:
+        pass
+    try:
+        return getattr(torch.optim, name)
+    except AttributeError:
+        raise ValueError(f"Unknown optimizer {name!r}") from None
+
+
+class LossHistory(object):
+    """
+    Bounded history of loss values per epoch.
+
+    Losses are added in blocks of consecutive epochs. When more than `max_history` epochs are
+    stored, the history is decimated by keeping only every other stored epoch, after which
+    new epochs are stored with the doubled stride. The losses of the last epoch are always kept.
+
+    Parameters
+    ----------
+    max_history : :obj:`int` or `None`
+        Maximum number of epochs to store. If `None` or 0, the losses of all epochs are stored.
+
+    """
+
+    def __init__(self, max_history=None):
+        self.max_history = max_history
+        self.stride = 1
+        self.size = 0
+        self.blocks = []
+        self.last = None
+
+    def extend(self, epochs, losses):
+        """Add losses (shape (n_epochs, n_losses, ...)) of consecutive epochs"""
+        self.last = (epochs[-1:], losses[-1:])
+        keep = (epochs - 1) % self.stride == 0
+        self.blocks.append((epochs[keep], losses[keep]))
+        self.size += keep.sum()
+
+        while self.max_history and self.size > self.max_history:
+            self.stride *= 2
+            epochs, losses = self._concatenate(self.blocks)
+            keep = (epochs - 1) % self.stride == 0
+            self.blocks = [(epochs[keep], losses[keep])]
+            self.size = keep.sum()
+
+    @staticmethod
+    def _concatenate(blocks):
+        epochs, losses = zip(*blocks)
+        return np.concatenate(epochs), np.concatenate(losses)
+
+    def _last_epoch(self):
+        return next(epochs[-1] for epochs, _ in reversed(self.blocks) if len(epochs))
+
+    def to_arrays(self):
+        """Returns arrays of the stored epoch numbers and their losses"""
+        blocks = self.blocks
+        # Blocks can be empty after decimation, compare with the last stored epoch of all blocks
+        if self.last is not None and (not self.size or self._last_epoch() != self.last[0][0]):
+            blocks = blocks + [self.last]
+
+        return self._concatenate(blocks)
+
+    def to_dataframe(self):
+        """Returns losses as :class:`~pandas.DataFrame` with epoch numbers as index"""
+        epochs, losses = self.to_arrays()
+
+        return _loss_df(losses, epochs)
+
+
 def run_optimizer(
     inputs,
     output_data,
@@ -499,11 +1058,18 @@ def run_optimizer(
     stop_loss=STOP_LOSS,
     callbacks=None,
     verbose=True,
+    check_every=None,
+    max_history=None,
 ):
     """
 
     Runs optimization/fitting of PyTorch model.
 
+    Loss values are stored on the device and transferred in blocks of `check_every` epochs, after
+    which progress is checked. Therefore, up to `check_every` - 1 more epochs may be run after
+    the termination condition is met. Returned losses end at the epoch at which the termination
+    condition was met, while the returned model has the parameters of the last epoch run.
+
     Parameters
     ----------
     inputs : :obj:`list`
@@ -516,9 +1082,12 @@ def run_optimizer(
     model : :class:`~torch.nn.Module`
         pytorch model
     criterion: callable
-        loss function
+        loss function. May return a loss per point along the leading dimension of the model
+        parameters, in which case the sum of the losses is optimized and convergence is checked
+        per point. Parameters of converged points are kept fixed while the others are optimized,
+        and the losses of each point are returned up to the epoch at which it converged.
     regularizer callable
-        regularizer function
+        regularizer function, returning losses of the same shape as `criterion`
     epochs : :obj:`int`
         Max number of epochs
     patience : :obj:`int`
@@ -529,108 +1098,276 @@ def run_optimizer(
         List of callback functions
     verbose : :obj:`bool`
         Toggle progress bar
+    check_every : :obj:`int`, optional
+        Number of epochs between transfers of loss values from the device and progress checks.
+        Defaults to the value in the 'fitting' section of the config.
+    max_history : :obj:`int`, optional
+        Maximum number of epochs for which losses are stored, see :class:`LossHistory`.
+        Defaults to the value in the 'fitting' section of the config. Pass 0 to store the
+        losses of all epochs.
 
     Returns
     -------
+    losses : :class:`~pandas.DataFrame` or :obj:`list`
+        Loss values with epoch numbers as index, or a list of these per point if `criterion`
+        returns losses per point.
+    model : :class:`~torch.nn.Module`
+        The fitted model
 
     """
 
+    check_every = check_every or cfg.fitting.check_every
+    max_history = cfg.fitting.max_history if max_history is None else max_history
+
     optimizer_obj = optimizer_klass(model.parameters(), **optimizer_kwargs)
+    if isinstance(optimizer_obj, LevenbergMarquardt):
+        # Jacobians are computed with forward-mode autodiff, which is not supported for sparse
+        # tensors. Packed data is converted to the zero-padded layout rather than to a dense
+        # (P, Ns*Nr) coupling matrix, which is Ns times larger.
+        inputs = list(inputs)
+        if isinstance(inputs[1], PackedCoverage):
+            Np = int(torch.diff(inputs[1].offsets).max())
+            output_data = inputs[1].pad(output_data, Np)
+            inputs[1] = inputs[1].to_padded(Np)
+        inputs = [x.to_dense() for x in inputs]
 
     # todo these seeds should be temporary
     np.random.seed(43)
     torch.manual_seed(43)
 
     callbacks = callbacks or []
-    losses_list = [[np.inf]]
+    history = LossHistory(max_history)
+    current_losses = []  # losses of the most recent closure evaluation
 
-    def closure():
-        output = model(*inputs)
+    names = [name for name, _ in model.named_parameters()]
+
+    def closure(params=None):
+        if params is None:
+            output = model(*inputs)
+            dG = model.dG
+        else:
+            # Parameters replaced by `params`, as used by LevenbergMarquardt for Jacobians
+            parameters = dict(zip(names, params))
+            output = torch.func.functional_call(model, parameters, tuple(inputs))
+            dG = parameters["dG"]
         loss = criterion(output, output_data)
-        losses_list.append([loss.item()])  # store mse loss
+
+        if isinstance(optimizer_obj, LevenbergMarquardt):
+            loss = loss.sum()
+            reg_loss_tuple = regularizer(dG, reduction="none")
+            if params is None:
+                current_losses[:] = [loss.detach()] + [r.detach().sum() for r in reg_loss_tuple]
+
+            # Residuals such that their sum of squares equals the mse loss plus regularization.
+            # The scaling of the squared errors by the criterion (1 / number of elements) is taken
+            # from the loss value.
+            # Regularization terms r are absolute differences, their residuals r / sqrt(r) have the
+            # (iteratively reweighted least squares) Jacobian of the absolute value with weights
+            # fixed at the current parameters.
+            eps = torch.finfo(loss.dtype).eps
+            errors = (output - output_data).flatten()
+            scale = torch.sqrt(loss.detach() / (errors.detach().square().sum() + eps))
+            residuals = [errors * scale]
+            residuals += [(r / torch.sqrt(r.detach() + eps)).flatten() for r in reg_loss_tuple]
+            return torch.cat(residuals)
+
         reg_loss_tuple = regularizer(model.dG)
+        current_losses[:] = [loss.detach()] + [r.detach() for r in reg_loss_tuple]
         for r in reg_loss_tuple:
-            loss += r
-
-        losses_list[-1] += [r.item() for r in reg_loss_tuple]  # store reg losses
+            loss = loss + r
 
+        loss = loss.sum()
         loss.backward()
         return loss
 
+    buffer = None
     stop = 0
+    previous_loss = np.inf
+    converged = np.False_
+    frozen = None  # parameter values of converged points
+    stopped_epoch = stopped_losses = None  # epochs and losses at which points converged
     iter = trange(epochs) if verbose else range(epochs)
     for epoch in iter:
         optimizer_obj.zero_grad()
         loss = optimizer_obj.step(closure)
+        if frozen is not None:
+            with torch.no_grad():
+                for p, values in zip(model.parameters(), frozen):
+                    p[mask] = values
+        # Optimizers such as LBFGS evaluate the closure multiple times per step; only store the
+        # losses of the final evaluation
+        losses = torch.stack(current_losses)
+        if buffer is None:
+            buffer = output_data.new_empty((check_every, *losses.shape))
+            per_point = losses.dim() > 1
+        buffer[epoch % check_every] = losses
 
         for cb in callbacks:
             cb(epoch, model, optimizer_obj)
 
-        diff = sum(losses_list[-2]) - sum(losses_list[-1])
-        if diff < stop_loss:
-            stop += 1
-            if stop > patience:
+        if (epoch + 1) % check_every and epoch + 1 < epochs:
+            continue
+
+        # Losses with shape (n_epochs, n_losses, n_points)
+        block = buffer[: epoch % check_every + 1].cpu().numpy().copy()
+        block = block.reshape(*block.shape[:2], -1)
+        block_epochs = np.arange(epoch - len(block) + 2, epoch + 2)
+        if stopped_epoch is None:
+            stopped_epoch = np.zeros(block.shape[2], dtype=int)
+            stopped_losses = np.empty(block.shape[1:])
+
+        n_epochs = len(block)
+        for i, total_loss in enumerate(block.sum(axis=1)):
+            diff = previous_loss - total_loss
+            previous_loss = total_loss
+            stop = np.where(diff < stop_loss, stop + 1, 0)
+            stopped = (stop > patience) & ~converged
+            stopped_epoch[stopped] = block_epochs[i]
+            stopped_losses[:, stopped] = block[i][:, stopped]
+            converged = converged | stopped
+            if np.all(converged):
+                # Losses of epochs run after the termination condition was met are not stored
+                n_epochs = i + 1
                 break
+
+        history.extend(block_epochs[:n_epochs], block[:n_epochs])
+        if np.all(converged):
+            break
+        elif np.any(converged):
+            mask = torch.as_tensor(converged, device=output_data.device)
+            frozen = [p.detach()[mask].clone() for p in model.parameters()]
+
+    epochs, losses = history.to_arrays()
+    if not per_point:
+        return _loss_df(losses[..., 0], epochs), model
+
+    # Losses of each point up to the epoch at which it converged
+    loss_dfs = []
+    for i, point_converged in enumerate(np.broadcast_to(converged, losses.shape[2:])):
+        if point_converged:
+            last_epoch, last_losses = stopped_epoch[i], stopped_losses[:, i]
         else:
-            stop = 0
+            last_epoch, last_losses = epochs[-1], losses[-1, :, i]
+        keep = epochs < last_epoch
+        loss_df = _loss_df(
+            np.vstack([losses[keep, :, i], last_losses]), np.append(epochs[keep], last_epoch)
+        )
+        loss_dfs.append(loss_df)
+
+    return loss_dfs, model
+
+
+def _reduce(reg_losses, reduction):
+    """Reduce elementwise regularization losses by taking their means or by scaling such that their
+    sums equal the means (reduction 'none')"""
+    if reduction == "mean":
+        return tuple(torch.mean(r) for r in reg_losses)
+    elif reduction == "none":
+        return tuple(r / r.numel() for r in reg_losses)
+    else:
+        raise ValueError(f"Invalid reduction {reduction!r}, must be 'mean' or 'none'")
+
 
-    return np.array(losses_list[1:]), model
+# Regularizers act on the residue (-2) and state (-3) axes of param, such that they also apply to
+# parameters with leading hyper-parameter dimensions. Regularizer values r1/r2 can be tensors
+# which broadcast with the leading dimensions.
 
 
-def regularizer_1d(r1, param):
-    reg_loss = r1 * torch.mean(torch.abs(param[:-1] - param[1:]))
-    return (reg_loss * REGULARIZATION_SCALING,)
+def regularizer_1d(r1, param, reduction="mean"):
+    reg_loss = r1 * torch.abs(param[..., :-1, :] - param[..., 1:, :]) * REGULARIZATION_SCALING
+    return _reduce((reg_loss,), reduction)
 
 
-def regularizer_2d_mean(r1, r2, param):
+def regularizer_2d_mean(r1, r2, param, reduction="mean"):
     # todo allow regularization wrt reference rather than mean
     # param shape: Ns x Nr x 1
-    d_ax1 = torch.abs(param[:, :-1, :] - param[:, 1:, :])
-    d_ax2 = torch.abs(param - torch.mean(param, axis=0))
+    d_ax1 = torch.abs(param[..., :-1, :] - param[..., 1:, :])
+    d_ax2 = torch.abs(param - torch.mean(param, axis=-3, keepdim=True))
 
-    return (
-        r1 * torch.mean(d_ax1) * REGULARIZATION_SCALING,
-        r2 * torch.mean(d_ax2) * REGULARIZATION_SCALING,
+    return _reduce(
+        (r1 * d_ax1 * REGULARIZATION_SCALING, r2 * d_ax2 * REGULARIZATION_SCALING), reduction
     )
 
 
-def regularizer_2d_reference(r1, r2, param):
-    d_ax1 = torch.abs(param[:, :-1, :] - param[:, 1:, :])
-    d_ax2 = torch.abs(param - param[0])[1:]
+def regularizer_2d_reference(r1, r2, param, reduction="mean"):
+    d_ax1 = torch.abs(param[..., :-1, :] - param[..., 1:, :])
+    d_ax2 = torch.abs(param - param[..., :1, :, :])[..., 1:, :, :]
 
-    return (
-        r1 * torch.mean(d_ax1) * REGULARIZATION_SCALING,
-        r2 * torch.mean(d_ax2) * REGULARIZATION_SCALING,
+    return _reduce(
+        (r1 * d_ax1 * REGULARIZATION_SCALING, r2 * d_ax2 * REGULARIZATION_SCALING), reduction
     )
 
 
-def regularizer_2d_aligned(r1, r2, indices, param):
+def regularizer_2d_aligned(r1, r2, indices, param, reduction="mean"):
     i0 = indices[0]
     i1 = indices[1]
-    d_ax1 = torch.abs(param[:, :-1, :] - param[:, 1:, :])
-    d_ax2 = torch.abs(param[0][i0] - param[1][i1])
+    d_ax1 = torch.abs(param[..., :-1, :] - param[..., 1:, :])
+    d_ax2 = torch.abs(param[..., 0, i0, :] - param[..., 1, i1, :])
 
-    return (
-        r1 * torch.mean(d_ax1) * REGULARIZATION_SCALING,
-        r2 * torch.mean(d_ax2) * REGULARIZATION_SCALING,
+    return _reduce(
+        (r1 * d_ax1 * REGULARIZATION_SCALING, r2 * d_ax2 * REGULARIZATION_SCALING), reduction
     )
 
 
-def _loss_df(losses_array):
+def _loss_df(losses_array, epochs=None):
     """transforms losses array to losses dataframe
     first column in losses array is mse loss, rest are regularzation losses
+    epochs are the (one-based) epoch numbers of the losses, defaults to consecutive epochs
     """
 
+    epochs = np.arange(1, len(losses_array) + 1) if epochs is None else epochs
     loss_df = pd.DataFrame(
         losses_array,
+        index=pd.Index(epochs, name="epoch"),
         columns=["mse_loss"] + [f"reg_{i + 1}" for i in range(losses_array.shape[1] - 1)],
     )
-    loss_df.index.name = "epoch"
-    loss_df.index += 1
 
     return loss_df
 
 
+def _initial_guess_single(hdxm, initial_guess):
+    """Converts initial guesses for a single HDX measurement to a numpy array of shape (Nr, )"""
+    if isinstance(initial_guess, pd.Series):
+        assert (
+            initial_guess.index.inferred_type == "integer"
+        ), "Invalid dtype for initial guess index, must be 'integer'"
+        # Map guesses to covered residue range and fill NaN gaps
+        initial_guess = initial_guess.reindex(hdxm.coverage.r_number).interpolate(
+            limit_direction="both"
+        )
+        initial_guess = initial_guess.to_numpy()
+
+    assert len(initial_guess) == hdxm.Nr, "Invalid length of initial guesses"
+    assert not np.any(np.isnan(initial_guess)), "Initial guess has NaN entries"
+
+    return initial_guess
+
+
+def _initial_guess_batch(hdx_set, initial_guess):
+    """Converts initial guesses for a set of HDX measurements to a numpy array of shape (Ns, Nr)"""
+    if isinstance(initial_guess, (pd.Series, pd.DataFrame)):
+        assert (
+            initial_guess.index.inferred_type == "integer"
+        ), "Invalid dtype for initial guess index, must be 'integer'"
+        # Map guesses to covered residue range and fill NaN gaps
+        initial_guess = initial_guess.reindex(hdx_set.coverage.index).interpolate(
+            limit_direction="both"
+        )  # TODO index vs r_number
+        initial_guess = (
+            initial_guess.to_numpy().T
+        )  # Pandas format is samples on column, need sample per row
+
+    if initial_guess.shape == (hdx_set.Nr,):
+        # Broadcast guesses to number of samples
+        initial_guess = np.broadcast_to(initial_guess, (hdx_set.Ns, hdx_set.Nr))
+    elif initial_guess.shape == (hdx_set.Ns, hdx_set.Nr):
+        pass
+    else:
+        raise ValueError("Invalid shape of initial guesses, must be (Nr, ) or (Ns, Nr")
+
+    return initial_guess
+
+
 def fit_gibbs_global(
     hdxm,
     initial_guess,
@@ -660,7 +1397,8 @@ def fit_gibbs_global(
     stop_loss: :obj:`float`
         Threshold for difference in loss between epochs when an epoch is considered to make no more progress.
     optimizer : :obj:`str`
-        Which optimizer to use. Default is Stochastic Gradient Descent. See PyTorch documentation for information.
+        Which optimizer to use. Default is Stochastic Gradient Descent. Other options are 'LBFGS',
+        'LevenbergMarquardt' or any other optimizer in :mod:`torch.optim`. See PyTorch documentation for information.
     callbacks: :obj:`list` or None
         List of callback objects. Call signature is callback(epoch, model, optimizer)
     **optimizer_kwargs
@@ -680,20 +1418,8 @@ def fit_gibbs_global(
     inputs = [tensors[key] for key in ["temperature", "X", "k_int", "timepoints"]]
     output_data = tensors["d_exp"]
 
-    if isinstance(initial_guess, pd.Series):
-        assert (
-            initial_guess.index.inferred_type == "integer"
-        ), "Invalid dtype for initial guess index, must be 'integer'"
-        # Map guesses to covered residue range and fill NaN gaps
-        initial_guess = initial_guess.reindex(hdxm.coverage.r_number).interpolate(
-            limit_direction="both"
-        )
-        initial_guess = initial_guess.to_numpy()
-
-    assert len(initial_guess) == hdxm.Nr, "Invalid length of initial guesses"
-    assert not np.any(np.isnan(initial_guess)), "Initial guess has NaN entries"
+    initial_guess = _initial_guess_single(hdxm, initial_guess)
 
-    dtype = torch.float64
     dG_par = torch.nn.Parameter(
         torch.tensor(initial_guess, dtype=cfg.TORCH_DTYPE, device=cfg.TORCH_DEVICE).unsqueeze(-1)
     )  # reshape (nr, 1)
@@ -706,12 +1432,12 @@ def fit_gibbs_global(
         **optimizer_defaults.get(optimizer, {}),
         **optimizer_kwargs,
     }  # Take defaults and override with user-specified
-    optimizer_klass = getattr(torch.optim, optimizer)
+    optimizer_klass = get_optimizer(optimizer)
 
     reg_func = partial(regularizer_1d, r1)
 
     # returned_model is the same object as model
-    losses_array, returned_model = run_optimizer(
+    losses, returned_model = run_optimizer(
         inputs,
         output_data,
         optimizer_klass,
@@ -724,7 +1450,6 @@ def fit_gibbs_global(
         stop_loss=stop_loss,
         callbacks=callbacks,
     )
-    losses = _loss_df(losses_array)
     fit_kwargs.update(optimizer_kwargs)
     hdxm_set = HDXMeasurementSet([hdxm])
     result = TorchFitResult(hdxm_set, model, losses=losses, **fit_kwargs)
@@ -767,7 +1492,8 @@ def fit_gibbs_global_batch(
     stop_loss: :obj:`float`
         Threshold for difference in loss between epochs when an epoch is considered to make no more progress.
     optimizer : :obj:`str`
-        Which optimizer to use. Default is Stochastic Gradient Descent. See PyTorch documentation for information.
+        Which optimizer to use. Default is Stochastic Gradient Descent. Other options are 'LBFGS',
+        'LevenbergMarquardt' or any other optimizer in :mod:`torch.optim`. See PyTorch documentation for information.
     callbacks: :obj:`list` or None
         List of callback objects. Call signature is callback(epoch, model, optimizer)
     **optimizer_kwargs
@@ -834,7 +1560,8 @@ def fit_gibbs_global_batch_aligned(
     stop_loss: :obj:`float`
         Threshold for difference in loss between epochs when an epoch is considered to make no more progress.
     optimizer : :obj:`str`
-        Which optimizer to use. Default is Stochastic Gradient Descent. See PyTorch documentation for information.
+        Which optimizer to use. Default is Stochastic Gradient Descent. Other options are 'LBFGS',
+        'LevenbergMarquardt' or any other optimizer in :mod:`torch.optim`. See PyTorch documentation for information.
     callbacks: :obj:`list` or None
         List of callback objects. Call signature is callback(epoch, model, optimizer)
     **optimizer_kwargs
@@ -867,26 +1594,7 @@ def _batch_fit(hdx_set, initial_guess, reg_func, fit_kwargs, optimizer_kwargs):
     inputs = [tensors[key] for key in ["temperature", "X", "k_int", "timepoints"]]
     output_data = tensors["d_exp"]
 
-    # Convert initial guess to numpy array
-    if isinstance(initial_guess, (pd.Series, pd.DataFrame)):
-        assert (
-            initial_guess.index.inferred_type == "integer"
-        ), "Invalid dtype for initial guess index, must be 'integer'"
-        # Map guesses to covered residue range and fill NaN gaps
-        initial_guess = initial_guess.reindex(hdx_set.coverage.index).interpolate(
-            limit_direction="both"
-        )  # TODO index vs r_number
-        initial_guess = (
-            initial_guess.to_numpy().T
-        )  # Pandas format is samples on column, need sample per row
-
-    if initial_guess.shape == (hdx_set.Nr,):
-        # Broadcast guesses to number of samples
-        initial_guess = np.broadcast_to(initial_guess, (hdx_set.Ns, hdx_set.Nr))
-    elif initial_guess.shape == (hdx_set.Ns, hdx_set.Nr):
-        pass
-    else:
-        raise ValueError("Invalid shape of initial guesses, must be (Nr, ) or (Ns, Nr")
+    initial_guess = _initial_guess_batch(hdx_set, initial_guess)
 
     dG_par = torch.nn.Parameter(
         torch.tensor(initial_guess, dtype=cfg.TORCH_DTYPE, device=cfg.TORCH_DEVICE).reshape(
@@ -895,18 +1603,21 @@ def _batch_fit(hdx_set, initial_guess, reg_func, fit_kwargs, optimizer_kwargs):
     )
 
     model = DeltaGFit(dG_par)
-    criterion = torch.nn.MSELoss(reduction="mean")
+    if isinstance(tensors["X"], PackedCoverage):
+        criterion = partial(padded_mse_loss, numel=_padded_numel(hdx_set, tensors))
+    else:
+        criterion = torch.nn.MSELoss(reduction="mean")
 
     # Take default optimizer kwargs and update them with supplied kwargs
     optimizer_kwargs = {
         **optimizer_defaults.get(fit_kwargs["optimizer"], {}),
         **optimizer_kwargs,
     }  # Take defaults and override with user-specified
-    optimizer_klass = getattr(torch.optim, fit_kwargs["optimizer"])
+    optimizer_klass = get_optimizer(fit_kwargs["optimizer"])
 
     loop_kwargs = {k: fit_kwargs[k] for k in ["epochs", "patience", "stop_loss"]}
     loop_kwargs["callbacks"] = fit_kwargs.pop("callbacks")
-    losses_array, returned_model = run_optimizer(
+    losses, returned_model = run_optimizer(
         inputs,
         output_data,
         optimizer_klass,
@@ -916,13 +1627,286 @@ def _batch_fit(hdx_set, initial_guess, reg_func, fit_kwargs, optimizer_kwargs):
         reg_func,
         **loop_kwargs,
     )
-    losses = _loss_df(losses_array)
     fit_kwargs.update(optimizer_kwargs)
     result = TorchFitResult(hdx_set, model, losses=losses, **fit_kwargs)
 
     return result
 
 
+def _padded_numel(hdx_set, tensors):
+    """Number of elements of zero-padded D-uptake data if `tensors` are in the packed layout, such
+    that losses are equal to those of other layouts"""
+    if isinstance(tensors["X"], PackedCoverage):
+        return hdx_set.Ns * hdx_set.Np * hdx_set.Nt
+    else:
+        return None
+
+
+def fit_gibbs_global_path(
+    hdxm,
+    initial_guess,
+    r1,
+    epochs=EPOCHS,
+    patience=PATIENCE,
+    stop_loss=STOP_LOSS,
+    optimizer="SGD",
+    callbacks=None,
+    chunk_size=None,
+    **optimizer_kwargs,
+) -> RegularizationPathResult:
+    """
+    Fit Gibbs free energies globally to all D-uptake data in the supplied hdxm for a series of
+    regularizer values. By default, all values are fitted simultaneously in a single batched fit,
+    see `chunk_size` to warm start fits along the path.
+
+    Parameters
+    ----------
+    hdxm : :class:`~pyhdx.models.HDXMeasurement`
+        Input HDX measurement
+    initial_guess : :class:`~pandas.Series` or :class:`~numpy.ndarray`
+        Gibbs free energy initial guesses (shape Nr, units J/mol)
+    r1 : array_like
+        Regularizer values r1 (along residues)
+    epochs: :obj:`int`
+        Maximum number of fitting iterations
+    patience: :obj:`int`
+        Number of epochs to wait until termination when progress between epochs is below `stop_loss`
+    stop_loss: :obj:`float`
+        Threshold for difference in loss between epochs when an epoch is considered to make no more progress.
+    optimizer : :obj:`str`
+        Which optimizer to use. Default is Stochastic Gradient Descent. Other options are 'LBFGS',
+        'LevenbergMarquardt' or any other optimizer in :mod:`torch.optim`. See PyTorch documentation for information.
+    callbacks: :obj:`list` or None
+        List of callback objects. Call signature is callback(epoch, model, optimizer)
+    chunk_size : :obj:`int`, optional
+        Number of regularizer values to fit simultaneously, where convergence is checked for each
+        value individually. Each chunk is initialized with the result of the last regularizer
+        value of the previous chunk, such that `chunk_size=1` warm starts each value from the
+        result of the previous value. If `None`, all values are fitted simultaneously in a single
+        batched fit. Simultaneous fits are only supported for first-order optimizers such as SGD
+        and Adam; with 'LBFGS' and 'LevenbergMarquardt' values are fitted one at a time.
+    **optimizer_kwargs
+        Additional keyword arguments passed to the optimizer.
+
+    Returns
+    -------
+    result: :class:`RegularizationPathResult`
+
+    """
+
+    r_values = pd.DataFrame({"r1": np.atleast_1d(r1).astype(float)})
+    fit_kwargs = dict(epochs=epochs, patience=patience, stop_loss=stop_loss, optimizer=optimizer)
+    initial_guess = _initial_guess_single(hdxm, initial_guess)[:, np.newaxis]
+
+    return _path_fit(
+        HDXMeasurementSet([hdxm]),
+        hdxm.get_tensors(),
+        initial_guess,
+        r_values,
+        regularizer_1d,
+        fit_kwargs,
+        optimizer_kwargs,
+        callbacks=callbacks,
+        chunk_size=chunk_size,
+    )
+
+
+def fit_gibbs_global_batch_path(
+    hdx_set,
+    initial_guess,
+    r1=R1,
+    r2=R2,
+    r2_reference=False,
+    epochs=EPOCHS,
+    patience=PATIENCE,
+    stop_loss=STOP_LOSS,
+    optimizer="SGD",
+    callbacks=None,
+    chunk_size=None,
+    **optimizer_kwargs,
+) -> RegularizationPathResult:
+    """
+    Fit Gibbs free energies globally to all D-uptake data in multiple HDX measurements for a series
+    of regularizer values. By default, all values are fitted simultaneously in a single batched
+    fit, see `chunk_size` to warm start fits along the path.
+
+    Parameters
+    ----------
+    hdx_set : :class:`~pyhdx.models.HDXMeasurementSet`
+        Input HDX measurements
+    initial_guess : :class:`~pandas.Series` or :class:`~pandas.DataFrame` or :class:`~numpy.ndarray`
+        Gibbs free energy initial guesses (shape Ns x Nr or Nr, units J/mol)
+    r1 : array_like
+        Regularizer values r1 (along residues)
+    r2 : array_like
+        Regularizer values r2 (along protein states/samples). `r1` and `r2` are broadcasted
+        against each other to give the (r1, r2) pairs to fit.
+    r2_reference : :obj:`bool`:
+        If `True` the first dataset is used as a reference to calculate r2 differences, otherwise the mean is used
+    epochs: :obj:`int`
+        Maximum number of fitting iterations
+    patience: :obj:`int`
+        Number of epochs to wait until termination when progress between epochs is below `stop_loss`
+    stop_loss: :obj:`float`
+        Threshold for difference in loss between epochs when an epoch is considered to make no more progress.
+    optimizer : :obj:`str`
+        Which optimizer to use. Default is Stochastic Gradient Descent. Other options are 'LBFGS',
+        'LevenbergMarquardt' or any other optimizer in :mod:`torch.optim`. See PyTorch documentation for information.
+    callbacks: :obj:`list` or None
+        List of callback objects. Call signature is callback(epoch, model, optimizer)
+    chunk_size : :obj:`int`, optional
+        Number of regularizer values to fit simultaneously, where convergence is checked for each
+        value individually. Each chunk is initialized with the result of the last regularizer
+        value of the previous chunk, such that `chunk_size=1` warm starts each value from the
+        result of the previous value. If `None`, all values are fitted simultaneously in a single
+        batched fit. Simultaneous fits are only supported for first-order optimizers such as SGD
+        and Adam; with 'LBFGS' and 'LevenbergMarquardt' values are fitted one at a time.
+    **optimizer_kwargs
+        Additional keyword arguments passed to the optimizer.
+
+    Returns
+    -------
+    result: :class:`RegularizationPathResult`
+
+    """
+
+    r1, r2 = np.broadcast_arrays(np.atleast_1d(r1), np.atleast_1d(r2))
+    r_values = pd.DataFrame({"r1": r1.astype(float), "r2": r2.astype(float)})
+    fit_kwargs = dict(
+        r2_reference=r2_reference,
+        epochs=epochs,
+        patience=patience,
+        stop_loss=stop_loss,
+        optimizer=optimizer,
+    )
+    regularizer = regularizer_2d_reference if r2_reference else regularizer_2d_mean
+    initial_guess = _initial_guess_batch(hdx_set, initial_guess)[..., np.newaxis]
+
+    return _path_fit(
+        hdx_set,
+        hdx_set.get_tensors(),
+        initial_guess,
+        r_values,
+        regularizer,
+        fit_kwargs,
+        optimizer_kwargs,
+        callbacks=callbacks,
+        chunk_size=chunk_size,
+    )
+
+
+def padded_mse_loss(output, output_data, numel):
+    """Mean squared error of packed data, normalized by the number of elements `numel` of the
+    equivalent zero-padded data"""
+    return torch.sum((output - output_data) ** 2) / numel
+
+
+def _point_mse(output, output_data, numel=None):
+    """Mean squared errors of the points in the leading dimension of `output`. If given, squared
+    errors are normalized by `numel` (see :func:`padded_mse_loss`)"""
+    dim = tuple(range(1, output.dim()))
+    if numel is None:
+        return torch.mean((output - output_data) ** 2, dim=dim)
+    else:
+        return torch.sum((output - output_data) ** 2, dim=dim) / numel
+
+
+def _path_regularizer(regularizer, param, reduction="mean"):
+    """Regularization losses of the points in the leading dimension of `param`
+
+    With reduction 'none', elementwise losses are returned which sum to the loss of each point.
+    """
+    H = param.shape[0]
+    reg_losses = tuple(r * H for r in regularizer(param, reduction="none"))
+    if reduction == "mean":
+        return tuple(r.reshape(H, -1).sum(dim=1) for r in reg_losses)
+    elif reduction == "none":
+        return reg_losses
+    else:
+        raise ValueError(f"Invalid reduction {reduction!r}, must be 'mean' or 'none'")
+
+
+def _path_fit(
+    hdx_set,
+    tensors,
+    initial_guess,
+    r_values,
+    regularizer,
+    fit_kwargs,
+    optimizer_kwargs,
+    callbacks=None,
+    chunk_size=None,
+):
+    """Fits dG for each set of regularizer values (rows of `r_values`), which are passed as
+    positional arguments to `regularizer`, by adding a leading dimension to the dG parameter.
+
+    Chunks of `chunk_size` points are fitted simultaneously, where each point converges
+    independently. Each chunk is initialized with the result of the last point of the previous
+    chunk. If `chunk_size` is `None`, all points are fitted simultaneously, or one at a time for
+    optimizers which do not support simultaneous fits.
+    """
+    inputs = [tensors[key] for key in ["temperature", "X", "k_int", "timepoints"]]
+    output_data = tensors["d_exp"]
+    numel = _padded_numel(hdx_set, tensors)
+
+    # Take default optimizer kwargs and update them with supplied kwargs
+    optimizer_kwargs = {
+        **optimizer_defaults.get(fit_kwargs["optimizer"], {}),
+        **optimizer_kwargs,
+    }  # Take defaults and override with user-specified
+    optimizer_klass = get_optimizer(fit_kwargs["optimizer"])
+    loop_kwargs = {k: fit_kwargs[k] for k in ["epochs", "patience", "stop_loss"]}
+
+    # The line search (LBFGS) or damping (LM) would be shared between the points of a chunk
+    batched = optimizer_klass not in (torch.optim.LBFGS, LevenbergMarquardt)
+    if chunk_size is None:
+        chunk_size = len(r_values) if batched else 1
+    elif chunk_size > 1 and not batched:
+        raise ValueError(
+            f"Optimizer {fit_kwargs['optimizer']!r} does not support fitting multiple regularizer "
+            "values simultaneously, use chunk_size=1"
+        )
+    dG_guess = torch.tensor(initial_guess, dtype=cfg.TORCH_DTYPE, device=cfg.TORCH_DEVICE)
+    results = []
+    for start in range(0, len(r_values), chunk_size):
+        chunk = r_values.iloc[start : start + chunk_size]
+        H = len(chunk)
+
+        # Regularizer values with shape (H, 1, ...) to broadcast with dG
+        r_tensors = [
+            torch.tensor(
+                chunk[col].to_numpy(), dtype=cfg.TORCH_DTYPE, device=cfg.TORCH_DEVICE
+            ).reshape((H,) + (1,) * dG_guess.dim())
+            for col in r_values.columns
+        ]
+        reg_func = partial(regularizer, *r_tensors)
+        dG_par = torch.nn.Parameter(dG_guess.expand(H, *dG_guess.shape).clone())
+        model = DeltaGFit(dG_par)
+
+        point_losses, returned_model = run_optimizer(
+            inputs,
+            output_data,
+            optimizer_klass,
+            optimizer_kwargs,
+            model,
+            partial(_point_mse, numel=numel),
+            partial(_path_regularizer, reg_func),
+            callbacks=callbacks,
+            **loop_kwargs,
+        )
+
+        dG = model.dG.detach()
+        for (_, r), dG_point, losses in zip(chunk.iterrows(), dG, point_losses):
+            metadata = {**r.to_dict(), **fit_kwargs, **optimizer_kwargs}
+            result = TorchFitResult(hdx_set, DeltaGFit(dG_point), losses=losses, **metadata)
+            results.append(result)
+
+        # Warm start the next chunk from the last point of the path
+        dG_guess = dG[-1]
+
+    return RegularizationPathResult(results, r_values)
+
+
 """
 this might still serve some use
 def weighted_avg_linearize(self):
@@ -1053,30 +2037,71 @@ class KineticsFitResult(object):
 
         """
 
-        output = np.full_like(self.r_number, np.nan, dtype=float)
-        for (s, e), result, model in zip(self.intervals, self.results, self.models):
-            try:
-                dummy_name = model.names[name]  ## dummy parameter name
-                value = result.params[dummy_name]  # value is scalar
-            except KeyError:  # is a lsqmodel funky town
-                value = model.get_param_values(name, **result.params)  # value is vector
-                # values = model.get_parameter(name)            #todo unify nomenclature param/parameter
+        return self._scatter(self._block_param(name))
 
-            i0, i1 = np.searchsorted(self.r_number, [s, e])
-            output[i0:i1] = value
+    def _block_param(self, name):
+        """Array with the value of parameter `name` of each block"""
+        values = [
+            result.params[model.names[name]] for result, model in zip(self.results, self.models)
+        ]
+
+        return np.array(values, dtype=float)
+
+    @property
+    def _residue_block(self):
+        """Index of the block of each residue, -1 for residues not covered by any block"""
+        if not self.intervals:
+            return np.full(len(self.r_number), -1)
+
+        start, stop = np.array(self.intervals).T
+        r_number = np.asarray(self.r_number)
+        idx = np.searchsorted(start, r_number, side="right") - 1
+        covered = (idx >= 0) & (r_number < stop[np.maximum(idx, 0)])
+
+        return np.where(covered, idx, -1)
+
+    def _scatter(self, values):
+        """Scatter values per block to an array of values per residue"""
+        output = np.full(len(self.r_number), np.nan, dtype=float)
+        block = self._residue_block
+        output[block >= 0] = values[block[block >= 0]]
 
         return output
 
+    def get_block_rates(self):
+        """
+        Exchange rates of each block, obtained from the time at which the D-uptake reaches 50%.
+
+        Returns
+        -------
+        rates : :class:`~numpy.ndarray`
+            Array with exchange rates per block, NaN where no half-life root was found.
+        converged : :class:`~numpy.ndarray`
+            Boolean array which is `True` for blocks where the half-life root was found.
+
+        """
+        two_component = (TwoComponentAssociationModel, TwoComponentDissociationModel)
+        if all(isinstance(model, two_component) for model in self.models):
+            k1, k2, r = (self._block_param(name) for name in ["k1", "k2", "r"])
+            t_half, converged = two_component_half_life(k1, k2, r)
+            rates = np.log(2) / t_half
+        else:
+            rates = [
+                model.get_rate(**result.params) for result, model in zip(self.results, self.models)
+            ]
+            rates = np.array(rates, dtype=float)
+            converged = np.isfinite(rates)
+
+        return rates, converged
+
     @property
     def rate(self):
         """Returns an array with the exchange rates"""
-        # todo pd series/dataframe in favour of searchsorted
-        output = np.full_like(self.r_number, np.nan, dtype=float)
-        for (s, e), result, model in zip(self.intervals, self.results, self.models):
-            rate = model.get_rate(**result.params)
-            i0, i1 = np.searchsorted(self.r_number, [s, e])
-            output[i0:i1] = rate
-        return output
+        rates, converged = self.get_block_rates()
+        if not np.all(converged):
+            warnings.warn(f"Failed to find half life root for {np.sum(~converged)} block(s)")
+
+        return self._scatter(rates)
 
     @property
     def tau(self):
@@ -1228,3 +2253,30 @@ class DUptakeFitResultSet(object):
         )
 
         return combined_df
+
+
+@dataclass
+class RegularizationPathResult:
+    """Fit results of Gibbs free energy fits for a series of regularizer values"""
+
+    results: list[TorchFitResult]
+    """Fit results for each set of regularizer values. Their losses end at the epoch at which
+        the fit of the regularizer values converged."""
+    r_values: pd.DataFrame
+    """Regularizer values of each fit result."""
+
+    @property
+    def l_curve(self) -> pd.DataFrame:
+        """Table of regularizer values together with mse and regularization losses (L-curve)"""
+        losses = pd.concat([result.losses.iloc[[-1]] for result in self.results], ignore_index=True)
+        l_curve = pd.concat([self.r_values.reset_index(drop=True), losses], axis=1)
+        l_curve["reg_loss"] = losses.drop(columns="mse_loss").sum(axis=1)
+        l_curve["total_loss"] = l_curve["mse_loss"] + l_curve["reg_loss"]
+
+        return l_curve
+
+    def __getitem__(self, item) -> TorchFitResult:
+        return self.results[item]
+
+    def __len__(self) -> int:
+        return len(self.results)
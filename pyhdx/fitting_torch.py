@@ -1,14 +1,15 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 
 import numpy as np
 import pandas as pd
 import torch as t
 import torch.nn as nn
-from scipy import constants, linalg
+from scipy import constants, linalg, special
 
 from pyhdx.fileIO import dataframe_to_file
 from pyhdx.config import cfg
-
+from pyhdx.models import PackedCoverage
 
 # TORCH_DTYPE = t.double
 # TORCH_DEVICE = t.device('cpu')
@@ -23,17 +24,159 @@ class DeltaGFit(nn.Module):
         """
         # inputs, list of:
             temperatures: scalar (1,)
-            X (N_peptides, N_residues)
+            X (N_peptides, N_residues), dense or sparse (COO), or PackedCoverage
             k_int: (N_peptides, 1)
 
         """
 
         pfact = t.exp(self.dG / (constants.R * temperature))
         uptake = 1 - t.exp(-t.matmul((k_int / (1 + pfact)), timepoints))
+        return coverage_matmul(X, uptake)
+
+
+def coverage_matmul(X, uptake):
+    """
+    Matrix product of the coupling matrix X with residue uptake.
+
+    Dense X are multiplied with :func:`torch.matmul`. For sparse (COO) X, leading batch dimensions
+    of `uptake` are folded into the last dimension such that a single sparse matrix product is
+    done for all batch elements.
+
+    Parameters
+    ----------
+    X : :class:`~torch.Tensor` or :class:`~pyhdx.models.PackedCoverage`
+        Coupling matrix, shape (Np, Nr) or (Ns, Np, Nr)
+    uptake : :class:`~torch.Tensor`
+        Uptake per residue, shape (..., Nr, Nt) or (..., Ns, Nr, Nt)
+
+    Returns
+    -------
+    d_calc : :class:`~torch.Tensor`
+        Uptake per peptide, shape (..., Np, Nt) or (..., Ns, Np, Nt), or (..., P, Nt) for
+        packed X
+
+    """
+    if isinstance(X, PackedCoverage):
+        return X.matmul(uptake)
+    elif not X.is_sparse:
         return t.matmul(X, uptake)
 
+    if X.dim() == 2:
+        Np, Nr = X.shape
+        *batch, _, Nt = uptake.shape
+        u = uptake.movedim(-2, 0).reshape(Nr, -1)
+        d_calc = t.sparse.mm(X, u)
+        return d_calc.reshape(Np, *batch, Nt).movedim(0, -2)
+    elif X.dim() == 3:
+        Ns, Np, Nr = X.shape
+        *batch, _, _, Nt = uptake.shape
+        u = uptake.reshape(-1, Ns, Nr, Nt).permute(1, 2, 0, 3).reshape(Ns, Nr, -1)
+        d_calc = t.bmm(X, u)
+        return d_calc.reshape(Ns, Np, -1, Nt).permute(2, 0, 1, 3).reshape(*batch, Ns, Np, Nt)
+    else:
+        raise ValueError(f"Invalid number of dimensions of sparse X: {X.dim()}")
+
+
+class LevenbergMarquardt(t.optim.Optimizer):
+    """
+    Levenberg-Marquardt optimizer for nonlinear least-squares problems.
+
+    Unlike first-order optimizers, the closure passed to :meth:`step` must return the vector of
+    residuals, such that the objective is the sum of their squares. Each step computes the
+    Jacobian of the residuals, solves the damped normal equations and accepts the update if the
+    objective decreases, otherwise the damping is increased and the step is retried.
+
+    The Jacobian is computed column-wise with forward-mode automatic differentiation
+    (:func:`torch.func.jacfwd`), such that its cost scales with the number of parameters rather
+    than with the number of residuals. Therefore, the closure must take an optional list of
+    tensors which replace the optimized parameters (in order), for example by evaluating the
+    model with :func:`torch.func.functional_call`.
+
+    Parameters
+    ----------
+    params : iterable
+        Parameters to optimize.
+    damping : :obj:`float`
+        Initial damping factor.
+    damping_increase : :obj:`float`
+        Factor by which the damping is increased when a step is rejected.
+    damping_decrease : :obj:`float`
+        Factor by which the damping is decreased when a step is accepted.
+    max_tries : :obj:`int`
+        Maximum number of damping increases per step.
+
+    """
+
+    def __init__(
+        self, params, damping=1e-3, damping_increase=10.0, damping_decrease=3.0, max_tries=10
+    ):
+        defaults = dict(
+            damping=damping,
+            damping_increase=damping_increase,
+            damping_decrease=damping_decrease,
+            max_tries=max_tries,
+        )
+        super(LevenbergMarquardt, self).__init__(params, defaults)
+        if len(self.param_groups) != 1:
+            raise ValueError("LevenbergMarquardt doesn't support per-parameter options")
+
+    def _set_params(self, flat):
+        offset = 0
+        for p in self.param_groups[0]["params"]:
+            p.copy_(flat[offset : offset + p.numel()].view_as(p))
+            offset += p.numel()
+
+    def step(self, closure):
+        """
+        Performs a single optimization step.
+
+        Parameters
+        ----------
+        closure : callable
+            Closure which reevaluates the model and returns the residuals as 1D tensor. Called
+            with a list of tensors, the closure must evaluate the model with these tensors in
+            place of the parameters.
+
+        Returns
+        -------
+        cost : :class:`~torch.Tensor`
+            Sum of squared residuals at the accepted parameters.
+
+        """
 
-def estimate_errors(hdxm, dG):
+        group = self.param_groups[0]
+        params = group["params"]
+
+        with t.no_grad():
+            residuals = closure()
+            jacobian = t.func.jacfwd(
+                lambda *p: closure(list(p)), argnums=tuple(range(len(params)))
+            )(*[p.detach() for p in params])
+            jacobian = t.cat([j.reshape(residuals.numel(), -1) for j in jacobian], dim=1)
+
+            cost = residuals.square().sum()
+            JtJ = jacobian.T @ jacobian
+            gradient = jacobian.T @ residuals
+            diagonal = t.diagonal(JtJ).clamp(min=t.finfo(JtJ.dtype).eps * t.diagonal(JtJ).max())
+            x0 = t.cat([p.detach().flatten() for p in params])
+
+            for _ in range(group["max_tries"]):
+                A = JtJ + group["damping"] * t.diag(diagonal)
+                delta = t.linalg.solve(A, -gradient)
+                self._set_params(x0 + delta)
+                new_cost = closure().square().sum()
+                if new_cost < cost:
+                    group["damping"] /= group["damping_decrease"]
+                    return new_cost
+                group["damping"] *= group["damping_increase"]
+
+            # No improvement found; restore the parameters and re-evaluate the closure such that the
+            # last evaluation corresponds to the current parameters
+            self._set_params(x0)
+            return closure().square().sum()
+
+
+def estimate_errors(hdxm, dG, method="analytic"):
     """
     Calculate covariances and uncertainty (perr, experimental)
 
@@ -42,6 +185,10 @@ def estimate_errors(hdxm, dG):
     hdxm : :class:`~pyhdx.models.HDXMeasurement`
     dG : :class:`~numpy.ndarray`
         Array with dG values.
+    method : :obj:`str`
+        Either 'analytic' to calculate the Jacobian and Hessian from their closed-form expressions
+        and solve the resulting banded linear systems, or 'autograd' to calculate them with
+        automatic differentiation and dense matrix inversion.
 
     Returns
     -------
@@ -50,10 +197,51 @@ def estimate_errors(hdxm, dG):
     dtype = t.float64
     joined = pd.concat([dG, hdxm.coverage["exchanges"]], axis=1, keys=["dG", "ex"])
     dG = joined.query("ex==True")["dG"]
-    dG_tensor = t.tensor(dG.to_numpy(), dtype=dtype)
 
-    tensors = {k: v.cpu() for k, v in hdxm.get_tensors(exchanges=True, dtype=dtype).items()}
+    tensors = {
+        k: v.cpu() for k, v in hdxm.get_tensors(exchanges=True, dtype=dtype, layout="dense").items()
+    }
+
+    if method == "analytic":
+        covariance, perr = _analytic_errors(tensors, dG.to_numpy())
+    elif method == "autograd":
+        covariance, perr = _autograd_errors(tensors, t.tensor(dG.to_numpy(), dtype=dtype))
+    else:
+        raise ValueError(f"Invalid error estimation method {method!r}")
+
+    cov_series = pd.Series(covariance, index=dG.index, name="covariance")
+    perr_series = pd.Series(perr, index=dG.index, name="perr")
+
+    return cov_series, perr_series
 
+
+def estimate_errors_states(hdxm_set, dG, method="analytic"):
+    """
+    Calculate covariances and uncertainty (perr, experimental) of all states in a
+    :class:`~pyhdx.models.HDXMeasurementSet`, by calling :func:`estimate_errors` for each state.
+
+    Parameters
+    ----------
+    hdxm_set : :class:`~pyhdx.models.HDXMeasurementSet`
+    dG : :class:`~pandas.DataFrame`
+        Dataframe with dG values with r_number as index and state names as columns.
+    method : :obj:`str`
+        Error estimation method, see :func:`estimate_errors`.
+
+    Returns
+    -------
+    errors : :class:`~pandas.DataFrame`
+        Dataframe with covariance and perr per state.
+
+    """
+    dfs = [
+        pd.concat(estimate_errors(hdxm, dG[hdxm.name], method=method), axis=1) for hdxm in hdxm_set
+    ]
+
+    return pd.concat(dfs, keys=hdxm_set.names, names=["state", "quantity"], axis=1, sort=True)
+
+
+def _autograd_errors(tensors, dG_tensor):
     def hes_loss(dG_input):
         criterion = t.nn.MSELoss(reduction="sum")
         pfact = t.exp(dG_input.unsqueeze(-1) / (constants.R * tensors["temperature"]))
@@ -66,7 +254,6 @@ def estimate_errors(hdxm, dG):
     hessian = t.autograd.functional.hessian(hes_loss, dG_tensor)
     hessian_inverse = t.inverse(-hessian)
     covariance = np.sqrt(np.abs(np.diagonal(hessian_inverse)))
-    cov_series = pd.Series(covariance, index=dG.index, name="covariance")
 
     def jac_loss(dG_input):
         pfact = t.exp(dG_input.unsqueeze(-1) / (constants.R * tensors["temperature"]))
@@ -89,15 +276,157 @@ def estimate_errors(hdxm, dG):
     chi2dof = np.sum(res**2) / (res.size - dG_tensor.numpy().size)
     cov *= chi2dof
     perr = np.sqrt(np.diag(cov))
-    perr_series = pd.Series(perr, index=dG.index, name="perr")
 
-    return cov_series, perr_series
+    return covariance, perr
+
+
+def _analytic_errors(tensors, dG):
+    """
+    Covariances and perr from the closed-form Jacobian and Hessian of the sum of squared residuals.
+
+    With uptake u_rt = 1 - exp(-k_r t) and d_calc = X u, the derivatives of d_calc with respect to
+    dG_r are X_pr g_rt and X_pr h_rt. Because each peptide covers a contiguous stretch of
+    residues, J^T J = (X^T X) * (G G^T) is banded with a bandwidth of the longest peptide, and
+    the residual term of the Hessian is diagonal.
+
+    """
+    X = tensors["X"].numpy()
+    d_exp = tensors["d_exp"].numpy()
+    timepoints = tensors["timepoints"].numpy()
+    k_int = tensors["k_int"].numpy()
+    a = 1 / (constants.R * tensors["temperature"].numpy())
+
+    s = special.expit(a * dG[:, np.newaxis])  # pfact / (1 + pfact)
+    k_obs = k_int * (1 - s)
+    decay = np.exp(-k_obs * timepoints)
+    residuals = X @ (1 - decay) - d_exp
+
+    g = -a * timepoints * k_obs * s * decay  # d(uptake)/d(dG), shape Nr x Nt
+    h = a * g * (1 - 2 * s + timepoints * k_obs * s)  # d2(uptake)/d(dG)2
+
+    Nr = X.shape[1]
+    covered = (X != 0)[(X != 0).any(axis=1)]
+    start = covered.argmax(axis=1)
+    stop = Nr - covered[:, ::-1].argmax(axis=1)
+    bandwidth = int(np.max(stop - start, initial=1)) - 1
+
+    # Diagonals of J^T J, the k-th entry is the k-th upper diagonal
+    jtj = [
+        np.einsum("pr,pr->r", X[:, : Nr - k], X[:, k:]) * np.einsum("rt,rt->r", g[: Nr - k], g[k:])
+        for k in range(bandwidth + 1)
+    ]
+
+    hessian = [2 * d for d in jtj]
+    hessian[0] = hessian[0] + 2 * np.einsum("rt,rt->r", X.T @ residuals, h)
+    covariance = np.sqrt(np.abs(_banded_inverse_diagonal(hessian)))
+
+    chi2dof = np.sum(residuals**2) / (residuals.size - Nr)
+    perr = np.sqrt(np.abs(_banded_inverse_diagonal(jtj, positive_definite=True)) * chi2dof)
+
+    return covariance, perr
+
+
+def _banded_inverse_diagonal(diagonals, positive_definite=False, block_size=256):
+    """
+    Diagonal of the inverse of a symmetric banded matrix.
+
+    Parameters
+    ----------
+    diagonals : :obj:`list`
+        Main diagonal followed by the upper diagonals of the matrix.
+    positive_definite : :obj:`bool`
+        If `True`, the matrix is inverted by Cholesky decomposition. Matrices which are
+        numerically singular are pseudo-inverted, which requires a dense eigendecomposition.
+    block_size : :obj:`int`
+        Number of columns of the inverse calculated at once.
+
+    Returns
+    -------
+    diagonal : :class:`~numpy.ndarray`
+
+    """
+
+    N = len(diagonals[0])
+    w = len(diagonals) - 1
+
+    # Symmetric (Jacobi) scaling to unit diagonal, as the curvature with respect to different
+    # residues can differ by many orders of magnitude
+    scale = 1 / np.sqrt(np.where(diagonals[0] > 0, np.abs(diagonals[0]), 1.0))
+    diagonals = [d * scale[: N - k] * scale[k:] for k, d in enumerate(diagonals)]
+
+    if positive_definite:
+        ab = np.zeros((w + 1, N))
+        for k, d in enumerate(diagonals):
+            ab[w - k, k:] = d
+        try:
+            cb = linalg.cholesky_banded(ab, check_finite=False)
+        except linalg.LinAlgError:
+            return _dense_pinv_diagonal(diagonals) * scale**2
+        solve = lambda rhs: linalg.cho_solve_banded((cb, False), rhs, check_finite=False)
+    else:
+        ab = np.zeros((2 * w + 1, N))
+        for k, d in enumerate(diagonals):
+            ab[w - k, k:] = d
+            ab[w + k, : N - k] = d
+        solve = lambda rhs: linalg.solve_banded((w, w), ab, rhs, check_finite=False)
+
+    diagonal = np.empty(N)
+    for i in range(0, N, block_size):
+        columns = np.arange(i, min(i + block_size, N))
+        rhs = np.zeros((N, len(columns)))
+        rhs[columns, np.arange(len(columns))] = 1.0
+        try:
+            inverse = solve(rhs)
+        except linalg.LinAlgError:
+            return _dense_pinv_diagonal(diagonals) * scale**2
+        diagonal[columns] = inverse[columns, np.arange(len(columns))]
+
+    return diagonal * scale**2
+
+
+def _dense_pinv_diagonal(diagonals):
+    """
+    Diagonal of the pseudo-inverse of a symmetric banded matrix.
+
+    The matrix is split into independent diagonal blocks (ie regions of the protein which are not
+    connected by overlapping peptides), which are pseudo-inverted by eigendecomposition.
+
+    """
+    N = len(diagonals[0])
+
+    # Number of nonzero off-diagonal elements coupling residues up to and including i to the next
+    coupling = np.zeros(N + 1)
+    for k, d in enumerate(diagonals[1:], start=1):
+        nonzero = np.flatnonzero(d)
+        np.add.at(coupling, nonzero, 1)
+        np.add.at(coupling, nonzero + k, -1)
+    boundaries = np.flatnonzero(np.cumsum(coupling)[:-1] == 0) + 1
+
+    diagonal = np.zeros(N)
+    for block in np.split(np.arange(N), boundaries[:-1]):
+        start, n = block[0], len(block)
+        matrix = np.zeros((n, n))
+        for k, d in enumerate(diagonals[:n]):
+            values = d[start : start + n - k]
+            matrix[np.arange(n - k), np.arange(k, n)] = values
+            matrix[np.arange(k, n), np.arange(n - k)] = values
+
+        eigvals, eigvecs = linalg.eigh(matrix, check_finite=False)
+        above_cutoff = np.abs(eigvals) > np.max(np.abs(eigvals)) * n * np.finfo(float).eps
+        diagonal[block] = (eigvecs[:, above_cutoff] ** 2) @ (1 / eigvals[above_cutoff])
+
+    return diagonal
 
 
 class TorchFitResult(object):
     """
     PyTorch Fit result object.
 
+    ΔG, protection factors and observed rates are calculated on creation. Error estimates
+    (covariance and perr) are calculated on first access of :attr:`output` or :attr:`errors`, or in
+    the background by calling :meth:`compute_errors_async`. Pickling a result waits for pending
+    background error estimates.
+
     Parameters
     ----------
 
@@ -118,17 +447,90 @@ class TorchFitResult(object):
             self.metadata["mse_loss"] = self.mse_loss
             self.metadata["reg_loss"] = self.reg_loss
             self.metadata["regularization_percentage"] = self.regularization_percentage
-            self.metadata["epochs_run"] = len(self.losses)
+            self.metadata["epochs_run"] = int(self.losses.index.max())
 
         self.names = [hdxm.name for hdxm in self.hdxm_set.hdxm_list]
 
         dfs = [
-            self.generate_output(hdxm, self.dG[g_column])
+            self.generate_output(hdxm, self.dG[g_column], errors=False)
             for hdxm, g_column in zip(self.hdxm_set, self.dG)
         ]
-        df = pd.concat(dfs, keys=self.names, names=["state", "quantity"], axis=1, sort=True)
+        self.values = pd.concat(
+            dfs, keys=self.names, names=["state", "quantity"], axis=1, sort=True
+        )
+
+        self._errors = None  # DataFrame or Future of error estimates, computed on demand
+        self._output = None
+
+    @property
+    def output(self) -> pd.DataFrame:
+        """:class:`~pandas.DataFrame`: Fit output including covariances. Error estimates are
+        computed on first access."""
+        if self._output is None:
+            errors = self.errors
+            dfs = [self.values[name].join(errors[name]["covariance"]) for name in self.names]
+            self._output = pd.concat(
+                dfs, keys=self.names, names=["state", "quantity"], axis=1, sort=True
+            )
+
+        return self._output
+
+    @property
+    def errors(self) -> pd.DataFrame:
+        """:class:`~pandas.DataFrame`: Covariance and perr per residue. Computed on first access, or
+        waits for the result of :meth:`compute_errors_async`."""
+        if self._errors is None:
+            self._errors = self._estimate_errors()
+        elif isinstance(self._errors, Future):
+            self._errors = self._errors.result()
+
+        return self._errors
+
+    def compute_errors_async(self, executor=None) -> Future:
+        """
+        Compute error estimates in the background.
+
+        Parameters
+        ----------
+        executor : :class:`~concurrent.futures.Executor`, optional
+            Executor to compute errors in. If `None`, a single background thread is used.
 
-        self.output = df
+        Returns
+        -------
+        future : :class:`~concurrent.futures.Future`
+            Future of the :attr:`errors` dataframe.
+
+        """
+        if isinstance(self._errors, Future):
+            return self._errors
+        elif self._errors is not None:
+            future = Future()
+            future.set_result(self._errors)
+            return future
+
+        if executor is None:
+            pool = ThreadPoolExecutor(max_workers=1)
+            self._errors = pool.submit(self._estimate_errors)
+            pool.shutdown(wait=False)  # the worker thread exits once the errors are computed
+        else:
+            self._errors = executor.submit(self._estimate_errors)
+
+        return self._errors
+
+    def _estimate_errors(self) -> pd.DataFrame:
+        return estimate_errors_states(self.hdxm_set, self.dG)
+
+    def __getstate__(self):
+        # Pending error estimates are waited for, such that results can be pickled; failed
+        # estimates are dropped and computed again on demand
+        state = self.__dict__.copy()
+        if isinstance(self._errors, Future):
+            try:
+                state["_errors"] = self._errors.result()
+            except Exception:
+                state["_errors"] = None
+
+        return state
 
     def get_peptide_mse(self):
         """Get a dataframe with mean squared error per peptide (ie per peptide squared error averaged over time)"""
@@ -218,13 +620,15 @@ class TorchFitResult(object):
         return dG
 
     @staticmethod
-    def generate_output(hdxm, dG):
+    def generate_output(hdxm, dG, errors=True):
         """
 
         Parameters
         ----------
         hdxm : :class:`~pyhdx.models.HDXMeasurement`
         dG : :class:`~pandas.Series` with r_number as index
+        errors : :obj:`bool`
+            If `True`, include covariances calculated by :func:`estimate_errors`.
 
         Returns
         -------
@@ -245,10 +649,10 @@ class TorchFitResult(object):
         k_obs = k_int / (1 + pfact)
         out_dict["k_obs"] = k_obs
 
-        covariance, perr = estimate_errors(hdxm, dG)
-
         df = pd.DataFrame(out_dict, index=dG.index)
-        df = df.join(covariance)
+        if errors:
+            covariance, perr = estimate_errors(hdxm, dG)
+            df = df.join(covariance)
 
         return df
 
@@ -310,8 +714,10 @@ class TorchFitResult(object):
             inputs.append(time_tensor)
 
             output = self.model(*inputs)
+            if isinstance(tensors["X"], PackedCoverage):
+                output = tensors["X"].pad(output, self.hdxm_set.Np)
 
-        array = output.detach().numpy()
+        array = output.detach().cpu().numpy()
         return array
 
     def get_dcalc(self, timepoints=None):
@@ -366,13 +772,15 @@ class TorchFitResultSet(object):
         # -> asusme in GUI its one
         self.results = results
 
-        dfs = [result.output for result in self.results]
-        self.output = pd.concat(dfs, axis=1, sort=True)
-
         dfs = [result.losses for result in self.results]
         names = ["_".join(result.hdxm_set.names) for result in self.results]
         self.losses = pd.concat(dfs, axis=1, keys=names, sort=True)
 
+    @property
+    def output(self):
+        dfs = [result.output for result in self.results]
+        return pd.concat(dfs, axis=1, sort=True)
+
     @property
     def metadata(self):
         return {"_".join(result.hdxm_set.names): result.metadata for result in self.results}
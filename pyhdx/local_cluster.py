@@ -2,16 +2,103 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import concurrent.futures
+import multiprocessing
+import os
 import time
+from abc import ABC, abstractmethod
 from asyncio import Future
-from typing import Callable, Iterable, Any
+from typing import Callable, Iterable, Any, Optional
 
+import torch
 from dask.distributed import LocalCluster, Client
 from distributed import connect
+from distributed.diagnostics.plugin import WorkerPlugin
 
 from pyhdx.config import cfg
 from pyhdx.support import select_config
 
+try:
+    from threadpoolctl import threadpool_limits
+except ModuleNotFoundError:
+    threadpool_limits = None
+
+# Keyword arguments of Dask `Client.submit` and `Client.map` which are not passed to the function
+DASK_KWARGS = {
+    "key",
+    "workers",
+    "retries",
+    "resources",
+    "priority",
+    "allow_other_workers",
+    "fifo_timeout",
+    "actor",
+    "actors",
+    "pure",
+    "batch_size",
+}
+
+# Environment variables setting the number of threads of OpenMP and BLAS libraries
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]
+
+
+def _func_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Removes Dask scheduling keyword arguments."""
+    return {k: v for k, v in kwargs.items() if k not in DASK_KWARGS}
+
+
+def limit_threads(n_threads: int) -> None:
+    """Limits the number of threads used by PyTorch and, if `threadpoolctl` is installed, by
+    BLAS and OpenMP libraries in the current process.
+
+    Args:
+        n_threads: Maximum number of threads.
+
+    """
+    torch.set_num_threads(n_threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=n_threads)
+
+
+def default_threads_per_worker(n_workers: int) -> int:
+    """Returns the number of PyTorch and BLAS threads per worker, as given by
+    `cfg.cluster.threads_per_worker` or, if not set, the number of CPUs divided by `n_workers`.
+
+    Args:
+        n_workers: Number of workers running concurrently.
+
+    Returns:
+        Number of threads per worker.
+
+    """
+    if cfg.cluster.threads_per_worker:
+        return int(cfg.cluster.threads_per_worker)
+    return max(1, (os.cpu_count() or 1) // n_workers)
+
+
+def thread_env(n_threads: int) -> dict[str, str]:
+    """Returns environment variables which limit the number of OpenMP and BLAS threads of newly
+    started processes to `n_threads`."""
+    return {var: str(n_threads) for var in THREAD_ENV_VARS}
+
+
+class ThreadLimitPlugin(WorkerPlugin):
+    """Dask worker plugin which limits the number of threads used by PyTorch and BLAS
+    libraries on each worker, see [limit_threads][local_cluster.limit_threads].
+
+    Args:
+        n_threads: Maximum number of threads per worker.
+
+    """
+
+    name = "pyhdx-thread-limit"
+
+    def __init__(self, n_threads: int) -> None:
+        self.n_threads = n_threads
+
+    def setup(self, worker) -> None:
+        limit_threads(self.n_threads)
+
 
 class DummyClient(object):
     """Object to use as dask Client-like object for doing local operations with
@@ -21,14 +108,14 @@ class DummyClient(object):
     @staticmethod
     def submit(func: Callable, *args: Any, **kwargs) -> Future:
         future = Future()
-        future.set_result(func(*args))
+        future.set_result(func(*args, **_func_kwargs(kwargs)))
         return future
 
     @staticmethod
     def map(func: Callable, *iterables: Iterable, **kwargs) -> list[Future]:
         futures = []
         for items in zip(*iterables):
-            result = func(*items)
+            result = func(*items, **_func_kwargs(kwargs))
             future = Future()
             future.set_result(result)
             futures.append(future)
@@ -40,6 +127,108 @@ class DummyClient(object):
         return [future.result() for future in futures]
 
 
+class PoolClient(ABC):
+    """Base class for Dask Client-like objects which execute tasks in a local
+    [concurrent.futures][] executor.
+
+    The executor is started on first use and shut down with `close` or on exiting the client's
+    context.
+
+    Args:
+        n_workers: Number of workers. Defaults to `cfg.cluster.n_workers`.
+
+    """
+
+    def __init__(self, n_workers: Optional[int] = None) -> None:
+        self.n_workers = n_workers or cfg.cluster.n_workers
+        self._executor: Optional[concurrent.futures.Executor] = None
+
+    @abstractmethod
+    def _create_executor(self) -> concurrent.futures.Executor:
+        """Create the executor which runs submitted tasks."""
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    def submit(self, func: Callable, *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """Submit `func(*args, **kwargs)` for execution. Dask scheduling keyword arguments such as
+        `pure` are ignored."""
+        return self.executor.submit(func, *args, **_func_kwargs(kwargs))
+
+    def map(
+        self, func: Callable, *iterables: Iterable, **kwargs: Any
+    ) -> list[concurrent.futures.Future]:
+        """Submit `func` for execution on each set of items of `iterables`."""
+        return [self.submit(func, *items, **kwargs) for items in zip(*iterables)]
+
+    @staticmethod
+    def gather(futures: Iterable[concurrent.futures.Future]) -> list[Any]:
+        """Wait for futures to complete and return their results, in order."""
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """Shut down the executor, waiting for running tasks to complete."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> PoolClient:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ThreadPoolClient(PoolClient):
+    """Dask Client-like object which executes tasks in a pool of threads.
+
+    PyTorch and NumPy release the GIL in most computations, such that threads are well suited
+    for fitting tasks dominated by array operations. Thread limits of PyTorch and BLAS libraries
+    apply to the whole process, use [ProcessPoolClient][local_cluster.ProcessPoolClient] to
+    limit threads per worker.
+
+    Args:
+        n_workers: Number of threads. Defaults to `cfg.cluster.n_workers`.
+
+    """
+
+    def _create_executor(self) -> concurrent.futures.Executor:
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.n_workers)
+
+
+class ProcessPoolClient(PoolClient):
+    """Dask Client-like object which executes tasks in a pool of worker processes.
+
+    Worker processes are started with the 'spawn' method. Functions and arguments of tasks must
+    be picklable, and scripts using this client must guard their entry point with
+    `if __name__ == "__main__":`.
+
+    Args:
+        n_workers: Number of worker processes. Defaults to `cfg.cluster.n_workers`.
+        threads_per_worker: Maximum number of threads used by PyTorch and BLAS libraries in each
+            worker process. Defaults to `cfg.cluster.threads_per_worker` or, if not set, the
+            number of CPUs divided by the number of workers.
+
+    """
+
+    def __init__(
+        self, n_workers: Optional[int] = None, threads_per_worker: Optional[int] = None
+    ) -> None:
+        super().__init__(n_workers)
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(self.n_workers)
+
+    def _create_executor(self) -> concurrent.futures.Executor:
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=limit_threads,
+            initargs=(self.threads_per_worker,),
+        )
+
+
 def default_client(timeout="2s", **kwargs):
     """Return Dask client at scheduler adress as defined by the global config"""
     scheduler_address = cfg.cluster.scheduler_address
@@ -54,6 +243,11 @@ def default_client(timeout="2s", **kwargs):
 def default_cluster(**kwargs):
     """Start a dask LocalCluster at the scheduler port given by the config
 
+    Each worker runs one task at a time, and the number of threads used by PyTorch and BLAS
+    libraries on each worker is limited to `cfg.cluster.threads_per_worker` (by default the
+    number of CPUs divided by the number of workers), such that concurrent fits do not
+    oversubscribe the CPU.
+
     kwargs: override defaults
 
     """
@@ -64,9 +258,19 @@ def default_cluster(**kwargs):
     settings = {
         "scheduler_port": port,
         "n_workers": cfg.cluster.n_workers,
+        "threads_per_worker": 1,
     }
     settings.update(kwargs)
+    n_threads = default_threads_per_worker(settings["n_workers"])
+    settings.setdefault("env", thread_env(n_threads))
     cluster = LocalCluster(**settings)
+    with Client(cluster) as client:
+        plugin = ThreadLimitPlugin(n_threads)
+        # `register_plugin` replaces `register_worker_plugin` from distributed 2023.9.2 onwards
+        if hasattr(client, "register_plugin"):
+            client.register_plugin(plugin)
+        else:
+            client.register_worker_plugin(plugin)
 
     return cluster
 
@@ -102,8 +306,7 @@ def blocking_cluster():
         scheduler_address = cfg.cluster.scheduler_address
         port = int(scheduler_address.split(":")[-1])
     try:
-        n_workers = cfg.cluster.n_workers
-        local_cluster = LocalCluster(scheduler_port=port, n_workers=n_workers)
+        local_cluster = default_cluster(scheduler_port=port)
         print(f"Started local cluster at {local_cluster.scheduler_address}")
     except OSError as e:
         print(f"Could not start local cluster with at port: {port}")
@@ -3,23 +3,28 @@ from __future__ import annotations
 import os
 import textwrap
 import warnings
-from functools import partial
+from functools import cached_property, partial
 from numbers import Number
-from typing import Optional, Any, Union, TYPE_CHECKING
+from typing import Optional, Any, Union, Callable, TYPE_CHECKING
 
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
 import torch
-from hdxrate import k_int_from_sequence
-from scipy import constants
+from scipy import constants, sparse
 from scipy.constants import R
 from scipy.integrate import solve_ivp
 
 from pyhdx.alignment import align_dataframes
 from pyhdx.fileIO import dataframe_to_file
-from pyhdx.process import verify_sequence, parse_temperature, correct_d_uptake, apply_control
-from pyhdx.support import reduce_inter, dataframe_intersection, array_intersection
+from pyhdx.process import (
+    verify_sequence,
+    parse_temperature,
+    correct_d_uptake,
+    apply_control,
+    k_int_from_sequence,
+)
+from pyhdx.support import reduce_inter, dataframe_intersection, array_intersection, hash_array
 from pyhdx.config import cfg
 
 if TYPE_CHECKING:
@@ -41,18 +46,21 @@ class Coverage:
             Optional, if not specified the amino acid sequence from the peptide data is used
             to (partially) reconstruct the sequence. Supplied amino acid sequence must be
             compatible with sequence information in the peptides.
+        coverage: Optional coverage object with the same peptides as `data`. If supplied, its
+            protein, `X` and `Z` are shared instead of constructed again.
 
     """
 
     X: np.ndarray
     """
     Np x Nr matrix (peptides x residues). Values are 1 where residue j is in peptide i.
+    Read-only, as it can be shared between coverage objects.
     """
 
     Z: np.ndarray
     """
     Np x Nr matrix (peptides x residues). Values are 1/(ex_residues) where residue j 
-    is in peptide i.
+    is in peptide i. Read-only, as it can be shared between coverage objects.
     """
     # todo account for prolines: so that rows sum to 1 is currently not true
 
@@ -62,15 +70,29 @@ class Coverage:
         n_term: Optional[int] = None,
         c_term: Optional[int] = None,
         sequence: Optional[str] = None,
+        coverage: Optional[Coverage] = None,
     ) -> None:
         for field in ["exposure", "state"]:
             if field in data and len(np.unique(data["exposure"])) != 1:
                 raise ValueError(f"Entries in field {field!r} must be unique")
-        try:
-            self.data = data.sort_values(["_start", "_stop"], axis=0)
-        except KeyError:
-            self.data = data.sort_values(["start", "stop"], axis=0)
-        self.data.index.name = "peptide_id"  # todo check these are the same as parent object peptide_id (todo make wide instead of instersection)
+        by = ["_start", "_stop"] if "_start" in data else ["start", "stop"]
+        if _is_sorted(data, by):
+            # Peptide data of HDXMeasurement timepoints are sorted views which should not be copied
+            self.data = data.copy(deep=False)
+        else:
+            self.data = data.sort_values(by, axis=0)
+        # todo check these are the same as parent object peptide_id (todo make wide instead of instersection)
+        self.data.index = self.data.index.rename("peptide_id")
+
+        if coverage is not None:
+            columns = ["_start", "_stop"]
+            if not np.array_equal(self.data[columns].to_numpy(), coverage.data[columns].to_numpy()):
+                raise ValueError("Peptides in 'data' do not match the peptides of 'coverage'")
+            self.interval = coverage.interval
+            self.protein = coverage.protein
+            self.X, self.Z = coverage.X, coverage.Z
+            self._derived = coverage._derived
+            return
 
         seq_full, seq_r = verify_sequence(data, sequence, n_term, c_term)
 
@@ -89,17 +111,18 @@ class Coverage:
         self.protein = protein_df
 
         # matrix dimensions N_peptides N_residues, dtype for PyTorch compatibility
-        _exchanges = self["exchanges"]  # Array only on covered part
-        self.X = np.zeros((len(self.data), self.interval[1] - self.interval[0]), dtype=int)
-        self.Z = np.zeros_like(self.X, dtype=float)
-        for row, idx in enumerate(self.data.index):
-            # start, end are already corrected for drop_first parameter
-            start, end = self.data.loc[idx, "_start"], self.data.loc[idx, "_stop"]
-            i0, i1 = self.r_number.get_loc(start), self.r_number.get_loc(end - 1)
-            # i0, i1 = np.searchsorted(self.r_number, (entry['start'], entry['end']))
-            self.X[row][i0 : i1 + 1] = 1
-            self.Z[row][i0 : i1 + 1] = _exchanges.iloc[i0 : i1 + 1]
-        self.Z = self.Z / self.data["ex_residues"].to_numpy()[:, np.newaxis]
+        # start, stop are already corrected for drop_first parameter
+        i0, i1 = self._peptide_slices
+        columns = np.arange(self.interval[1] - self.interval[0])
+        self.X = ((columns >= i0[:, np.newaxis]) & (columns < i1[:, np.newaxis])).astype(int)
+        _exchanges = self["exchanges"].to_numpy()  # Array only on covered part
+        self.Z = self.X * _exchanges / self.data["ex_residues"].to_numpy()[:, np.newaxis]
+
+        self.X.flags.writeable = False
+        self.Z.flags.writeable = False
+
+        # Arrays derived from `X` and `Z`, shared by all objects sharing this coverage
+        self._derived: dict[str, Any] = {}
 
     def __len__(self) -> int:
         return len(self.data)
@@ -141,14 +164,54 @@ class Coverage:
 
         return covered_slice
 
+    @property
+    def _peptide_slices(self) -> tuple[np.ndarray, np.ndarray]:
+        """Start (inclusive) and stop (exclusive) column index of each peptide in `X`"""
+        i0 = self.data["_start"].to_numpy() - self.interval[0]
+        i1 = self.data["_stop"].to_numpy() - self.interval[0]
+
+        return i0, i1
+
+    @cached_property
+    def X_sparse(self) -> sparse.csr_matrix:
+        """`X` as sparse (CSR) matrix, constructed directly from the peptide intervals."""
+        i0, i1 = self._peptide_slices
+        indptr = np.concatenate([[0], np.cumsum(i1 - i0)])
+        indices = np.arange(indptr[-1]) - np.repeat(indptr[:-1] - i0, i1 - i0)
+        data = np.ones(indptr[-1], dtype=int)
+
+        return sparse.csr_matrix((data, indices, indptr), shape=self.X.shape)
+
     @property
     def percent_coverage(self) -> float:
         """Percentage of residues covered by peptides"""
         return 100 * np.mean(self.protein["coverage"])
 
+    def _get_derived(self, name: str, key: Any, func: Callable[[], Any]) -> Any:
+        """Returns the derived quantity `name`, computed by `func` if missing or if its `key` changed.
+
+        Array results are made read-only as they are shared between calls.
+        """
+        try:
+            cached_key, value = self._derived[name]
+            if cached_key == key:
+                return value
+        except KeyError:
+            pass
+
+        value = func()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        self._derived[name] = (key, value)
+
+        return value
+
     @property
     def redundancy(self) -> float:
         """Average redundancy of peptides in regions with at least 1 peptide"""
+        return self._get_derived("redundancy", None, self._redundancy)
+
+    def _redundancy(self) -> float:
         x_coverage = self.X[:, self["coverage"]]
         return float(np.mean(np.sum(x_coverage, axis=0)))
 
@@ -181,7 +244,9 @@ class Coverage:
     @property
     def block_length(self) -> np.ndarray:
         """Lengths of unique blocks of residues in the peptides map, along the `r_number` axis"""
+        return self._get_derived("block_length", None, self._block_length)
 
+    def _block_length(self) -> np.ndarray:
         # indices are start and stop values of blocks
         indices = np.sort(np.concatenate([self.data["_start"], self.data["_stop"]]))
         # indices of insertion into r_number vector gives us blocks with taking prolines into account.
@@ -193,12 +258,22 @@ class Coverage:
     @property
     def X_norm(self) -> np.ndarray:
         """`X` coefficient matrix normalized column-wise."""
-        return self.X / np.sum(self.X, axis=0)[np.newaxis, :]
+        return self._get_derived(
+            "X_norm", None, lambda: self.X / np.sum(self.X, axis=0)[np.newaxis, :]
+        )
 
     @property
     def Z_norm(self) -> np.ndarray:
-        """`Z` Coefficient matrix normalized column-wise."""
-        wts = self.Z**cfg.analysis.weight_exponent
+        """`Z` Coefficient matrix normalized column-wise.
+
+        Weights are `Z` raised to the power `cfg.analysis.weight_exponent`, the result is
+        recomputed when this configuration value changes.
+        """
+        weight_exponent = cfg.analysis.weight_exponent
+        return self._get_derived("Z_norm", weight_exponent, lambda: self._z_norm(weight_exponent))
+
+    def _z_norm(self, weight_exponent: float) -> np.ndarray:
+        wts = self.Z**weight_exponent
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=RuntimeWarning)
             z_norm = wts / np.sum(wts, axis=0)[np.newaxis, :]
@@ -223,6 +298,130 @@ class Coverage:
         return sections
 
 
+def _is_sorted(data: pd.DataFrame, by: list[str]) -> bool:
+    """Checks if the rows of `data` are sorted by the columns `by`."""
+    order = np.lexsort([data[column].to_numpy() for column in reversed(by)])
+    return bool(np.all(order == np.arange(len(data))))
+
+
+class PeptideStore:
+    """Compact storage of peptide data of a single state measured at multiple timepoints.
+
+    Fields which have the same values at all timepoints (start, stop, sequence, ...) are
+    stored once in the `peptides` table, fields which vary between timepoints (uptake, rfu, ...)
+    are stored as `(Np, Nt)` arrays.
+
+    Args:
+        peptides: DataFrame with fields which are equal for all timepoints, one row per peptide.
+        arrays: Dictionary of `(Np, Nt)` arrays of fields which vary between timepoints.
+        timepoints: Deuterium exposure times.
+        columns: Order of the fields in the peptide data.
+
+    """
+
+    def __init__(
+        self,
+        peptides: pd.DataFrame,
+        arrays: dict[str, np.ndarray],
+        timepoints: np.ndarray,
+        columns: list[str],
+    ) -> None:
+        self.peptides = peptides
+        self.arrays = arrays
+        self.timepoints = timepoints
+        self.columns = columns
+
+    @classmethod
+    def from_dataframes(
+        cls, dataframes: list[pd.DataFrame], timepoints: np.ndarray, by: list[str]
+    ) -> PeptideStore:
+        """Create a peptide store from the peptide data of each timepoint.
+
+        Args:
+            dataframes: List of DataFrames, one per timepoint, which have the same peptides in
+                the same order.
+            timepoints: Deuterium exposure times of the DataFrames.
+            by: Fields to sort the peptides by.
+
+        Returns:
+            The peptide store.
+
+        """
+        df_0 = dataframes[0]
+        order = np.lexsort([df_0[column].to_numpy() for column in reversed(by)])
+
+        peptides, arrays = {}, {}
+        for column in df_0.columns:
+            if all(df[column].equals(df_0[column]) for df in dataframes[1:]):
+                peptides[column] = df_0[column].to_numpy()[order]
+            else:
+                values = np.stack([df[column].to_numpy() for df in dataframes], axis=1)
+                arrays[column] = values[order]
+
+        index = pd.Index(df_0.index[order], name="peptide_id")
+        peptides_df = pd.DataFrame(peptides, index=index)
+
+        return cls(peptides_df, arrays, timepoints, list(df_0.columns))
+
+    @property
+    def Np(self) -> int:
+        """Number of peptides."""
+        return len(self.peptides)
+
+    @property
+    def Nt(self) -> int:
+        """Number of timepoints."""
+        return len(self.timepoints)
+
+    def field(self, field: str) -> np.ndarray:
+        """Returns the values of `field` as `(Np, Nt)` array."""
+        try:
+            return self.arrays[field]
+        except KeyError:
+            values = self.peptides[field].to_numpy()
+            return np.broadcast_to(values[:, np.newaxis], (self.Np, self.Nt))
+
+    def get_frame(self, field: str) -> pd.DataFrame:
+        """Returns the values of `field` as `(Np, Nt)` DataFrame with exposure columns."""
+        columns = pd.Index(self.timepoints, name="exposure")
+        return pd.DataFrame(self.field(field), index=self.peptides.index, columns=columns)
+
+    def timepoint_data(self, i: int) -> pd.DataFrame:
+        """Returns the peptide data of the `i`'th timepoint.
+
+        The returned DataFrame shares memory with this store.
+        """
+        data = {
+            column: (
+                self.arrays[column][:, i]
+                if column in self.arrays
+                else self.peptides[column].to_numpy()
+            )
+            for column in self.columns
+        }
+
+        return pd.DataFrame(data, index=self.peptides.index, copy=False)
+
+    def memory_usage(self, deep: bool = True) -> pd.Series:
+        """Memory usage of the peptide table and of the arrays of each field in bytes.
+
+        Args:
+            deep: If `True`, includes the memory of the Python objects in object fields.
+
+        Returns:
+            Memory usage per item.
+
+        """
+        usage = {"peptides": self.peptides.memory_usage(index=True, deep=deep).sum()}
+        for field, array in self.arrays.items():
+            if deep and array.dtype == object:
+                usage[field] = pd.Series(array.ravel()).memory_usage(index=False, deep=True)
+            else:
+                usage[field] = array.nbytes
+
+        return pd.Series(usage)
+
+
 class HDXMeasurement:
     """Main HDX data object.
 
@@ -236,9 +435,9 @@ class HDXMeasurement:
 
     Attributes:
         coverage: Coverage object describing peptide layout.
-        data: DataFrame with all peptides, taking only peptides present in all timepoints.
         peptides: List of `HDXTimepoint` objects, one per exposure.
         state: Protein state label for this HDX measurement.
+        store: Peptide data of all timepoints, taking only peptides present in all timepoints.
         timepoints: Deuterium exposure times.
     """
 
@@ -255,15 +454,27 @@ class HDXMeasurement:
         df_list = [(data[data["exposure"] == exposure]) for exposure in self.timepoints]
 
         intersected_data = dataframe_intersection(df_list, by=["start", "stop"])
+        by = ["_start", "_stop"] if "_start" in data else ["start", "stop"]
+        self.store = PeptideStore.from_dataframes(intersected_data, self.timepoints, by=by)
+        self._build_coverage()
+
+        # Tensors returned by `get_tensors`, keyed by their arguments
+        self._tensor_cache: dict[tuple, tuple[int, dict[str, torch.Tensor]]] = {}
+        # DataFrames returned by `data` and `data_wide`, keyed by the store they are created from
+        self._derived: dict[str, tuple[PeptideStore, pd.DataFrame]] = {}
+
+    def _build_coverage(self) -> None:
+        """Creates the coverage and timepoint objects from the peptide store."""
+        # Create coverage object from the first time point (as all are now equal), which is
+        # shared by all timepoints. Timepoint data are views of the peptide store.
+        cov_kwargs = {kwarg: self.metadata.get(kwarg) for kwarg in ["c_term", "n_term", "sequence"]}
+        self.coverage: Coverage = Coverage(self.store.timepoint_data(0), **cov_kwargs)
 
-        cov_kwargs = {kwarg: metadata.get(kwarg) for kwarg in ["c_term", "n_term", "sequence"]}
         self.peptides: list[HDXTimepoint] = [
-            HDXTimepoint(df, **cov_kwargs) for df in intersected_data
+            HDXTimepoint(self.store.timepoint_data(i), coverage=self.coverage)
+            for i in range(self.Nt)
         ]
 
-        # Create coverage object from the first time point (as all are now equal)
-        self.coverage: Coverage = Coverage(intersected_data[0], **cov_kwargs)
-
         if self.temperature and self.pH:
             # list(self.protein["sequence"])
             k_int_array = k_int_from_sequence(
@@ -273,18 +484,21 @@ class HDXMeasurement:
             # k_int = self.coverage.protein.get_k_int(self.temperature, self.pH)
             self.coverage.protein["k_int"] = k_int_array
 
-        self.data: pd.DataFrame = pd.concat(
-            intersected_data, axis=0, ignore_index=True
-        ).sort_values(["start", "stop", "sequence", "exposure"])
-        self.data["peptide_id"] = self.data.index % self.Np
-        self.data.index.name = (
-            "peptide_index"  # index is original index which continues along exposures
-        )
-        self.data_wide = (
-            self.data.pivot(index="peptide_id", columns=["exposure"])
-            .reorder_levels([1, 0], axis=1)
-            .sort_index(axis=1, level=0, sort_remaining=False)
-        )
+    def __getstate__(self) -> dict[str, Any]:
+        # Only the peptide store and metadata are pickled; coverage and timepoint objects are
+        # derived from the store and are rebuilt on first access after unpickling.
+        state = {k: v for k, v in self.__dict__.items() if k not in ["coverage", "peptides"]}
+        state["_tensor_cache"] = {}
+        state["_derived"] = {}
+
+        return state
+
+    def __getattr__(self, name: str) -> Any:
+        # Called only for missing attributes, ie coverage and timepoints of unpickled objects
+        if name in ["coverage", "peptides"] and "store" in self.__dict__:
+            self._build_coverage()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     @classmethod
     def from_dataset(cls, dataset: HDXDataSet, state: str | int, **metadata) -> HDXMeasurement:
@@ -398,16 +612,84 @@ class HDXMeasurement:
     def __getitem__(self, item):
         return self.peptides.__getitem__(item)
 
+    @property
+    def data(self) -> pd.DataFrame:
+        """DataFrame with all peptides, taking only peptides present in all timepoints.
+
+        Rows are sorted by peptide and then by exposure. The index continues along exposures,
+        the peptide index is given by the `peptide_id` field.
+
+        The DataFrame is created from the peptide store on first access and cached, modifications
+        are not propagated to the peptide store.
+        """
+        return self._get_derived("data", self.store, self._build_data)
+
+    @property
+    def data_wide(self) -> pd.DataFrame:
+        """DataFrame with all peptides in wide format.
+
+        Columns are multiindex by (exposure, field), the index is the peptide index.
+
+        The DataFrame is created from the peptide store on first access and cached, modifications
+        are not propagated to the peptide store.
+        """
+        return self._get_derived("data_wide", self.store, self._build_data_wide)
+
+    def _get_derived(self, name: str, key: Any, func: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Returns the DataFrame `name`, created by `func` if missing or if its `key` changed."""
+        cached_key, df = self._derived.get(name, (None, None))
+        if df is None or cached_key is not key:
+            df = func()
+            self._derived[name] = (key, df)
+
+        return df
+
+    def _build_data(self) -> pd.DataFrame:
+        df_list = [
+            self.store.timepoint_data(i).set_axis(i * self.Np + self.store.peptides.index, axis=0)
+            for i in range(self.Nt)
+        ]
+        df = pd.concat(df_list, axis=0).sort_values(["start", "stop", "sequence", "exposure"])
+        df["peptide_id"] = df.index % self.Np
+        df.index.name = "peptide_index"
+
+        return df
+
+    def _build_data_wide(self) -> pd.DataFrame:
+        df_list = [self.store.timepoint_data(i).drop(columns="exposure") for i in range(self.Nt)]
+        df = pd.concat(df_list, axis=1, keys=self.timepoints, names=["exposure", None])
+
+        return df.sort_index(axis=0)
+
+    def memory_usage(self, deep: bool = True) -> pd.Series:
+        """Memory usage of this HDX measurement in bytes.
+
+        Timepoint data are views of the peptide store and are not counted separately.
+
+        Args:
+            deep: If `True`, includes the memory of the Python objects in object fields.
+
+        Returns:
+            Memory usage of the peptide store, per item, and of the coverage matrices.
+
+        """
+        coverage = {
+            "protein": self.coverage.protein.memory_usage(index=True, deep=deep).sum(),
+            "X": self.coverage.X.nbytes,
+            "Z": self.coverage.Z.nbytes,
+        }
+
+        return pd.concat([self.store.memory_usage(deep=deep), pd.Series(coverage)])
+
     @property
     def rfu_residues(self) -> pd.DataFrame:
         """Relative fractional uptake per residue.
 
         Shape of the returned DataFrame is `(Nr, Nt)`.
         """
-        df = pd.concat([v.rfu_residues for v in self], keys=self.timepoints, axis=1)
-        df.columns.name = "exposure"
+        array = self.coverage.Z_norm.T @ self.store.field("rfu")
 
-        return df
+        return self._residue_frame(array)
 
     @property
     def rfu_residues_sd(self) -> pd.DataFrame:
@@ -415,11 +697,14 @@ class HDXMeasurement:
 
         Shape of the returned DataFrame is `(Nr, Nt)`.
         """
+        array = np.sqrt((self.coverage.Z_norm**2).T @ self.store.field("rfu_sd") ** 2)
 
-        df = pd.concat([v.rfu_residues_sd for v in self], keys=self.timepoints, axis=1)
-        df.columns.name = "exposure"
+        return self._residue_frame(array)
 
-        return df
+    def _residue_frame(self, array: np.ndarray) -> pd.DataFrame:
+        """Wraps a `(Nr, Nt)` array of per-residue values in a DataFrame."""
+        columns = pd.Index(self.timepoints, name="exposure")
+        return pd.DataFrame(array, index=self.coverage.index, columns=columns)
 
     @property
     def rfu_peptides(self) -> pd.DataFrame:
@@ -427,9 +712,7 @@ class HDXMeasurement:
 
         Shape of the returned DataFrame is `(Np, Nt)`.
         """
-        df = pd.concat([v.rfu_peptides for v in self], keys=self.timepoints, axis=1)
-        df.columns.name = "exposure"
-        return df
+        return self.store.get_frame("rfu")
 
     @property
     def d_exp(self) -> pd.DataFrame:
@@ -437,13 +720,14 @@ class HDXMeasurement:
 
         Shape of the returned DataFrame is `(Np, Nt)`.
         """
-        df = pd.concat([v.d_exp for v in self], keys=self.timepoints, axis=1)
-        df.columns.name = "exposure"
-        return df
+        return self.store.get_frame("uptake_corrected")
 
     # todo check shapes of k_int and timepoints, compared to their shapes in hdxmeasurementset
     def get_tensors(
-        self, exchanges: bool = False, dtype: Optional[torch.dtype] = cfg.TORCH_DTYPE
+        self,
+        exchanges: bool = False,
+        dtype: Optional[torch.dtype] = cfg.TORCH_DTYPE,
+        layout: Optional[str] = None,
     ) -> dict[str, torch.Tensor]:
         """Returns a dictionary of tensor variables for fitting HD kinetics.
 
@@ -452,6 +736,9 @@ class HDXMeasurement:
                 (ie have peptides and are not prolines).
             dtype: Optional Torch data type. Use torch.float32 for faster fitting of large data
                 sets, possibly at the expense of accuracy.
+            layout: Optional layout of the `X` tensor, either 'dense' or 'sparse'. If `None`,
+                the layout is taken from the global config. The 'packed' layout is equal to
+                'sparse' for a single measurement.
 
         Returns:
             Dictionary with tensors.
@@ -462,12 +749,29 @@ class HDXMeasurement:
             * k_int `(Nr, 1)`
             * timepoints `(1, Nt)`
             * d_exp `(Np, Nt)`
+
+        Note: Tensors are cached and views of the same tensors are returned on subsequent
+            calls, until the underlying data is modified or the cache is cleared with
+            [clear_tensor_cache][models.HDXMeasurement.clear_tensor_cache]. The returned tensors
+            are detached views which must not be modified in place. Validity of cached tensors
+            is checked by hashing the data, which is skipped while the cache is empty.
         """
 
         if "k_int" not in self.coverage.protein:
             raise ValueError(
                 "Unknown intrinsic rates of exchange, please supply pH and temperature parameters"
             )
+
+        dtype = dtype or cfg.TORCH_DTYPE
+        device = cfg.TORCH_DEVICE
+        layout = layout or cfg.TORCH_LAYOUT
+        layout = "sparse" if layout == "packed" else layout
+
+        key = (exchanges, dtype, device, layout)
+        token = _cached_tensors(self, key)
+        if isinstance(token, dict):
+            return token
+
         try:
             d_exp = self.d_exp  # noqa
         except ValueError:
@@ -479,22 +783,37 @@ class HDXMeasurement:
         else:
             bools = np.ones(self.Nr, dtype=bool)
 
-        dtype = dtype or cfg.TORCH_DTYPE
-        device = cfg.TORCH_DEVICE
-
         tensors = {
             "temperature": torch.tensor([self.temperature], dtype=dtype, device=device).unsqueeze(
                 -1
             ),
-            "X": torch.tensor(self.coverage.X[:, bools], dtype=dtype, device=device),
+            "X": coverage_tensor(self.coverage.X[:, bools], dtype, device, layout),
             "k_int": torch.tensor(
                 self.coverage["k_int"].to_numpy()[bools], dtype=dtype, device=device
             ).unsqueeze(-1),
             "timepoints": torch.tensor(self.timepoints, dtype=dtype, device=device).unsqueeze(0),
             "d_exp": torch.tensor(self.d_exp.to_numpy(), dtype=dtype, device=device),
         }
+        self._tensor_cache[key] = (token, tensors)
+
+        return detach_tensors(tensors)
+
+    def _tensor_token(self) -> int:
+        """Hash of the data from which tensors are created."""
+        arrays = [
+            np.array([self.temperature], dtype=float),
+            self.timepoints,
+            self.coverage.X,
+            self.coverage.protein["k_int"].to_numpy(),
+            self.coverage.protein["exchanges"].to_numpy(),
+            self.store.field("uptake_corrected"),
+        ]
 
-        return tensors
+        return hash(tuple(hash_array(array) for array in arrays))
+
+    def clear_tensor_cache(self) -> None:
+        """Removes tensors cached by [get_tensors][models.HDXMeasurement.get_tensors]."""
+        self._tensor_cache.clear()
 
     def guess_deltaG(self, rates: pd.Series, correct_c_term: bool = True) -> pd.Series:
         """Obtain ΔG initial guesses from apparent H/D exchange rates.
@@ -800,6 +1119,12 @@ class HDXMeasurementSet:
         self.aligned_indices = None
         self.aligned_dataframes = None
 
+        # Tensors returned by `get_tensors`, keyed by their arguments
+        self._tensor_cache: dict[tuple, tuple[int, dict[str, torch.Tensor]]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_tensor_cache": {}}
+
     def __iter__(self):
         return self.hdxm_list.__iter__()
 
@@ -922,32 +1247,84 @@ class HDXMeasurementSet:
 
         self.aligned_indices = df.to_numpy(dtype=int).T
 
-    def get_tensors(self, dtype: Optional[torch.dtype] = None) -> dict[str, torch.Tensor]:
+    def get_tensors(
+        self, dtype: Optional[torch.dtype] = None, layout: Optional[str] = None
+    ) -> dict[str, torch.Tensor]:
         """Returns a dictionary of tensor variables for fitting HD kinetics.
 
         Args:
             dtype: Optional Torch data type. Use torch.float32 for faster fitting of large data
                 sets, possibly at the expense of accuracy.
+            layout: Optional layout of the `X` tensor, either 'dense', 'sparse' or 'packed'. If
+                `None`, the layout is taken from the global config. In the 'packed' layout,
+                peptides of all measurements are concatenated instead of padded to the largest
+                number of peptides, and `X` is returned as :class:`PackedCoverage`.
 
         Returns:
             Dictionary with tensors.
 
         Note: Tensor output and shapes:
             * temperature `(Ns, 1, 1)`
-            * X `(Ns, Np, Nr)`
+            * X `(Ns, Np, Nr)`, or `(P, Ns*Nr)` for the 'packed' layout
             * k_int `(Ns, Nr, 1)`
             * timepoints `(Ns, 1, Nt)`
-            * d_exp `(Ns, Np, Nt)`
+            * d_exp `(Ns, Np, Nt)`, or `(P, Nt)` for the 'packed' layout
+
+            Where P is the total number of peptides of all measurements.
+
+        Note: Tensors are cached and views of the same tensors are returned on subsequent
+            calls, until the underlying data is modified or the cache is cleared with
+            [clear_tensor_cache][models.HDXMeasurementSet.clear_tensor_cache]. The returned
+            tensors are detached views which must not be modified in place. Validity of cached
+            tensors is checked by hashing the data, which is skipped while the cache is empty.
 
         """
         # todo create correct shapes as per table in docstring for all
 
+        dtype = dtype or cfg.TORCH_DTYPE
+        device = cfg.TORCH_DEVICE
+        layout = layout or cfg.TORCH_LAYOUT
+
+        key = (dtype, device, layout)
+        token = _cached_tensors(self, key)
+        if isinstance(token, dict):
+            return token
+
         # TODO property?
         temperature = np.array([kf.temperature for kf in self.hdxm_list])
 
-        X_values = np.concatenate([hdxm.coverage.X.flatten() for hdxm in self.hdxm_list])
-        X = np.zeros((self.Ns, self.Np, self.Nr))
-        X[self.masks["spr"]] = X_values
+        if layout == "dense":
+            X_values = np.concatenate([hdxm.coverage.X.flatten() for hdxm in self.hdxm_list])
+            X = np.zeros((self.Ns, self.Np, self.Nr))
+            X[self.masks["spr"]] = X_values
+            X_tensor = coverage_tensor(X, dtype, device, layout)
+            d_exp = self.d_exp
+        elif layout == "sparse":
+            s, p, r, values = self._coverage_nonzero()
+            X_tensor = sparse_tensor(
+                np.stack([s, p, r]), values, (self.Ns, self.Np, self.Nr), dtype, device
+            )
+            d_exp = self.d_exp
+        elif layout == "packed":
+            s, p, r, values = self._coverage_nonzero()
+            offsets = np.cumsum([0] + [hdxm.Np for hdxm in self.hdxm_list])
+            X_packed = sparse_tensor(
+                np.stack([offsets[s] + p, s * self.Nr + r]),
+                values,
+                (offsets[-1], self.Ns * self.Nr),
+                dtype,
+                device,
+            )
+            state_index = np.repeat(np.arange(self.Ns), np.diff(offsets))
+            X_tensor = PackedCoverage(
+                X_packed,
+                torch.tensor(state_index, device=device),
+                torch.tensor(offsets, device=device),
+                self.Nr,
+            )
+            d_exp = self.d_exp[self.masks["spt"][..., 0]]
+        else:
+            raise ValueError(f"Invalid layout {layout!r}, must be 'dense', 'sparse' or 'packed'")
 
         k_int_values = np.concatenate(
             [hdxm.coverage["k_int"].to_numpy() for hdxm in self.hdxm_list]
@@ -955,24 +1332,48 @@ class HDXMeasurementSet:
         k_int = np.zeros((self.Ns, self.Nr))
         k_int[self.masks["sr"]] = k_int_values
 
-        dtype = dtype or cfg.TORCH_DTYPE
-        device = cfg.TORCH_DEVICE
-
         tensors = {
             "temperature": torch.tensor(temperature, dtype=dtype, device=device).reshape(
                 self.Ns, 1, 1
             ),
-            "X": torch.tensor(X, dtype=dtype, device=device),
+            "X": X_tensor,
             "k_int": torch.tensor(k_int, dtype=dtype, device=device).reshape(self.Ns, self.Nr, 1),
             "timepoints": torch.tensor(self.timepoints, dtype=dtype, device=device).reshape(
                 self.Ns, 1, self.Nt
             ),
             "d_exp": torch.tensor(
-                self.d_exp, dtype=dtype, device=device
+                d_exp, dtype=dtype, device=device
             ),  # todo this is called uptake_corrected/D/uptake
         }
+        self._tensor_cache[key] = (token, tensors)
+
+        return detach_tensors(tensors)
+
+    def _tensor_token(self) -> int:
+        """Hash of the data from which tensors are created."""
+        tokens = [hdxm._tensor_token() for hdxm in self.hdxm_list]
+        tokens += [hash_array(self.timepoints), hash_array(self.d_exp)]
+
+        return hash(tuple(tokens))
 
-        return tensors
+    def clear_tensor_cache(self) -> None:
+        """Removes tensors cached by [get_tensors][models.HDXMeasurementSet.get_tensors] of this
+        set and of its measurements."""
+        self._tensor_cache.clear()
+        for hdxm in self.hdxm_list:
+            hdxm.clear_tensor_cache()
+
+    def _coverage_nonzero(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """State, peptide and residue indices and values of nonzero elements of the padded
+        `(Ns, Np, Nr)` coupling matrix"""
+        indices = []
+        for i, hdxm in enumerate(self.hdxm_list):
+            i0 = hdxm.coverage.interval[0] - self.coverage.interval[0]
+            X = hdxm.coverage.X_sparse.tocoo()
+            indices.append((np.full_like(X.row, i), X.row, X.col + i0, X.data))
+
+        s, p, r, values = (np.concatenate(arrays) for arrays in zip(*indices))
+        return s, p, r, values
 
     @property
     def exchanges(self) -> np.ndarray:
@@ -1019,6 +1420,186 @@ class HDXMeasurementSet:
         )
 
 
+def detach_tensors(tensors: dict[str, Any]) -> dict[str, Any]:
+    """Returns a dictionary of detached views of `tensors`, such that changes to for example
+    `requires_grad` of the returned tensors do not affect the originals."""
+    detached = {}
+    for k, v in tensors.items():
+        if isinstance(v, PackedCoverage):
+            v = PackedCoverage(v.X.detach(), v.state_index, v.offsets, v.Nr)
+        detached[k] = v.detach() if isinstance(v, torch.Tensor) else v
+
+    return detached
+
+
+def _cached_tensors(
+    obj: Union[HDXMeasurement, HDXMeasurementSet], key: tuple
+) -> Union[dict[str, torch.Tensor], int, None]:
+    """Returns valid cached tensors of `obj` for `key`, or otherwise the token of the current
+    data to store new tensors with. The token is `None` if the cache is empty, in which case new
+    tensors are stored without token and are created again on the next call."""
+    if not obj._tensor_cache:
+        return None
+
+    token = obj._tensor_token()
+    if key in obj._tensor_cache and obj._tensor_cache[key][0] == token:
+        return detach_tensors(obj._tensor_cache[key][1])
+
+    return token
+
+
+def coverage_tensor(
+    X: np.ndarray, dtype: torch.dtype, device: torch.device, layout: str = "dense"
+) -> torch.Tensor:
+    """Convert a peptide/residue coupling matrix to a torch tensor.
+
+    Args:
+        X: Coupling matrix of shape `(Np, Nr)` or `(Ns, Np, Nr)`.
+        dtype: Torch data type.
+        device: Torch device.
+        layout: Either 'dense' or 'sparse'. Sparse tensors are returned in coalesced COO format.
+
+    Returns:
+        The coupling matrix as tensor.
+
+    """
+    if layout == "dense":
+        return torch.tensor(X, dtype=dtype, device=device)
+    elif layout == "sparse":
+        indices = np.nonzero(X)
+        return sparse_tensor(np.stack(indices), X[indices], X.shape, dtype, device)
+    else:
+        raise ValueError(f"Invalid layout {layout!r}, must be 'dense' or 'sparse'")
+
+
+def sparse_tensor(
+    indices: np.ndarray,
+    values: np.ndarray,
+    size: tuple[int, ...],
+    dtype: torch.dtype,
+    device: torch.device,
+) -> torch.Tensor:
+    """Create a coalesced sparse COO tensor.
+
+    Args:
+        indices: Array of shape `(ndim, nnz)` with indices of nonzero elements.
+        values: Array of shape `(nnz, )` with values of nonzero elements.
+        size: Shape of the tensor.
+        dtype: Torch data type.
+        device: Torch device.
+
+    Returns:
+        The sparse tensor.
+
+    """
+    # indices are valid by construction
+    return torch.sparse_coo_tensor(
+        torch.as_tensor(indices),
+        torch.as_tensor(values),
+        size=tuple(int(i) for i in size),
+        dtype=dtype,
+        device=device,
+        check_invariants=False,
+    ).coalesce()
+
+
+class PackedCoverage:
+    """Coupling matrix of multiple HDX measurements where the peptides of all measurements are
+    concatenated.
+
+    Args:
+        X: Sparse (or dense) coupling matrix of shape `(P, Ns*Nr)`, where P is the total number of
+            peptides.
+            Residue `r` of state `s` is column `s*Nr + r`.
+        state_index: Index of the state of each peptide, shape `(P, )`.
+        offsets: Index of the first peptide of each state, followed by P, shape `(Ns + 1, )`.
+        Nr: Number of residues per state.
+
+    """
+
+    def __init__(
+        self, X: torch.Tensor, state_index: torch.Tensor, offsets: torch.Tensor, Nr: int
+    ) -> None:
+        self.X = X
+        self.state_index = state_index
+        self.offsets = offsets
+        self.Nr = Nr
+
+    @property
+    def Ns(self) -> int:
+        """Number of states"""
+        return len(self.offsets) - 1
+
+    @property
+    def P(self) -> int:
+        """Total number of peptides"""
+        return self.X.shape[0]
+
+    @property
+    def peptide_index(self) -> torch.Tensor:
+        """Index of each peptide within its state, shape `(P, )`"""
+        return torch.arange(self.P, device=self.offsets.device) - self.offsets[self.state_index]
+
+    def matmul(self, uptake: torch.Tensor) -> torch.Tensor:
+        """Calculate D-uptake per peptide from D-uptake per residue.
+
+        Args:
+            uptake: Tensor of shape `(..., Ns, Nr, Nt)`, or `(..., Nr, Nt)` for a single state.
+
+        Returns:
+            D-uptake per peptide, shape `(..., P, Nt)`.
+        """
+        if uptake.dim() >= 3 and uptake.shape[-3] == self.Ns:
+            uptake = uptake.flatten(-3, -2)
+        elif self.Ns != 1:
+            raise ValueError("Shape of 'uptake' does not match the number of states")
+
+        if not self.X.is_sparse:
+            return torch.matmul(self.X, uptake)
+
+        Nt = uptake.shape[-1]
+        *batch, N, _ = uptake.shape
+        u = uptake.movedim(-2, 0).reshape(N, -1)
+        d_calc = torch.sparse.mm(self.X, u)
+
+        return d_calc.reshape(self.P, *batch, Nt).movedim(0, -2)
+
+    def to_dense(self) -> PackedCoverage:
+        """Returns a copy with a dense coupling matrix."""
+        return PackedCoverage(self.X.to_dense(), self.state_index, self.offsets, self.Nr)
+
+    def to_padded(self, Np: int) -> torch.Tensor:
+        """Returns the coupling matrix in the dense zero-padded layout.
+
+        Args:
+            Np: Number of peptides per state of the padded coupling matrix.
+
+        Returns:
+            Dense coupling matrix of shape `(Ns, Np, Nr)`.
+        """
+        X = self.X.to_dense().reshape(self.P, self.Ns, self.Nr)
+        rows = X[torch.arange(self.P, device=X.device), self.state_index]
+
+        return self.pad(rows, Np)
+
+    def pad(self, packed: torch.Tensor, Np: int) -> torch.Tensor:
+        """Scatter packed peptide data into a zero-padded tensor.
+
+        Args:
+            packed: Tensor of shape `(..., P, Nt)`.
+            Np: Number of peptides of the padded tensor.
+
+        Returns:
+            Padded tensor of shape `(..., Ns, Np, Nt)`.
+        """
+
+        *batch, _, Nt = packed.shape
+        padded = packed.new_zeros((*batch, self.Ns, Np, Nt))
+        padded[..., self.state_index, self.peptide_index, :] = packed
+
+        return padded
+
+
 # https://stackoverflow.com/questions/4494404/find-large-number-of-consecutive-values-fulfilling-condition-in-a-numpy-array
 def contiguous_regions(condition):
     """Finds contiguous True regions of the boolean array "condition". Returns
@@ -1046,6 +1627,60 @@ def contiguous_regions(condition):
     return idx
 
 
+def linderstrom_lang_uptake(
+    timepoints: npt.ArrayLike,
+    k_open: npt.ArrayLike,
+    k_close: npt.ArrayLike,
+    k_int: npt.ArrayLike,
+    populations: bool = False,
+) -> np.ndarray:
+    """D-uptake of residues exchanging according to the Linderstrøm-Lang model.
+
+    Residues exchange between a closed and an open state with rates `k_open` and `k_close`, and
+    exchange from the open state with intrinsic rate `k_int`. The linear 3-state system is solved
+    exactly, starting from equilibrium populations of the closed and open states.
+
+    Rate arguments are broadcast against each other, such that D-uptake of all residues of all
+    peptides, and of grids of (k_open, k_close) values, can be evaluated at once.
+
+    Args:
+        timepoints: Shape `(Nt,)` array of timepoints.
+        k_open: Opening rates.
+        k_close: Closing rates.
+        k_int: Intrinsic rates of exchange.
+        populations: If `True`, returns populations of the closed, open and exchanged states
+            instead of D-uptake.
+
+    Returns:
+        Shape `(..., Nt)` array of D-uptake, where `...` is the broadcast shape of `k_open`,
+        `k_close` and `k_int`, or shape `(..., Nt, 3)` array of populations.
+
+    """
+    t = np.asarray(timepoints, dtype=float)
+    k_open, k_close, k_int = (
+        np.asarray(k, dtype=float)[..., np.newaxis] for k in (k_open, k_close, k_int)
+    )
+
+    # Closed and open states decay with rates r1 and r1 + s, the eigenvalues of the rate matrix
+    k_tot = k_open + k_close + k_int
+    s = np.sqrt((k_open - k_int) ** 2 + k_close * (k_close + 2 * k_open + 2 * k_int))
+    r1 = 2 * k_open * k_int / (k_tot + s)
+
+    # tau = (1 - exp(-s*t)) / s, which goes to t for s*t -> 0
+    st = s * t
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = np.where(st > 1e-8, -np.expm1(-st) / s, t * (1 - st / 2))
+
+    decay = np.exp(-r1 * t)
+    open_0 = k_open / (k_open + k_close)
+    if populations:
+        closed = decay * (1 - open_0) * (1 + r1 * tau)
+        opened = decay * open_0 * (1 + (r1 - k_int) * tau)
+        return np.stack([closed, opened, 1 - closed - opened], axis=-1)
+    else:
+        return -np.expm1(-r1 * t) - decay * (r1 - k_int * open_0) * tau
+
+
 class PeptideUptakeModel:
     """Model D-uptake in a single peptide.
 
@@ -1073,22 +1708,22 @@ class PeptideUptakeModel:
     ) -> np.ndarray:
         """Evaluate D-uptake for the given peptide at specified timepoints.
 
+        Uses the exact solution of the Linderstrøm-Lang model, see
+        [linderstrom_lang_uptake][models.linderstrom_lang_uptake].
 
         Args:
             timepoints: Shape `(t,)` array with timepoints to sample.
-            k_open: Shape `(k,)` array with opening rates (length equal to peptide length).
-            k_close: Shape `(k,)` array with closing rates (length equal to peptide length).
+            k_open: Shape `(..., k)` array with opening rates (length equal to peptide length).
+                Leading dimensions evaluate multiple sets of rates at once.
+            k_close: Shape `(..., k)` array with closing rates (length equal to peptide length).
 
         Returns:
-            Shape (`t, k`) array with D-uptake values per amino acid per timepoint.
+            Shape (`..., t, k`) array with D-uptake values per amino acid per timepoint.
         """
 
-        k_tot = k_open + k_close + self.k_int
-        k_obs = 0.5 * (k_tot - np.sqrt((k_tot**2) - 4 * k_open * self.k_int))
-
-        D_obs = 1 - np.exp(-k_obs[np.newaxis, :] * timepoints[:, np.newaxis])
+        D_obs = linderstrom_lang_uptake(timepoints, k_open, k_close, self.k_int)
 
-        return D_obs
+        return np.swapaxes(D_obs, -1, -2)
 
     def eval_single_numerical(
         self,
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from functools import reduce
+import hashlib
+import os
+import tempfile
+from functools import reduce, lru_cache
 import warnings
-from typing import Optional, Literal, Union
+from pathlib import Path
+from typing import Optional, Literal, Union, Iterable
 
+import hdxrate
 import pandas as pd
 import numpy as np
 
+from pyhdx.config import cfg
 from pyhdx.support import convert_time, dataframe_intersection
 
 
@@ -201,23 +207,37 @@ def verify_sequence(
         raise ValueError(
             f"Peptide dataframe contains peptides with end residue number above supplied 'c_term' ({c_term})"
         )
+    for column in ["_sequence", "sequence"]:
+        if np.any(df[column].str.len() != df["stop"] - df["start"]):
+            raise ValueError(
+                f"Peptide dataframe contains peptides where the length of '{column}' does not match 'start' and 'stop'"
+            )
 
-    seq_full = pd.Series(index=r_number, dtype="U").fillna("X")
-    seq_reconstruct = pd.Series(index=r_number, dtype="U").fillna("X")
+    # Paste sequence information of all peptides at the correct positions. Where peptides overlap,
+    # the sequence of the first peptide in the dataframe is used.
+    start = df["start"].to_numpy()
+    length = df["stop"].to_numpy() - start
+    offset = np.cumsum(length) - length  # Offset of each peptide in the concatenated sequences
+    position = np.repeat(start - n_term - offset, length) + np.arange(length.sum())
+    position, first = np.unique(position, return_index=True)
 
-    # iterate over dataframe from C terminal peptides to N terminal peptides
-    # paste sequence information in pd.Series at the correct positions.
-    for idx in df.index[::-1]:
-        start, end = df.loc[idx, "start"], df.loc[idx, "stop"]
-        seq_full.loc[start : end - 1] = list(df.loc[idx, "_sequence"])
-        seq_reconstruct.loc[start : end - 1] = list(df.loc[idx, "sequence"])
+    full = np.full(len(r_number), "X", dtype=object)
+    full[position] = np.array(list("".join(df["_sequence"])), dtype=object)[first]
+    reconstruct = np.full(len(r_number), "X", dtype=object)
+    reconstruct[position] = np.array(list("".join(df["sequence"])), dtype=object)[first]
+
+    seq_full = pd.Series(full, index=r_number)
+    seq_reconstruct = pd.Series(reconstruct, index=r_number)
 
     if sequence:
-        for r, s1, s2 in zip(r_number, sequence, seq_full):
-            if s2 != "X" and s1 != s2:
-                raise ValueError(
-                    f"Mismatch in supplied sequence and peptides sequence at residue {r}, expected '{s2}', got '{s1}'"
-                )
+        n = min(len(sequence), len(seq_full))
+        supplied = np.array(list(sequence[:n]), dtype=object)
+        mismatch = np.flatnonzero((full[:n] != "X") & (full[:n] != supplied))
+        if len(mismatch):
+            i = mismatch[0]
+            raise ValueError(
+                f"Mismatch in supplied sequence and peptides sequence at residue {r_number[i]}, expected '{full[i]}', got '{supplied[i]}'"
+            )
         if len(sequence) != len(seq_full):
             raise ValueError(
                 "Invalid length of supplied sequence. Please check 'n_term' and 'c_term' parameters"
@@ -227,6 +247,63 @@ def verify_sequence(
     return seq_full, seq_reconstruct
 
 
+def k_int_from_sequence(
+    sequence: Union[str, Iterable[str]], temperature: float, pH: float
+) -> np.ndarray:
+    """Intrinsic rates of exchange of each residue in `sequence`.
+
+    Rates are calculated with `hdxrate` and cached (least recently used, up to 256 entries) by
+    sequence, temperature and pH, such that measurements of the same protein share the same
+    array. If `cfg.server.k_int_dir` is set, rates are also persisted to and loaded from
+    `.npy` files in this directory.
+
+    Args:
+        sequence: Amino acid sequence as string of one-letter codes or as iterable of residue codes
+            accepted by `hdxrate`, such as 'Pc' for cis-proline. Non-exchanging or unknown residues
+            are given by 'X'.
+        temperature: Temperature of the H/D exchange reaction (K).
+        pH: pH of the H/D exchange reaction.
+
+    Returns:
+        Read-only array of intrinsic rates of exchange (s^-1^).
+
+    """
+    return _k_int_cached(tuple(sequence), float(temperature), float(pH))
+
+
+@lru_cache(maxsize=256)
+def _k_int_cached(sequence: tuple[str, ...], temperature: float, pH: float) -> np.ndarray:
+    cache_dir = cfg.k_int_dir
+    if cache_dir:
+        key = f"{hdxrate.__version__}:{','.join(sequence)}:{temperature!r}:{pH!r}"
+        file_path = cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.npy"
+        try:
+            k_int = np.load(file_path)
+        except (OSError, ValueError):
+            k_int = hdxrate.k_int_from_sequence(list(sequence), temperature, pH)
+            _save_array(file_path, k_int)
+    else:
+        k_int = hdxrate.k_int_from_sequence(list(sequence), temperature, pH)
+
+    k_int.flags.writeable = False
+
+    return k_int
+
+
+def _save_array(file_path: Path, array: np.ndarray) -> None:
+    """Saves `array` to `file_path`, writing to a temporary file first such that concurrent readers
+    never see incomplete files."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
 def filter_peptides(
     df: pd.DataFrame,
     state: Optional[str] = None,
@@ -101,7 +101,7 @@ def hash_dataframe(df, method="builtin"):
 
 
 def hash_array(array, method="builtin"):
-    if method == "buitin":
+    if method == "builtin":
         return hash(array.data.tobytes())
     elif method == "md5":
         h = hashlib.md5(array.data.tobytes())
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import torch
+from scipy import ndimage
+
+from pyhdx.fitting_torch import DeltaGFit
+from pyhdx.models import sparse_tensor
+from pyhdx.process import correct_d_uptake, k_int_from_sequence
+
+# Natural abundance of amino acids in proteins (UniProtKB/Swiss-Prot), in percent
+AMINO_ACID_FREQUENCIES = {
+    "A": 8.25,
+    "R": 5.53,
+    "N": 4.06,
+    "D": 5.45,
+    "C": 1.37,
+    "Q": 3.93,
+    "E": 6.75,
+    "G": 7.07,
+    "H": 2.27,
+    "I": 5.96,
+    "L": 9.66,
+    "K": 5.84,
+    "M": 2.42,
+    "F": 3.86,
+    "P": 4.70,
+    "S": 6.56,
+    "T": 5.34,
+    "W": 1.08,
+    "Y": 2.92,
+    "V": 6.87,
+}
+
+# Monoisotopic residue masses (Da)
+RESIDUE_MASSES = {
+    "A": 71.03711,
+    "R": 156.10111,
+    "N": 114.04293,
+    "D": 115.02694,
+    "C": 103.00919,
+    "Q": 128.05858,
+    "E": 129.04259,
+    "G": 57.02146,
+    "H": 137.05891,
+    "I": 113.08406,
+    "L": 113.08406,
+    "K": 128.09496,
+    "M": 131.04049,
+    "F": 147.06841,
+    "P": 97.05276,
+    "S": 87.03203,
+    "T": 101.04768,
+    "W": 186.07931,
+    "Y": 163.06333,
+    "V": 99.06841,
+}
+
+WATER_MASS = 18.01056
+PROTON_MASS = 1.00728
+
+DYNAMX_COLUMNS = [
+    "Protein",
+    "Start",
+    "End",
+    "Sequence",
+    "Modification",
+    "Fragment",
+    "MaxUptake",
+    "MHP",
+    "State",
+    "Exposure",
+    "Center",
+    "Center SD",
+    "Uptake",
+    "Uptake SD",
+    "RT",
+    "RT SD",
+]
+
+
+def random_sequence(length: int, rng: Optional[np.random.Generator] = None) -> str:
+    """Generate a random protein sequence with natural amino acid frequencies.
+
+    Args:
+        length: Number of residues.
+        rng: Optional numpy random generator.
+
+    Returns:
+        Sequence in one-letter FASTA encoding, starting with methionine.
+
+    """
+    rng = rng or np.random.default_rng()
+    letters = np.array(list(AMINO_ACID_FREQUENCIES))
+    p = np.array(list(AMINO_ACID_FREQUENCIES.values()))
+    residues = rng.choice(letters, size=length - 1, p=p / p.sum())
+
+    return "M" + "".join(residues)
+
+
+def random_dG(
+    length: int,
+    low: float = 10e3,
+    high: float = 40e3,
+    correlation_length: float = 5.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Generate a random smooth ΔG profile.
+
+    Args:
+        length: Number of residues.
+        low: Lowest ΔG value (J/mol).
+        high: Highest ΔG value (J/mol).
+        correlation_length: Width (in residues) of the gaussian smoothing of the profile.
+        rng: Optional numpy random generator.
+
+    Returns:
+        Array of ΔG values (J/mol).
+
+    """
+    rng = rng or np.random.default_rng()
+    noise = ndimage.gaussian_filter1d(rng.normal(size=length), correlation_length, mode="wrap")
+    scaled = (noise - noise.min()) / (noise.max() - noise.min())
+
+    return low + (high - low) * scaled
+
+
+def generate_peptides(
+    sequence: str,
+    n_peptides: Optional[int] = None,
+    redundancy: float = 3.0,
+    mean_length: float = 12.0,
+    length_sd: float = 4.0,
+    min_length: int = 4,
+    max_length: int = 30,
+    n_term: int = 1,
+    rng: Optional[np.random.Generator] = None,
+) -> pd.DataFrame:
+    """Generate a random map of unique peptides.
+
+    Peptide lengths are normally distributed and clipped to (`min_length`, `max_length`), start
+    positions are uniformly distributed.
+
+    Args:
+        sequence: Protein sequence in one-letter FASTA encoding.
+        n_peptides: Number of peptides. If `None`, the number of peptides is chosen such that
+            on average each residue is covered by `redundancy` peptides.
+        redundancy: Average number of peptides per residue, used if `n_peptides` is `None`.
+        mean_length: Mean peptide length.
+        length_sd: Standard deviation of the peptide lengths.
+        min_length: Minimum peptide length.
+        max_length: Maximum peptide length.
+        n_term: Residue number of the first residue in `sequence`.
+        rng: Optional numpy random generator.
+
+    Returns:
+        DataFrame with 'start', 'end' (inclusive) and 'sequence' fields, sorted by start and end.
+
+    """
+    rng = rng or np.random.default_rng()
+    max_length = min(max_length, len(sequence))
+    if n_peptides is None:
+        n_peptides = int(round(redundancy * len(sequence) / mean_length))
+
+    intervals = np.empty((0, 2), dtype=int)
+    for _ in range(10):
+        size = 2 * n_peptides
+        lengths = np.rint(rng.normal(mean_length, length_sd, size=size)).astype(int)
+        lengths = np.clip(lengths, min_length, max_length)
+        start = rng.integers(0, len(sequence) - lengths + 1)
+        candidates = np.concatenate([intervals, np.stack([start, start + lengths], axis=1)])
+        _, index = np.unique(candidates, axis=0, return_index=True)
+        intervals = candidates[np.sort(index)][:n_peptides]
+        if len(intervals) == n_peptides:
+            break
+    else:
+        raise ValueError(
+            f"Could not generate {n_peptides} unique peptides, got {len(intervals)}. "
+            "Increase the protein or peptide length range."
+        )
+
+    intervals = intervals[np.lexsort([intervals[:, 1], intervals[:, 0]])]
+    peptides = pd.DataFrame(
+        {
+            "start": intervals[:, 0] + n_term,
+            "end": intervals[:, 1] + n_term - 1,
+            "sequence": [sequence[i0:i1] for i0, i1 in intervals],
+        }
+    )
+
+    return peptides
+
+
+def _peptide_mass(sequence: str) -> float:
+    """Monoisotopic mass of the singly protonated peptide."""
+    mass = sum(RESIDUE_MASSES.get(s, 0.0) for s in sequence) + WATER_MASS + PROTON_MASS
+    return round(mass, 4)
+
+
+def generate_dataset(
+    sequence: str,
+    dG: Union[npt.ArrayLike, dict[str, npt.ArrayLike]],
+    temperature: float,
+    pH: float,
+    timepoints: npt.ArrayLike,
+    peptides: pd.DataFrame,
+    d_percentage: float = 90.0,
+    drop_first: int = 1,
+    back_exchange: tuple[float, float] = (0.1, 0.4),
+    noise: float = 0.05,
+    fd_exposure: float = 60.0,
+    nd_control: bool = True,
+    n_term: int = 1,
+    protein: str = "synthetic",
+    rng: Optional[np.random.Generator] = None,
+) -> pd.DataFrame:
+    """Generate a synthetic DynamX state data peptide table.
+
+    D-uptake per residue is calculated from ΔG values with the
+    [DeltaGFit][fitting_torch.DeltaGFit] forward model. Residues count towards a peptide's D-uptake
+    unless they are among the first `drop_first` residues or prolines. D-uptake is scaled by the
+    deuterium percentage and by a random back-exchange per peptide, and gaussian noise is added.
+
+    Args:
+        sequence: Protein sequence in one-letter FASTA encoding.
+        dG: Array of ΔG values (J/mol) per residue, or a dictionary of arrays where keys are
+            state names.
+        temperature: Temperature of the H/D exchange reaction (K).
+        pH: pH of the H/D exchange reaction.
+        timepoints: Deuterium exposure times (s).
+        peptides: Peptides, as generated by [generate_peptides][synthetic.generate_peptides].
+        d_percentage: Percentage deuterium in the exchange buffer.
+        drop_first: Number of n-terminal residues of each peptide which fully back-exchange.
+        back_exchange: Range of the uniformly distributed back-exchange fraction per peptide.
+        noise: Standard deviation of gaussian noise added to uptake values (Da).
+        fd_exposure: Exposure time of the fully deuterated control (s).
+        nd_control: If `True`, adds a non-deuterated control.
+        n_term: Residue number of the first residue in `sequence`.
+        protein: Value for the 'Protein' field.
+        rng: Optional numpy random generator.
+
+    Returns:
+        DataFrame in DynamX state data format, with exposure times in minutes. States are
+        'Full deuteration control', 'Non deuterated control' and the given states.
+
+    """
+    rng = rng or np.random.default_rng()
+    dG_dict = dG if isinstance(dG, dict) else {"state": dG}
+    timepoints = np.asarray(timepoints, dtype=float)
+    Np = len(peptides)
+
+    for state, dG_state in dG_dict.items():
+        if len(dG_state) != len(sequence):
+            raise ValueError(
+                f"Length of ΔG values of state {state!r} ({len(dG_state)}) does not match the "
+                f"sequence length ({len(sequence)})"
+            )
+
+    # Coupling matrix of exchanging residues, which are marked by upper case letters
+    corrected = correct_d_uptake(peptides.assign(stop=peptides["end"] + 1), drop_first=drop_first)
+    lengths = corrected["sequence"].str.len().to_numpy()
+    offset = np.cumsum(lengths) - lengths
+    exchanges = np.char.isupper(np.array(list("".join(corrected["sequence"]))))
+    rows = np.repeat(np.arange(Np), lengths)[exchanges]
+    columns = np.repeat(peptides["start"].to_numpy() - n_term - offset, lengths) + np.arange(
+        lengths.sum()
+    )
+    indices = np.stack([rows, columns[exchanges]])
+    X = sparse_tensor(
+        indices, np.ones(len(rows)), (Np, len(sequence)), torch.float64, torch.device("cpu")
+    )
+    n_exchanges = np.bincount(rows, minlength=Np)
+    max_uptake = np.array([len(s) - 1 - s[1:].count("P") for s in peptides["sequence"]])
+
+    k_int = torch.tensor(k_int_from_sequence(sequence, temperature, pH)).unsqueeze(-1)
+    scaling = d_percentage / 100.0 * (1 - rng.uniform(*back_exchange, size=Np))
+
+    mass = np.array([_peptide_mass(s) for s in peptides["sequence"]])
+    rt = rng.uniform(1.0, 10.0, size=Np)
+
+    def make_state(state: str, exposure: np.ndarray, uptake: np.ndarray) -> pd.DataFrame:
+        uptake = uptake + rng.normal(scale=noise, size=uptake.shape)
+        Nt = len(exposure)
+        df = pd.DataFrame(
+            {
+                "Protein": protein,
+                "Start": np.repeat(peptides["start"].to_numpy(), Nt),
+                "End": np.repeat(peptides["end"].to_numpy(), Nt),
+                "Sequence": np.repeat(peptides["sequence"].to_numpy(), Nt),
+                "Modification": np.nan,
+                "Fragment": np.nan,
+                "MaxUptake": np.repeat(max_uptake, Nt),
+                "MHP": np.repeat(mass, Nt),
+                "State": state,
+                "Exposure": np.tile(exposure / 60.0, Np),
+                "Center": np.repeat(mass, Nt) + uptake.ravel(),
+                "Center SD": noise,
+                "Uptake": uptake.ravel(),
+                "Uptake SD": noise,
+                "RT": np.repeat(rt, Nt),
+                "RT SD": 0.01,
+            },
+            columns=DYNAMX_COLUMNS,
+        )
+        return df
+
+    dfs = [
+        make_state(
+            "Full deuteration control",
+            np.array([fd_exposure]),
+            (n_exchanges * scaling)[:, np.newaxis],
+        )
+    ]
+    if nd_control:
+        dfs.append(make_state("Non deuterated control", np.array([0.0]), np.zeros((Np, 1))))
+
+    for state, dG_state in dG_dict.items():
+        model = DeltaGFit(torch.tensor(np.asarray(dG_state, dtype=float)).unsqueeze(-1))
+        with torch.no_grad():
+            d_calc = model(
+                torch.tensor(temperature, dtype=torch.float64),
+                X,
+                k_int,
+                torch.tensor(timepoints).unsqueeze(0),
+            )
+        dfs.append(make_state(state, timepoints, d_calc.numpy() * scaling[:, np.newaxis]))
+
+    return pd.concat(dfs, ignore_index=True)
@@ -28,12 +28,15 @@ from tqdm.auto import tqdm
 import pyhdx
 from pyhdx.config import cfg
 from pyhdx.fileIO import csv_to_dataframe, dataframe_to_stringio
-from pyhdx.fitting import (
+from pyhdx.cache import (
     fit_rates_weighted_average,
-    fit_rates_half_time_interpolate,
-    get_bounds,
     fit_gibbs_global,
     fit_gibbs_global_batch,
+    fit_d_uptake,
+)
+from pyhdx.fitting import (
+    fit_rates_half_time_interpolate,
+    get_bounds,
     PATIENCE,
     STOP_LOSS,
     EPOCHS,
@@ -41,7 +44,6 @@ from pyhdx.fitting import (
     R2,
     optimizer_defaults,
     RatesFitResult,
-    fit_d_uptake,
     DUptakeFitResultSet,
 )
 from pyhdx.datasets import HDXDataSet, DataVault, DataFile
@@ -96,6 +98,15 @@ def blocking_function(duration):
     return df
 
 
+def _fit_with_errors(fit_func, *args, **kwargs):
+    """Runs a ΔG fit and computes its error estimates, such that these are computed on the Dask
+    worker rather than on first access of the result's output in the web application"""
+    result = fit_func(*args, **kwargs)
+    result.errors
+
+    return result
+
+
 class AsyncControlPanel(ControlPanel):
     _type = "async"
 
@@ -1379,7 +1390,9 @@ class FitControl(PyHDXControlPanel):
                 else:
                     guess = gibbs_guesses[protein_state]
 
-                future = client.submit(fit_gibbs_global, hdxm, guess, **self.fit_kwargs)
+                future = client.submit(
+                    _fit_with_errors, fit_gibbs_global, hdxm, guess, **self.fit_kwargs
+                )
                 futures.append(future)
 
             self.widgets["pbar"].num_tasks = len(futures)
@@ -1400,7 +1413,9 @@ class FitControl(PyHDXControlPanel):
         hdx_set = self.src.hdx_set
         gibbs_guess = self.get_guesses()
         async with Client(cfg.cluster.scheduler_address, asynchronous=True) as client:
-            future = client.submit(fit_gibbs_global_batch, hdx_set, gibbs_guess, **self.fit_kwargs)
+            future = client.submit(
+                _fit_with_errors, fit_gibbs_global_batch, hdx_set, gibbs_guess, **self.fit_kwargs
+            )
             result = await future
 
         self.src.add(result, name)
@@ -1410,7 +1425,7 @@ class FitControl(PyHDXControlPanel):
         self.widgets["do_fit"].loading = False
         self.parent.logger.info(f"Finished PyTorch fit: {name}")
         self.parent.logger.info(
-            f"Finished fitting in {len(result.losses)} epochs, final mean squared residuals is {result.mse_loss:.2f}"
+            f"Finished fitting in {result.losses.index.max()} epochs, final mean squared residuals is {result.mse_loss:.2f}"
         )
         self.parent.logger.info(
             f"Total loss: {result.total_loss:.2f}, regularization loss: {result.reg_loss:.2f} "
@@ -0,0 +1,37 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pyhdx.benchmark import BENCHMARKS, run_benchmarks
+from pyhdx.cli import app
+
+
+def test_run_benchmarks():
+    results = []
+    report = run_benchmarks(sizes=[50], repeats=2, epochs=5, callback=results.append)
+    assert [r["name"] for r in report["results"]] == list(BENCHMARKS)
+    assert len(results) == len(BENCHMARKS)
+
+    fit_result = results[list(BENCHMARKS).index("fit_gibbs_global")]
+    assert len(fit_result.times) == 2
+    assert fit_result.rates["epochs_per_second"] == pytest.approx(5 / fit_result.best)
+    assert all(r.peak_memory > 0 for r in results)
+
+    with pytest.raises(ValueError, match="Unknown benchmark"):
+        run_benchmarks(names=["fit_everything"])
+
+
+def test_benchmark_cli():
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tempdir:
+        fpath = Path(tempdir) / "benchmark.json"
+        args = ["benchmark", "--size", "50", "--size", "80", "--name", "read_dynamx"]
+        result = runner.invoke(app, args + ["--repeats", "1", "--output", str(fpath)])
+        assert result.exit_code == 0
+
+        report = json.loads(fpath.read_text())
+        assert [r["n_residues"] for r in report["results"]] == [50, 80]
+        assert report["metadata"]["repeats"] == 1
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyhdx import cache
+from pyhdx.cache import ResultCache
+from pyhdx.config import cfg
+from pyhdx.datasets import read_dynamx
+from pyhdx.models import HDXMeasurement
+from pyhdx.process import apply_control, correct_d_uptake, filter_peptides
+
+cwd = Path(__file__).parent
+input_dir = cwd / "test_data" / "input"
+
+
+@pytest.fixture(scope="module")
+def hdxm() -> HDXMeasurement:
+    df = read_dynamx(input_dir / "ecSecB_apo.csv")
+    fd = {"state": "Full deuteration control", "exposure": {"value": 0.167, "unit": "min"}}
+    fd_df = filter_peptides(df, **fd)
+    peptides = filter_peptides(df, state="SecB WT apo")
+    peptides_corrected = correct_d_uptake(apply_control(peptides, fd_df))
+
+    return HDXMeasurement(peptides_corrected, temperature=303.15, pH=8.0, c_term=155)
+
+
+def test_cached_fit(tmp_path, hdxm):
+    guess = np.full(hdxm.Nr, 25e3)
+    with cfg.context({"server.cache_dir": str(tmp_path)}):
+        result = cache.fit_gibbs_global(hdxm, guess, epochs=20)
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+        cached = cache.fit_gibbs_global(hdxm, guess, epochs=20)
+        assert cached is not result
+        assert cached.hdxm_set.hdxm_list[0] is hdxm
+        pd.testing.assert_frame_equal(cached.output, result.output, check_exact=True)
+        pd.testing.assert_frame_equal(cached.losses, result.losses, check_exact=True)
+
+        key = cache.fit_gibbs_global.key(hdxm, guess, epochs=20)
+        assert key == cache.fit_gibbs_global.key(hdxm, guess.copy(), 1, 20)
+        assert key != cache.fit_gibbs_global.key(hdxm, guess, epochs=21)
+        assert key != cache.fit_gibbs_global.key(hdxm, guess + 1, epochs=20)
+        with cfg.context({"fitting.dtype": "float32"}):
+            assert key != cache.fit_gibbs_global.key(hdxm, guess, epochs=20)
+
+        callbacks = [lambda epoch, model, optimizer: None]
+        cache.fit_gibbs_global(hdxm, guess, epochs=10, callbacks=callbacks)
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+    with cfg.context({"server.cache_dir": None}):
+        assert ResultCache.from_config() is None
+        cache.fit_gibbs_global(hdxm, guess, epochs=10)
+
+
+def test_cache_key(tmp_path):
+    def func(value):
+        return value
+
+    cached_func = cache.CachedFunction(func)
+    index = pd.Index(np.arange(1000), name="r_number")
+    assert cached_func.key(index) == cached_func.key(index.copy())
+    assert cached_func.key(index) != cached_func.key(index.rename("peptide_id"))
+    assert cached_func.key(index) != cached_func.key(index.where(index != 500, -1))
+    assert cached_func.key(np.float32(1.0)) != cached_func.key(np.float64(1.0))
+
+    # Arguments without a stable hash are not cached
+    with pytest.raises(TypeError):
+        cached_func.key(object())
+    with cfg.context({"server.cache_dir": str(tmp_path)}):
+        cached_func(object())
+        assert not list(tmp_path.glob("*.pkl"))
+
+
+def test_result_cache_eviction(tmp_path):
+    result_cache = ResultCache(tmp_path, max_size=10**6)
+    for i, key in enumerate("abc"):
+        result_cache.set(key, np.zeros(100))
+        os.utime(result_cache.path(key), (i, i))
+    result_cache.max_size = 3 * result_cache.path("a").stat().st_size
+
+    # Loading marks 'a' as most recently used, such that 'b' is evicted next
+    assert np.array_equal(result_cache.get("a"), np.zeros(100))
+    result_cache.set("d", np.zeros(100))
+
+    assert sorted(p.stem for p in tmp_path.glob("*.pkl")) == ["a", "c", "d"]
+    assert result_cache.size <= result_cache.max_size
+    with pytest.raises(KeyError):
+        result_cache.get("b")
+
+    result_cache.clear()
+    assert result_cache.size == 0
@@ -6,6 +6,8 @@ from pyhdx.fileIO import (
     dataframe_to_file,
     save_fitresult,
     load_fitresult,
+    load_fitresult_output,
+    load_fitresult_losses,
 )
 
 from pathlib import Path
@@ -148,3 +150,31 @@ def test_load_save_fitresult(tmp_path, fit_result: TorchFitResult, hdxm: HDXMeas
     assert len(fr_load_with_hdxm_and_losses.losses) == 100
 
     assert fr_load_with_hdxm_and_losses.metadata["total_loss"] == losses.iloc[-1].sum()
+
+
+def test_load_save_fitresult_npy(tmp_path, fit_result: TorchFitResult, hdxm: HDXMeasurement):
+    fit_result_dir = Path(tmp_path) / "fit_result"
+    save_fitresult(fit_result_dir, fit_result, fmt="npy", pprint=False)
+
+    assert (fit_result_dir / "fit_result.json").exists()
+    assert [f.name for f in fit_result_dir.glob("*.txt")] == ["log.txt"]
+    assert not list(fit_result_dir.glob("*.csv"))
+
+    output = load_fitresult_output(fit_result_dir, quantities=["dG", "covariance"])
+    assert output.columns.to_list() == [(hdxm.name, "dG"), (hdxm.name, "covariance")]
+    pd.testing.assert_frame_equal(output, fit_result.output[output.columns])
+
+    losses = load_fitresult_losses(fit_result_dir)
+    base = losses.to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    pd.testing.assert_frame_equal(losses, fit_result.losses)
+
+    fit_result_loaded = load_fitresult(fit_result_dir)
+    pd.testing.assert_frame_equal(fit_result_loaded.output, fit_result.output)
+    assert fit_result_loaded.metadata["total_loss"] == fit_result.metadata["total_loss"]
+
+    hdxm_loaded = fit_result_loaded.hdxm_set.hdxm_list[0]
+    assert hdxm_loaded.metadata == hdxm.metadata
+    pd.testing.assert_frame_equal(hdxm_loaded.d_exp, hdxm.d_exp)
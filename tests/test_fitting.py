@@ -1,4 +1,6 @@
+import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -12,16 +14,27 @@ from pandas.testing import assert_series_equal, assert_frame_equal
 from pyhdx import HDXMeasurement
 from pyhdx.config import cfg
 from pyhdx.fileIO import csv_to_dataframe
+from pyhdx.fitting_torch import TorchFitResult
 from pyhdx.fitting import (
     fit_rates_weighted_average,
+    fit_kinetics_batch,
+    get_bounds,
     fit_gibbs_global,
     fit_gibbs_global_batch,
     fit_gibbs_global_batch_aligned,
     fit_rates_half_time_interpolate,
     GenericFitResult,
     fit_d_uptake,
+    d_uptake_cost_func,
+    tv_least_squares,
+    _fit_single_d_update,
+    fit_gibbs_global_path,
+    fit_gibbs_global_batch_path,
+    LossHistory,
 )
 from pyhdx.batch_processing import StateParser
+from pyhdx.fit_models import two_component_half_life
+from pyhdx.fitting_torch import estimate_errors, estimate_errors_states
 from pyhdx.models import HDXMeasurementSet
 from pyhdx.process import apply_control, correct_d_uptake
 from pyhdx.datasets import filter_peptides, read_dynamx
@@ -95,6 +108,53 @@ def test_initial_guess_wt_average(hdxm_apo_red: HDXMeasurement):
     pd.testing.assert_series_equal(check_rates["rate"], output["rate"])
 
 
+def test_initial_guess_wt_average_batch(hdxm_apo_red: HDXMeasurement):
+    result = fit_rates_weighted_average(hdxm_apo_red, method="batch")
+    output = result.output
+
+    assert output.size == 100
+    assert len(result.models) == len(result.results) == len(result.intervals)
+    check_rates = csv_to_dataframe(output_dir / "ecSecB_reduced_guess.csv")
+    assert np.allclose(check_rates["rate"], output["rate"], rtol=0.1, equal_nan=True)
+
+    t = np.logspace(1, 4, num=7)
+    params = np.array([[0.5, 0.002, 0.3], [0.05, 0.01, 0.8], [3.0, 0.0005, 0.6]])
+    k1, k2, r = params.T[..., np.newaxis]
+    d = 1 - (r * np.exp(-k1 * t) + (1 - r) * np.exp(-k2 * t))
+
+    fit_params, chi_squared = fit_kinetics_batch(t, d, get_bounds(t))
+    assert np.allclose(fit_params, params, rtol=1e-3)
+    assert np.all(chi_squared < 1e-12)
+
+
+def test_half_life_rates(hdxm_apo_red: HDXMeasurement):
+    k1 = np.array([0.5, 0.05, 3.0, 0.01, np.nan])
+    k2 = np.array([0.002, 0.05, 0.0005, 1.0, 0.1])
+    r = np.array([0.3, 0.8, 1.0, 0.0, 0.5])
+
+    t_half, converged = two_component_half_life(k1, k2, r)
+    assert np.array_equal(converged, [True, True, True, True, False])
+    uptake = r * np.exp(-k1 * t_half) + (1 - r) * np.exp(-k2 * t_half)
+    assert np.allclose(uptake[:4], 0.5)
+    assert np.allclose(t_half[1:4], np.log(2) / np.array([0.05, 3.0, 1.0]))
+    assert np.isnan(t_half[4])
+
+    result = fit_rates_weighted_average(hdxm_apo_red, method="batch")
+    rates, converged = result.get_block_rates()
+    assert np.all(converged)
+    block_rates = [m.get_rate(**res.params) for res, m in zip(result.results, result.models)]
+    assert np.allclose(rates, block_rates)
+
+    # Rates scattered to residues match the block intervals
+    rate = result.rate
+    for (s, e), block_rate in zip(result.intervals, rates):
+        assert np.all(rate[(result.r_number >= s) & (result.r_number < e)] == block_rate)
+    covered = np.zeros(len(result.r_number), dtype=bool)
+    for s, e in result.intervals:
+        covered |= (result.r_number >= s) & (result.r_number < e)
+    assert np.all(np.isnan(rate[~covered]))
+
+
 def test_initial_guess_half_time_interpolate(hdxm_apo_red: HDXMeasurement):
     result = fit_rates_half_time_interpolate(hdxm_apo_red)
     assert isinstance(result, GenericFitResult)
@@ -161,6 +221,42 @@ def test_duptake_fit(hdxm_apo: HDXMeasurement):
     np.allclose(check_d_uptake, fr.output)
 
 
+def test_duptake_fit_admm(hdxm_apo: HDXMeasurement):
+    hdx_t = hdxm_apo[3]
+    X, d_uptake = hdx_t.X, hdx_t.data["uptake_corrected"].values
+
+    result = tv_least_squares(X, d_uptake, 0.5, bounds=[(0, 1)] * hdx_t.Nr)
+    assert result.success
+    assert np.all((result.x >= 0) & (result.x <= 1))
+    assert result.fun == pytest.approx(d_uptake_cost_func(result.x, X, d_uptake, 0.5))
+
+    res_lbfgsb, mse_loss, reg_loss = _fit_single_d_update(X, d_uptake, r1=0.5)
+    assert result.fun < res_lbfgsb.fun
+
+    fr = fit_d_uptake(hdxm_apo, r1=0.5, repeats=2, verbose=False, method="admm")
+    assert fr.result.shape == (hdxm_apo.Nt, 2, hdxm_apo.Nr)
+    assert fr.metadata["method"] == "admm"
+    assert fr.output.shape == fit_d_uptake(hdxm_apo, r1=0.5, repeats=2, verbose=False).output.shape
+
+
+def test_duptake_fit_batch(hdxm_apo: HDXMeasurement):
+    fr = fit_d_uptake(hdxm_apo, r1=0.5, repeats=3, verbose=False, method="admm")
+    fr_chunked = fit_d_uptake(
+        hdxm_apo, r1=0.5, repeats=3, verbose=False, method="admm", chunk_size=4
+    )
+
+    for Ni, hdx_t in enumerate(hdxm_apo):
+        X, d_uptake = hdx_t.X, hdx_t.data["uptake_corrected"].values
+        result = tv_least_squares(X, d_uptake, 0.5, bounds=True)
+        for r in range(3):
+            for f in [fr, fr_chunked]:
+                x = f.result[Ni, r]
+                assert f.mse_loss[Ni, r] == pytest.approx(np.mean((X @ x - d_uptake) ** 2))
+                assert f.mse_loss[Ni, r] + f.reg_loss[Ni, r] == pytest.approx(
+                    result.fun, rel=1e-3, abs=1e-6
+                )
+
+
 def test_global_fit(hdxm_apo: HDXMeasurement):
     initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
 
@@ -185,6 +281,226 @@ def test_global_fit(hdxm_apo: HDXMeasurement):
     assert errors.shape == (1, hdxm_apo.Np, hdxm_apo.Nt)
 
 
+def test_loss_history(hdxm_apo: HDXMeasurement):
+    history = LossHistory(max_history=10)
+    losses = np.random.rand(35, 2)
+    for i in range(5):
+        history.extend(np.arange(7 * i + 1, 7 * i + 8), losses[7 * i : 7 * i + 7])
+
+    loss_df = history.to_dataframe()
+    assert history.stride == 4
+    assert list(loss_df.index) == [1, 5, 9, 13, 17, 21, 25, 29, 33, 35]
+    assert np.allclose(loss_df.to_numpy(), losses[loss_df.index - 1])
+
+    # The last block is empty after decimation
+    history = LossHistory(max_history=4)
+    for i in range(4):
+        history.extend(np.arange(3 * i + 1, 3 * i + 4), losses[3 * i : 3 * i + 3])
+    assert list(history.to_dataframe().index) == [1, 5, 9, 12]
+
+    history = LossHistory(max_history=0)
+    history.extend(np.arange(1, 36), losses)
+    assert list(history.to_dataframe().index) == list(range(1, 36))
+
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    gibbs_guess = hdxm_apo.guess_deltaG(initial_rates["rate"])
+    fr_full = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=300, r1=2)
+    with cfg.context({"fitting.max_history": 50, "fitting.check_every": 64}):
+        fr_bounded = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=300, r1=2)
+
+    assert len(fr_full.losses) == 300
+    assert len(fr_bounded.losses) <= 51
+    assert fr_bounded.metadata["epochs_run"] == 300
+    assert_frame_equal(fr_bounded.losses, fr_full.losses.loc[fr_bounded.losses.index])
+
+    # Losses end at the epoch where early stopping triggered, independent of check_every
+    with cfg.context({"fitting.check_every": 1}):
+        fr_stop = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=1000, r1=2, stop_loss=1e-3)
+    with cfg.context({"fitting.check_every": 64}):
+        fr_stop_blocks = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=1000, r1=2, stop_loss=1e-3)
+    assert fr_stop.metadata["epochs_run"] % 64
+    assert_frame_equal(fr_stop_blocks.losses, fr_stop.losses)
+
+
+def test_fit_result_lazy_errors(hdxm_apo: HDXMeasurement):
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    gibbs_guess = hdxm_apo.guess_deltaG(initial_rates["rate"])
+    fr_global = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=200, r1=2)
+
+    # Error estimates are not computed on creation
+    assert fr_global._errors is None
+    assert "covariance" not in fr_global.values[hdxm_apo.name]
+    assert_series_equal(
+        fr_global.values[hdxm_apo.name, "_dG"], fr_global.dG[hdxm_apo.name], check_names=False
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = fr_global.compute_errors_async(executor)
+        errors = future.result()
+    assert fr_global.compute_errors_async() is future
+    assert list(errors[hdxm_apo.name].columns) == ["covariance", "perr"]
+
+    check = fr_global.generate_output(hdxm_apo, fr_global.dG[hdxm_apo.name])
+    assert_frame_equal(fr_global.output[hdxm_apo.name], check, check_names=False)
+    assert fr_global.output is fr_global.output
+
+    # Pending error estimates are resolved when pickling
+    fr_copy = TorchFitResult(fr_global.hdxm_set, fr_global.model, losses=fr_global.losses)
+    future = fr_copy.compute_errors_async()
+    fr_loaded = pickle.loads(pickle.dumps(fr_copy))
+    assert_frame_equal(fr_loaded.errors, future.result())
+
+
+def test_estimate_errors(hdxm_apo: HDXMeasurement, hdxm_dimer: HDXMeasurement):
+    check_deltaG = csv_to_dataframe(output_dir / "ecSecB_torch_fit.csv")
+    dG = check_deltaG["SecB WT apo", "_dG"]
+
+    cov_autograd, perr_autograd = estimate_errors(hdxm_apo, dG, method="autograd")
+    cov_analytic, perr_analytic = estimate_errors(hdxm_apo, dG)
+    assert_series_equal(cov_autograd, cov_analytic, rtol=1e-6)
+
+    # perr of residues which are not determined by the data depends on the pseudo-inverse cutoff
+    determined = (perr_autograd > 1) & (perr_autograd < 1e5)
+    rel_diff = np.abs(perr_analytic - perr_autograd)[determined] / perr_autograd[determined]
+    assert np.median(rel_diff) < 1e-3
+
+    hdx_set = HDXMeasurementSet([hdxm_dimer, hdxm_apo])
+    errors = estimate_errors_states(hdx_set, pd.DataFrame({name: dG for name in hdx_set.names}))
+    assert_series_equal(
+        errors[hdxm_apo.name, "covariance"].dropna(), cov_analytic, check_names=False
+    )
+
+
+def test_global_fit_sparse(hdxm_apo: HDXMeasurement, hdxm_dimer: HDXMeasurement):
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    gibbs_guess = hdxm_apo.guess_deltaG(initial_rates["rate"])
+
+    fr_dense = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=200, r1=2)
+    with cfg.context({"fitting.layout": "sparse"}):
+        fr_sparse = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=200, r1=2)
+
+    assert np.allclose(fr_sparse.losses, fr_dense.losses)
+    assert_series_equal(fr_dense.output[hdxm_apo.name, "dG"], fr_sparse.output[hdxm_apo.name, "dG"])
+
+    hdx_set = HDXMeasurementSet([hdxm_dimer, hdxm_apo])
+    rates_df = pd.DataFrame({name: initial_rates["rate"] for name in hdx_set.names})
+    gibbs_guess = hdx_set.guess_deltaG(rates_df)
+
+    fr_dense = fit_gibbs_global_batch(hdx_set, gibbs_guess, epochs=200)
+    with cfg.context({"fitting.layout": "sparse"}):
+        fr_sparse = fit_gibbs_global_batch(hdx_set, gibbs_guess, epochs=200)
+
+    assert np.allclose(fr_sparse.losses, fr_dense.losses)
+    assert_frame_equal(
+        fr_dense.output.xs("dG", level=-1, axis=1), fr_sparse.output.xs("dG", level=-1, axis=1)
+    )
+
+
+def test_batch_fit_packed(hdxm_apo: HDXMeasurement, hdxm_dimer: HDXMeasurement):
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    hdx_set = HDXMeasurementSet([hdxm_dimer, hdxm_apo])
+    rates_df = pd.DataFrame({name: initial_rates["rate"] for name in hdx_set.names})
+    gibbs_guess = hdx_set.guess_deltaG(rates_df)
+
+    dense = hdx_set.get_tensors()
+    packed = hdx_set.get_tensors(layout="packed")
+    assert packed["X"].P == sum(hdxm.Np for hdxm in hdx_set)
+    assert torch.allclose(packed["X"].pad(packed["d_exp"], hdx_set.Np), dense["d_exp"])
+    assert torch.equal(packed["X"].to_padded(hdx_set.Np), dense["X"])
+
+    fr_dense = fit_gibbs_global_batch(hdx_set, gibbs_guess, epochs=200)
+    with cfg.context({"fitting.layout": "packed"}):
+        fr_packed = fit_gibbs_global_batch(hdx_set, gibbs_guess, epochs=200)
+        fr_lm = fit_gibbs_global_batch(
+            hdx_set, gibbs_guess, epochs=100, optimizer="LevenbergMarquardt"
+        )
+
+    assert np.allclose(fr_packed.losses, fr_dense.losses)
+    assert_frame_equal(
+        fr_dense.output.xs("dG", level=-1, axis=1), fr_packed.output.xs("dG", level=-1, axis=1)
+    )
+    assert np.allclose(fr_packed.get_squared_errors(), fr_dense.get_squared_errors())
+    assert fr_lm.total_loss < fr_dense.total_loss
+
+    fr_lm_dense = fit_gibbs_global_batch(
+        hdx_set, gibbs_guess, epochs=100, optimizer="LevenbergMarquardt"
+    )
+    assert np.allclose(fr_lm.losses, fr_lm_dense.losses)
+
+
+@pytest.mark.parametrize("optimizer", ["LBFGS", "LevenbergMarquardt"])
+def test_global_fit_second_order(hdxm_apo: HDXMeasurement, optimizer):
+    check_deltaG = csv_to_dataframe(output_dir / "ecSecB_torch_fit_epochs_20000.csv")
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    gibbs_guess = hdxm_apo.guess_deltaG(initial_rates["rate"])
+
+    # Loss of the SGD reference result (first epoch losses are evaluated before the first step)
+    fr_reference = fit_gibbs_global(hdxm_apo, check_deltaG["SecB WT apo", "_dG"], epochs=1, r1=2)
+    fr_global = fit_gibbs_global(hdxm_apo, gibbs_guess, epochs=1000, r1=2, optimizer=optimizer)
+
+    assert fr_global.metadata["epochs_run"] < 1000
+    assert fr_global.total_loss < fr_reference.total_loss
+
+    # The L1 regularized objective has multiple minima; compare the bulk of dG values
+    out_deltaG = fr_global.output[hdxm_apo.name, "dG"]
+    rel_diff = (
+        np.abs(out_deltaG - check_deltaG["SecB WT apo", "dG"]) / check_deltaG["SecB WT apo", "dG"]
+    )
+    assert np.nanmedian(rel_diff) < 0.15
+
+
+def test_global_fit_path(hdxm_apo: HDXMeasurement, hdxm_dimer: HDXMeasurement):
+    initial_rates = csv_to_dataframe(output_dir / "ecSecB_guess.csv")
+    gibbs_guess = hdxm_apo.guess_deltaG(initial_rates["rate"])
+
+    path_result = fit_gibbs_global_path(
+        hdxm_apo, gibbs_guess, r1=[0.5, 2, 5], epochs=200, chunk_size=1
+    )
+    fr_first = fit_gibbs_global(hdxm_apo, gibbs_guess, r1=0.5, epochs=200)
+    # Consecutive values are warm started from the previous result
+    fr_warm = fit_gibbs_global(
+        hdxm_apo, path_result[0].output[hdxm_apo.name, "dG"], r1=2, epochs=200
+    )
+
+    assert len(path_result) == 3
+    assert path_result[1].metadata["r1"] == 2
+    for path_fr, fr in zip(path_result, [fr_first, fr_warm]):
+        assert_series_equal(path_fr.output[hdxm_apo.name, "dG"], fr.output[hdxm_apo.name, "dG"])
+
+    l_curve = path_result.l_curve
+    assert list(l_curve.columns) == ["r1", "mse_loss", "reg_1", "reg_loss", "total_loss"]
+    assert np.all(np.diff(l_curve["reg_loss"]) > 0)
+
+    # By default, values are fitted simultaneously and converge independently (after 250 and
+    # 1500 epochs), with the losses of each value up to the epoch at which it converged
+    fit_kwargs = dict(epochs=2000, stop_loss=3e-4)
+    path_result = fit_gibbs_global_path(hdxm_apo, gibbs_guess, r1=[0.5, 5], **fit_kwargs)
+    for path_fr, r1 in zip(path_result, [0.5, 5]):
+        fr = fit_gibbs_global(hdxm_apo, gibbs_guess, r1=r1, **fit_kwargs)
+        assert_series_equal(path_fr.output[hdxm_apo.name, "dG"], fr.output[hdxm_apo.name, "dG"])
+        assert path_fr.metadata["epochs_run"] == fr.metadata["epochs_run"]
+        assert_frame_equal(path_fr.losses, fr.losses)
+    assert path_result[0].metadata["epochs_run"] < path_result[1].metadata["epochs_run"]
+
+    with pytest.raises(ValueError, match="chunk_size=1"):
+        fit_gibbs_global_path(hdxm_apo, gibbs_guess, r1=[1, 2], chunk_size=2, optimizer="LBFGS")
+
+    hdx_set = HDXMeasurementSet([hdxm_dimer, hdxm_apo])
+    rates_df = pd.DataFrame({name: initial_rates["rate"] for name in hdx_set.names})
+    gibbs_guess = hdx_set.guess_deltaG(rates_df)
+
+    path_result = fit_gibbs_global_batch_path(
+        hdx_set, gibbs_guess, r1=[1, 2], r2=[1, 5], epochs=200
+    )
+    fr_global = fit_gibbs_global_batch(hdx_set, gibbs_guess, r1=1, r2=1, epochs=200)
+
+    assert list(path_result.l_curve[["r1", "r2"]].itertuples(index=False)) == [(1, 1), (2, 5)]
+    assert_frame_equal(
+        path_result[0].output.xs("dG", level=-1, axis=1),
+        fr_global.output.xs("dG", level=-1, axis=1),
+    )
+
+
 @pytest.mark.skip(reason="Longer fit is not checked by default due to long computation times")
 def test_global_fit_extended(hdxm_apo: HDXMeasurement):
     check_deltaG = csv_to_dataframe(output_dir / "ecSecB_torch_fit_epochs_20000.csv")
@@ -0,0 +1,69 @@
+import operator
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+from dask.distributed import Client
+
+from pyhdx.config import cfg
+from pyhdx.datasets import read_dynamx
+from pyhdx.fitting import fit_d_uptake
+from pyhdx.local_cluster import (
+    DummyClient,
+    PoolClient,
+    ProcessPoolClient,
+    ThreadPoolClient,
+    default_cluster,
+    default_threads_per_worker,
+)
+from pyhdx.models import HDXMeasurement
+from pyhdx.process import apply_control, correct_d_uptake, filter_peptides
+
+cwd = Path(__file__).parent
+input_dir = cwd / "test_data" / "input"
+
+
+def test_pool_clients():
+    for client in [DummyClient(), ThreadPoolClient(2)]:
+        futures = client.map(operator.sub, [5, 6], [1, 2], pure=False)
+        assert client.gather(futures) == [4, 4]
+        assert client.submit(round, 2.567, ndigits=1, pure=False).result() == 2.6
+
+    with ProcessPoolClient(2, threads_per_worker=1) as client:
+        futures = client.map(operator.pow, [2, 3], [3, 2], pure=False)
+        assert client.gather(futures) == [8, 9]
+        assert client.submit(torch.get_num_threads).result() == 1
+    assert client._executor is None
+
+    with pytest.raises(TypeError):
+        PoolClient(2)
+
+
+def test_thread_budget():
+    assert default_threads_per_worker(os.cpu_count() * 2) == 1
+    with cfg.context({"cluster.threads_per_worker": 2}):
+        assert default_threads_per_worker(4) == 2
+        assert ProcessPoolClient(4).threads_per_worker == 2
+
+        cluster = default_cluster(scheduler_port=0, n_workers=1, dashboard_address=":0")
+    with cluster, Client(cluster) as client:
+        assert client.submit(torch.get_num_threads, pure=False).result() == 2
+        assert client.submit(os.getenv, "OMP_NUM_THREADS").result() == "2"
+        assert list(client.nthreads().values()) == [1]
+
+
+def test_fit_d_uptake_thread_pool():
+    df = read_dynamx(input_dir / "ecSecB_apo.csv")
+    fd = {"state": "Full deuteration control", "exposure": {"value": 0.167, "unit": "min"}}
+    peptides = filter_peptides(df, state="SecB WT apo", exposure={"value": 0.167, "unit": "min"})
+    peptides = correct_d_uptake(apply_control(peptides, filter_peptides(df, **fd)))
+    hdxm = HDXMeasurement(peptides, c_term=155)
+
+    result = fit_d_uptake(hdxm, repeats=1, verbose=False)
+    with ThreadPoolClient(2) as client:
+        result_pool = fit_d_uptake(hdxm, repeats=2, verbose=False, client=client)
+
+    assert result_pool.result.shape == (2, hdxm.Nr)
+    assert np.allclose(result_pool.mse_loss, result.mse_loss, rtol=0.1)
@@ -2,19 +2,28 @@ import pytest
 import os
 from pyhdx import HDXTimepoint, HDXMeasurement
 from pyhdx.datasets import read_dynamx
-from pyhdx.models import Coverage
+from pyhdx.models import Coverage, PeptideUptakeModel, linderstrom_lang_uptake
 from pyhdx.fileIO import csv_to_hdxm, csv_to_dataframe
+from pyhdx.config import cfg
 import numpy as np
+import torch
 from functools import reduce
 from operator import add
 from pathlib import Path
 import pandas as pd
 from pandas.testing import assert_frame_equal
 import tempfile
+import hdxrate
 import pickle
 import pytest
 
-from pyhdx.process import apply_control, correct_d_uptake, filter_peptides
+from pyhdx.process import (
+    apply_control,
+    correct_d_uptake,
+    filter_peptides,
+    verify_sequence,
+    k_int_from_sequence,
+)
 
 cwd = Path(__file__).parent
 input_dir = cwd / "test_data" / "input"
@@ -52,6 +61,37 @@ class TestHDXMeasurement(object):
         tensors = self.hdxm.get_tensors()
         # assert ...
 
+        sparse_tensors = self.hdxm.get_tensors(layout="sparse")
+        assert sparse_tensors["X"].is_sparse
+        assert np.allclose(sparse_tensors["X"].to_dense().numpy(), tensors["X"].numpy())
+
+    def test_tensor_cache(self, monkeypatch):
+        hdxm = HDXMeasurement(self.hdxm.data, temperature=self.temperature, pH=self.pH, c_term=155)
+
+        # The data is not hashed while the cache is empty; tensors stored without hash are
+        # created again on the next call
+        with monkeypatch.context() as m:
+            m.setattr(HDXMeasurement, "_tensor_token", lambda self: pytest.fail("Data hashed"))
+            first = hdxm.get_tensors()
+        tensors = hdxm.get_tensors()
+        assert tensors["d_exp"].data_ptr() != first["d_exp"].data_ptr()
+
+        cached = hdxm.get_tensors()
+        assert cached["d_exp"].data_ptr() == tensors["d_exp"].data_ptr()
+        assert hdxm.get_tensors(exchanges=True)["X"].data_ptr() != tensors["X"].data_ptr()
+
+        # Returned tensors are detached views of the cached tensors
+        cached["d_exp"].requires_grad_()
+        assert not hdxm.get_tensors()["d_exp"].requires_grad
+
+        hdxm.peptides[1].data["uptake_corrected"] *= 2
+        modified = hdxm.get_tensors()
+        assert modified["d_exp"].data_ptr() != tensors["d_exp"].data_ptr()
+        assert torch.allclose(modified["d_exp"][:, 1], 2 * tensors["d_exp"][:, 1])
+
+        hdxm.clear_tensor_cache()
+        assert hdxm.get_tensors()["d_exp"].data_ptr() != modified["d_exp"].data_ptr()
+
     def test_rfu(self):
         rfu_residues = self.hdxm.rfu_residues
         compare = csv_to_dataframe(output_dir / "ecSecB_rfu_per_exposure.csv")
@@ -59,6 +99,72 @@ class TestHDXMeasurement(object):
         compare.columns.name = "exposure"
         assert_frame_equal(rfu_residues, compare)
 
+    def test_store(self):
+        store = self.hdxm.store
+        assert store.arrays["rfu"].shape == (self.hdxm.Np, self.hdxm.Nt)
+        assert "sequence" in store.peptides and "sequence" not in store.arrays
+
+        for i, hdx_t in enumerate(self.hdxm):
+            assert np.shares_memory(hdx_t.data["uptake"].to_numpy(), store.arrays["uptake"])
+            assert np.array_equal(hdx_t.data["rfu"], store.arrays["rfu"][:, i])
+
+        wide = self.hdxm.data_wide
+        assert wide.shape == (self.hdxm.Np, self.hdxm.Nt * (len(store.columns) - 1))
+        assert np.array_equal(wide.xs("rfu", axis=1, level=1).to_numpy(), store.arrays["rfu"])
+
+        # Long and wide format DataFrames are created once and cached
+        assert self.hdxm.data is self.hdxm.data
+        assert self.hdxm.data_wide is wide
+
+        memory = self.hdxm.memory_usage()
+        assert memory["uptake"] == store.arrays["uptake"].nbytes
+        assert store.memory_usage().sum() < self.hdxm.data.memory_usage(deep=True).sum()
+        assert memory["X"] == self.hdxm.coverage.X.nbytes
+
+    def test_pickle(self):
+        self.hdxm.data  # cached DataFrames are not pickled
+        hdxm = pickle.loads(pickle.dumps(self.hdxm))
+        assert "coverage" not in hdxm.__dict__ and not hdxm._derived
+        assert_frame_equal(hdxm.data, self.hdxm.data)
+        assert hdxm.store.Np == self.hdxm.Np
+
+        assert_frame_equal(hdxm.coverage.protein, self.hdxm.coverage.protein)
+        assert hdxm[0].X is hdxm.coverage.X
+        assert np.shares_memory(hdxm[0].data["uptake"].to_numpy(), hdxm.store.arrays["uptake"])
+        assert torch.equal(hdxm.get_tensors()["d_exp"], self.hdxm.get_tensors()["d_exp"])
+
+        with pytest.raises(AttributeError):
+            hdxm.does_not_exist
+
+    def test_rfu_sd(self):
+        rfu_sd = pd.concat(
+            [v.rfu_residues_sd for v in self.hdxm], keys=self.hdxm.timepoints, axis=1
+        )
+        rfu_sd.columns.name = "exposure"
+        assert_frame_equal(self.hdxm.rfu_residues_sd, rfu_sd)
+
+    def test_k_int_cache(self):
+        sequence = self.hdxm.coverage.protein["sequence"]
+        k_int = k_int_from_sequence(sequence, self.temperature, self.pH)
+        assert k_int is k_int_from_sequence("".join(sequence), self.temperature, self.pH)
+        assert not k_int.flags.writeable
+        assert np.array_equal(self.hdxm.coverage.protein["k_int"], k_int)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with cfg.context({"server.k_int_dir": tempdir}):
+                k_int_persisted = k_int_from_sequence(sequence, self.temperature, 7.25)
+            assert len(list(Path(tempdir).glob("*.npy"))) == 1
+
+        assert k_int_persisted is k_int_from_sequence(sequence, self.temperature, 7.25)
+        with cfg.context({"server.k_int_dir": "~/k_int"}):
+            assert cfg.k_int_dir == Path.home() / "k_int"
+
+        # Multi-letter residue codes are passed to hdxrate unchanged
+        codes = ["X", "A", "Pc", "G", "C2", "L", "X"]
+        k_int = k_int_from_sequence(codes, self.temperature, self.pH)
+        assert len(k_int) == len(codes)
+        assert np.array_equal(k_int, hdxrate.k_int_from_sequence(codes, self.temperature, self.pH))
+
     def test_to_file(self):
         with tempfile.TemporaryDirectory() as tempdir:
             fpath = Path(tempdir) / "hdxm.csv"
@@ -108,6 +214,32 @@ class TestCoverage(object):
         for r, s in zip(cov_seq.r_number, cov_seq["sequence"]):
             assert self.sequence[r - 1] == s
 
+    def test_verify_sequence(self):
+        # Overlapping peptides with conflicting sequences; the first peptide takes precedence
+        df = pd.DataFrame(
+            {
+                "start": [2, 4, 9],
+                "stop": [6, 8, 11],
+                "end": [5, 7, 10],
+                "_sequence": ["ACDE", "WGHI", "KL"],
+                "sequence": ["aCDE", "wGHI", "kL"],
+            }
+        )
+        seq_full, seq_reconstruct = verify_sequence(df, c_term=12)
+        assert "".join(seq_full) == "XACDEHIXKLXX"
+        assert "".join(seq_reconstruct) == "XaCDEHIXkLXX"
+        assert seq_full.index.name == "r_number"
+
+        seq_full, _ = verify_sequence(df, sequence="MACDEHIPKLMM")
+        assert "".join(seq_full) == "MACDEHIPKLMM"
+
+        with pytest.raises(ValueError, match="at residue 10, expected 'L', got 'P'"):
+            verify_sequence(df, sequence="MACDEHIPKPMM")
+
+        df.loc[1, "sequence"] = "wGH"
+        with pytest.raises(ValueError, match="length of 'sequence'"):
+            verify_sequence(df, c_term=12)
+
     def test_dim(self):
         cov = self.hdxm.coverage
         assert cov.Np == len(np.unique(cov.data["sequence"]))
@@ -122,3 +254,68 @@ class TestCoverage(object):
 
         test_Z = np.genfromtxt(output_dir / "attributes" / "Z.txt")
         assert np.allclose(self.hdxm.coverage.Z, test_Z)
+
+        assert np.array_equal(self.hdxm.coverage.X_sparse.toarray(), test_X)
+
+    def test_shared_coverage(self):
+        cov = self.hdxm.coverage
+        for hdx_t in self.hdxm:
+            assert hdx_t.X is cov.X
+            assert hdx_t.Z is cov.Z
+            assert hdx_t.protein is cov.protein
+
+        with pytest.raises(ValueError):
+            cov.X[0, 0] = 0
+
+        data = self.hdxm[0].data
+        cov_new = Coverage(data, c_term=155)
+        assert np.array_equal(cov_new.X, cov.X)
+        assert np.allclose(cov_new.Z, cov.Z)
+
+        with pytest.raises(ValueError, match="do not match"):
+            Coverage(data.iloc[1:], coverage=cov)
+
+    def test_derived_cache(self):
+        cov = self.hdxm.coverage
+        assert cov.Z_norm is cov.Z_norm
+        assert self.hdxm[0].Z_norm is cov.Z_norm
+        assert cov.block_length is cov.block_length
+        assert cov.X_norm is cov.X_norm
+
+        z_norm = cov.Z_norm
+        with cfg.context({"analysis.weight_exponent": 2.0}):
+            wts = cov.Z**2
+            with np.errstate(invalid="ignore"):
+                expected = wts / wts.sum(axis=0)
+            assert np.allclose(cov.Z_norm, expected, equal_nan=True)
+            assert self.hdxm[1].Z_norm is cov.Z_norm
+
+        assert not np.allclose(z_norm, expected, equal_nan=True)
+        assert np.array_equal(cov.Z_norm, z_norm, equal_nan=True)
+
+
+def test_linderstrom_lang_uptake():
+    model = PeptideUptakeModel(list("MKVLAPSQEHW"), 300.0, 7.5)
+    timepoints = np.logspace(-2, 6, num=25)
+    rng = np.random.default_rng(43)
+    k_open = 10 ** rng.uniform(-2, 4, size=len(model))
+    k_close = 10 ** rng.uniform(-1, 6, size=len(model))
+
+    d_uptake = model.eval_analytical(timepoints, k_open, k_close)
+    assert d_uptake.shape == (len(timepoints), len(model))
+    for i in range(len(model)):
+        populations = model.eval_single_numerical(
+            i, timepoints, k_open[i], k_close[i], method="Radau", rtol=1e-10, atol=1e-12
+        )
+        assert np.allclose(d_uptake[:, i], populations[:, 2], atol=1e-8)
+
+    populations = linderstrom_lang_uptake(
+        timepoints, k_open, k_close, model.k_int, populations=True
+    )
+    assert np.allclose(populations.sum(axis=-1), 1)
+    assert np.allclose(populations[..., 2].T, d_uptake)
+
+    # Grid of opening and closing rates for all residues
+    grid = model.eval_analytical(timepoints, k_open[:, np.newaxis, np.newaxis], k_close)
+    assert grid.shape == (len(model), 1, len(timepoints), len(model))
+    assert np.allclose(grid[3, 0][:, 3], d_uptake[:, 3])
@@ -0,0 +1,75 @@
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+from hdxms_datasets import HDXDataSet
+from scipy import constants
+from typer.testing import CliRunner
+
+from pyhdx import HDXMeasurement
+from pyhdx.cli import app
+from pyhdx.datasets import read_dynamx
+from pyhdx.process import apply_control, correct_d_uptake, filter_peptides
+from pyhdx.synthetic import generate_dataset, generate_peptides, random_dG, random_sequence
+
+
+def test_generate_peptides():
+    rng = np.random.default_rng(43)
+    sequence = random_sequence(500, rng=rng)
+    assert len(sequence) == 500
+
+    peptides = generate_peptides(sequence, n_peptides=400, min_length=5, max_length=20, rng=rng)
+    assert len(peptides) == 400
+    assert not peptides.duplicated(["start", "end"]).any()
+    lengths = peptides["end"] - peptides["start"] + 1
+    assert lengths.min() >= 5 and lengths.max() <= 20
+    assert (peptides["sequence"].str.len() == lengths).all()
+    assert peptides["sequence"][0] == sequence[peptides["start"][0] - 1 : peptides["end"][0]]
+
+    peptides = generate_peptides(sequence, redundancy=4.0, mean_length=10, rng=rng)
+    assert len(peptides) == 200
+
+
+def test_generate_dataset():
+    rng = np.random.default_rng(43)
+    sequence = random_sequence(200, rng=rng)
+    dG = random_dG(200, rng=rng)
+    peptides = generate_peptides(sequence, redundancy=3.0, rng=rng)
+    temperature, pH = 300.0, 7.5
+    timepoints = [0.0, 10.0, 100.0, 1000.0]
+
+    df = generate_dataset(
+        sequence, {"apo": dG}, temperature, pH, timepoints, peptides, noise=0.0, rng=rng
+    )
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    data = read_dynamx(buffer)
+
+    fd = filter_peptides(data, state="Full deuteration control")
+    nd = filter_peptides(data, state="Non deuterated control")
+    peptides = filter_peptides(data, state="apo")
+    peptides = correct_d_uptake(apply_control(peptides, fd, nd), drop_first=1, d_percentage=90.0)
+    hdxm = HDXMeasurement(peptides, sequence=sequence, temperature=temperature, pH=pH)
+
+    # Corrected D-uptake equals the forward model without back-exchange
+    k_int = hdxm.coverage["k_int"].to_numpy()[:, np.newaxis]
+    pfact = np.exp(dG[hdxm.coverage.index - 1] / (constants.R * temperature))[:, np.newaxis]
+    d_residue = 1 - np.exp(-k_int / (1 + pfact) * hdxm.timepoints)
+    assert np.allclose(hdxm.d_exp.to_numpy(), 0.9 * hdxm.coverage.X @ d_residue)
+
+
+def test_synthetic_cli():
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tempdir:
+        args = ["synthetic", tempdir, "--n-residues", "100", "--n-states", "2", "--seed", "1"]
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+
+        spec = yaml.safe_load((Path(tempdir) / "data_states.yaml").read_text())
+        dataset = HDXDataSet.from_spec(spec, data_dir=Path(tempdir))
+        hdxm = HDXMeasurement.from_dataset(dataset, state="state_1")
+        assert hdxm.Nt == 8
+        assert hdxm.metadata["c_term"] == 100